@@ -0,0 +1,116 @@
+"""
+Ejemplo 01: Router de LLMs con Peticiones Hedged
+================================================
+
+Este ejemplo demuestra cómo reducir la latencia de cola de `qry.ask`
+repartiendo las llamadas entre varios proveedores LLM con `LLMRouter`.
+
+Características demostradas:
+- Router compatible con `QryDoc(..., llm=router)`
+- Petición duplicada (hedge) al secundario tras el p95 del primario
+- Histogramas de latencia por proveedor
+- Failover ante proveedores caídos
+
+Los proveedores son LLMs locales de reemplazo (`StandInLLM`) con latencia
+inyectada, así que el ejemplo no necesita API keys. Para usar proveedores
+reales basta con cambiarlos por `OpenAI()`, `LiteLLM(...)`, etc.
+"""
+
+import statistics
+import time
+
+from qry_doc import QryDoc
+
+from perf import LLMRouter, StandInLLM
+
+
+# Número de preguntas por escenario
+N_PREGUNTAS = 40
+
+
+def crear_proveedores() -> tuple[StandInLLM, StandInLLM]:
+    """Crea el par de proveedores con la misma semilla en cada escenario."""
+    # Principal: rápido pero con picos de latencia en el 10% de las llamadas
+    principal = StandInLLM("principal", latency=0.05, spike_rate=0.10, spike_latency=1.5, seed=1)
+    # Secundario: algo más lento pero estable
+    secundario = StandInLLM("secundario", latency=0.08, jitter=0.1, seed=2)
+    return principal, secundario
+
+
+def medir(qry: QryDoc, n: int) -> list[float]:
+    """Ejecuta `n` preguntas y retorna la latencia de cada una."""
+    latencias = []
+    for i in range(n):
+        inicio = time.perf_counter()
+        qry.ask(f"¿Cuántas ventas hay? (consulta {i})")
+        latencias.append(time.perf_counter() - inicio)
+    return latencias
+
+
+def resumen(nombre: str, latencias: list[float]) -> None:
+    """Imprime p50/p95/máx de una serie de latencias."""
+    ordenadas = sorted(latencias)
+    p95 = ordenadas[int(0.95 * (len(ordenadas) - 1))]
+    print(f"   {nombre:<22} p50={statistics.median(ordenadas):.3f}s "
+          f"p95={p95:.3f}s máx={ordenadas[-1]:.3f}s")
+
+
+def main():
+    data_path = "examples/data/ventas.csv"
+
+    # =========================================================================
+    # EJEMPLO 1: Un solo proveedor (comportamiento actual)
+    # =========================================================================
+
+    print("=" * 60)
+    print("⏱️  UN SOLO PROVEEDOR")
+    print("=" * 60)
+
+    principal, _ = crear_proveedores()
+    qry = QryDoc(data_path, llm=principal)
+    resumen("solo principal", medir(qry, N_PREGUNTAS))
+
+    # =========================================================================
+    # EJEMPLO 2: Router con hedge basado en p95
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🔀 ROUTER CON HEDGING")
+    print("=" * 60)
+
+    principal, secundario = crear_proveedores()
+
+    with LLMRouter([principal, secundario], default_hedge_delay=0.2) as router:
+        qry = QryDoc(data_path, llm=router)
+        resumen("router (hedge p95)", medir(qry, N_PREGUNTAS))
+
+        print("\n   Estadísticas por proveedor:")
+        for stats in router.stats():
+            print(f"   • {stats['name']}: {stats['samples']} muestras, "
+                  f"p50={stats['p50'] or 0:.3f}s p95={stats['p95'] or 0:.3f}s, "
+                  f"ganadas={stats['wins']}, hedges={stats['hedges']}")
+
+    # =========================================================================
+    # EJEMPLO 3: Failover ante un proveedor caído
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🛟 FAILOVER")
+    print("=" * 60)
+
+    caido = StandInLLM("caido", latency=0.01, failure_rate=1.0, seed=3)
+    respaldo = StandInLLM("respaldo", latency=0.05, jitter=0.1, seed=4)
+
+    with LLMRouter([caido, respaldo], failure_threshold=2, cooldown=60) as router:
+        qry = QryDoc(data_path, llm=router)
+        print(f"   Respuesta: {qry.ask('¿Cuántas ventas hay?')}")
+        resumen("router (failover)", medir(qry, 10))
+
+        for stats in router.stats():
+            estado = "sano" if stats['healthy'] else "en cuarentena"
+            print(f"   • {stats['name']}: {estado}, fallos={stats['failures']}, "
+                  f"ganadas={stats['wins']}")
+
+
+if __name__ == "__main__":
+    main()
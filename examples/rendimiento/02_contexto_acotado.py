@@ -0,0 +1,92 @@
+"""
+Ejemplo 02: Contexto de Conversación Acotado en AIBuilder
+=========================================================
+
+Este ejemplo demuestra cómo mantener estable el tamaño del contexto de
+AIBuilder durante sesiones largas de análisis.
+
+Características demostradas:
+- Presupuesto de tokens configurable por QryDoc (`context_budget`)
+- Ventana deslizante con los turnos recientes
+- Resumen compacto de los turnos antiguos
+- Comparación con el contexto sin acotar
+"""
+
+from qry_doc import QryDoc
+
+from perf import PerfQryDoc, StandInLLM
+
+
+# Número de turnos de la sesión simulada
+N_TURNOS = 60
+
+PREGUNTAS = [
+    "Give me a summary of the dataset",
+    "Which columns are available?",
+    "What are the column types?",
+    "How many rows are there?",
+]
+
+
+def contexto_tokens(mensajes: list[dict[str, str]]) -> int:
+    """Tokens estimados (~4 caracteres por token) de una lista de mensajes."""
+    return sum(len(m["content"]) for m in mensajes) // 4
+
+
+def simular_turno(ai, turno: int) -> None:
+    """Un turno de análisis cuyas respuestas se alargan con la sesión."""
+    pregunta = PREGUNTAS[turno % len(PREGUNTAS)]
+    respuesta = ai.ask(pregunta)
+    # Simula el análisis detallado que devolvería un LLM real
+    ai._add_to_context("assistant", (respuesta + " ") * (2 + turno // 5))
+
+
+def main():
+    data_path = "examples/data/ventas.csv"
+    llm = StandInLLM("local", latency=0.0)
+
+    # =========================================================================
+    # EJEMPLO 1: Contexto sin acotar (AIBuilder estándar)
+    # =========================================================================
+
+    print("=" * 60)
+    print("📈 CONTEXTO SIN ACOTAR")
+    print("=" * 60)
+
+    ai = QryDoc(data_path, llm=llm).ai_builder
+    for turno in range(N_TURNOS):
+        simular_turno(ai, turno)
+        if turno % 15 == 0:
+            print(f"   Turno {turno:>3}: {len(ai.get_context()):>3} mensajes, "
+                  f"~{contexto_tokens(ai.get_context()):>5} tokens")
+
+    # =========================================================================
+    # EJEMPLO 2: Contexto con presupuesto de tokens
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📉 CONTEXTO CON PRESUPUESTO DE 800 TOKENS")
+    print("=" * 60)
+
+    qry = PerfQryDoc(data_path, llm=llm, context_budget=800)
+    ai = qry.ai_builder
+    for turno in range(N_TURNOS):
+        simular_turno(ai, turno)
+        if turno % 15 == 0:
+            print(f"   Turno {turno:>3}: {len(ai.get_context()):>3} mensajes, "
+                  f"~{ai.context_tokens:>5} tokens")
+
+    print(f"\n   Mensajes compactados en el resumen: {ai.context_window.evicted}")
+    print("\n   Resumen actual (últimas líneas):")
+    for linea in ai.context_window.summary.splitlines()[-4:]:
+        print(f"   {linea}")
+
+    # El AIBuilder se conserva entre accesos
+    assert qry.ai_builder is ai
+
+    ai.clear_context()
+    print(f"\n✓ Contexto limpiado: {len(ai.get_context())} mensajes")
+
+
+if __name__ == "__main__":
+    main()
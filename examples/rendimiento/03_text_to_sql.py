@@ -0,0 +1,149 @@
+"""
+Ejemplo 03: Modo Text-to-SQL para Bases de Datos
+================================================
+
+Este ejemplo demuestra cómo resolver preguntas sobre una base de datos
+dejando que el LLM escriba SQL, en lugar de traer todas las filas a pandas.
+
+Características demostradas:
+- `PerfQryDoc(..., execution_mode="sql")`
+- Esquema obtenido con `DataSourceLoader.explore_database`
+- Validación de SQL: solo lectura, un statement y LIMIT obligatorio
+- Comparación de tiempo y memoria con el modo pandas
+
+La base de datos es un SQLite generado a partir de `ventas.csv`, así que
+el ejemplo funciona sin servidor. Con PostgreSQL o MySQL solo cambia la URL.
+"""
+
+import sqlite3
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import QryDoc, ValidationError
+
+from perf import PerfQryDoc, SQLGuard, StandInLLM
+
+
+# Filas de la tabla sintética
+N_FILAS = 300_000
+
+
+def crear_base(db_path: Path) -> None:
+    """Crea una tabla `ventas` con N_FILAS replicando ventas.csv."""
+    base = pd.read_csv("examples/data/ventas.csv")
+    repeticiones = N_FILAS // len(base) + 1
+    df = pd.concat([base] * repeticiones, ignore_index=True).head(N_FILAS)
+
+    db_path.unlink(missing_ok=True)
+    with sqlite3.connect(db_path) as conn:
+        df.to_sql("ventas", conn, index=False)
+        conn.execute("CREATE INDEX idx_ventas_region ON ventas(region)")
+
+
+def responder_sql(prompt: str) -> str:
+    """LLM de reemplazo: SQL fijo según la pregunta del prompt."""
+    if "Request:" in prompt:
+        # Exportación: filas, no un resumen
+        return (
+            "```sql\n"
+            "SELECT fecha, producto, vendedor, cantidad\n"
+            "FROM ventas WHERE region = 'Norte'\n"
+            "```"
+        )
+    pregunta = prompt.rsplit("Question:", 1)[-1].lower()
+    if "región" in pregunta or "region" in pregunta:
+        return (
+            "```sql\n"
+            "SELECT region, SUM(cantidad * precio_unitario) AS total\n"
+            "FROM ventas GROUP BY region ORDER BY total DESC\n"
+            "```"
+        )
+    if "vendedor" in pregunta:
+        return (
+            "```sql\n"
+            "SELECT vendedor, COUNT(*) AS ventas, AVG(cantidad) AS promedio\n"
+            "FROM ventas GROUP BY vendedor\n"
+            "```"
+        )
+    return "```sql\nSELECT COUNT(*) AS total FROM ventas\n```"
+
+
+def main():
+    output_dir = Path("output/rendimiento")
+    output_dir.mkdir(parents=True, exist_ok=True)
+    db_path = output_dir / "ventas.db"
+
+    print(f"🗄️  Creando base SQLite con {N_FILAS:,} filas...")
+    crear_base(db_path)
+    db_url = f"sqlite:///{db_path}"
+
+    llm = StandInLLM("sql", latency=0.0, answer=responder_sql)
+
+    # =========================================================================
+    # EJEMPLO 1: Modo pandas (comportamiento actual)
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🐼 MODO PANDAS: todas las filas en memoria")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    qry_pandas = QryDoc(db_url, llm=StandInLLM("pandas", latency=0.0))
+    memoria = qry_pandas.dataframe.memory_usage(deep=True).sum() / 1e6
+    print(f"   Carga: {time.perf_counter() - inicio:.2f}s, "
+          f"{qry_pandas.shape[0]:,} filas, {memoria:.1f} MB en pandas")
+
+    # =========================================================================
+    # EJEMPLO 2: Modo SQL
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧮 MODO SQL: la base agrega, pandas recibe el resultado")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    qry = PerfQryDoc(db_url, llm=llm, execution_mode="sql", sql_sample_rows=500)
+    memoria = qry.dataframe.memory_usage(deep=True).sum() / 1e6
+    print(f"   Carga: {time.perf_counter() - inicio:.2f}s, "
+          f"muestra de {qry.shape[0]:,} filas, {memoria:.2f} MB en pandas")
+
+    for pregunta in ["Total de ventas por región", "Ventas por vendedor", "¿Cuántas ventas hay?"]:
+        inicio = time.perf_counter()
+        respuesta = qry.ask(pregunta)
+        print(f"\n   ❓ {pregunta} ({time.perf_counter() - inicio:.3f}s)")
+        print(f"   SQL: {' '.join(qry.last_sql.split())}")
+        for linea in respuesta.splitlines():
+            print(f"      {linea}")
+
+    resultado = qry.extract_to_csv("Todas las ventas de la región Norte", output_dir / "ventas_norte_sql.csv")
+    print(f"\n   💾 {resultado}")
+    print(f"   SQL: {' '.join(qry.last_sql.split())}")
+
+    # =========================================================================
+    # EJEMPLO 3: Validación del SQL generado
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🛡️  VALIDACIÓN DE SQL")
+    print("=" * 60)
+
+    guard = SQLGuard(max_rows=1000)
+    consultas = [
+        "SELECT region, COUNT(*) FROM ventas GROUP BY region",
+        "SELECT * FROM ventas WHERE producto = 'DROP TABLE'",
+        "DELETE FROM ventas",
+        "SELECT 1; DROP TABLE ventas",
+        "WITH x AS (SELECT * FROM ventas) SELECT * INTO copia FROM x",
+    ]
+    for sql in consultas:
+        try:
+            guard.guard(sql)
+            print(f"   ✓ {sql}")
+        except ValidationError as e:
+            print(f"   ✗ {sql}\n     {e.user_message}")
+
+
+if __name__ == "__main__":
+    main()
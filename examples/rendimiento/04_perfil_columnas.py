@@ -0,0 +1,102 @@
+"""
+Ejemplo 04: Perfil de Columnas Precalculado
+===========================================
+
+Este ejemplo demuestra cómo responder preguntas de metadatos sin LLM
+usando el perfil de columnas que `PerfQryDoc` calcula al cargar los datos.
+
+Características demostradas:
+- Perfil calculado una sola vez: distintos, top-k, min/max, nulos, histogramas
+- Preguntas de metadatos respondidas localmente
+- Actualización incremental con filas nuevas
+- Perfil como contexto compacto del prompt en lugar de filas de muestra
+"""
+
+import time
+
+import pandas as pd
+
+from perf import PerfQryDoc, StandInLLM
+
+
+def main():
+    llm = StandInLLM("local", latency=0.5)
+
+    # =========================================================================
+    # EJEMPLO 1: Perfil de ventas.csv
+    # =========================================================================
+
+    print("=" * 60)
+    print("📋 PERFIL DE VENTAS")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    qry = PerfQryDoc("examples/data/ventas.csv", llm=llm)
+    print(f"   Perfil calculado al cargar ({time.perf_counter() - inicio:.3f}s)")
+
+    print("\n   Contexto compacto para el prompt:")
+    for linea in qry.profile.to_prompt().splitlines():
+        print(f"   {linea}")
+
+    # =========================================================================
+    # EJEMPLO 2: Preguntas de metadatos sin LLM
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("⚡ PREGUNTAS DE METADATOS")
+    print("=" * 60)
+
+    preguntas = [
+        "¿Qué valores existen en region?",
+        "¿Cuál es el rango de fecha?",
+        "¿Cuántos vendedor distintos hay?",
+        "¿Cuál es el máximo de precio_unitario?",
+        "¿Cuántos nulos tiene categoria?",
+    ]
+    for pregunta in preguntas:
+        inicio = time.perf_counter()
+        respuesta = qry.ask(pregunta)
+        print(f"   ({(time.perf_counter() - inicio) * 1000:.2f} ms) {pregunta}")
+        print(f"      → {respuesta}")
+
+    # Las preguntas que no son de metadatos siguen yendo al LLM
+    inicio = time.perf_counter()
+    respuesta = qry.ask("Total de cantidad por region")
+    print(f"\n   ({(time.perf_counter() - inicio) * 1000:.0f} ms, vía LLM) Total de cantidad por region")
+
+    # =========================================================================
+    # EJEMPLO 3: Datos marítimos
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🚢 DATOS MARÍTIMOS")
+    print("=" * 60)
+
+    qry_mar = PerfQryDoc("examples/data/maritimal_data/DataLimpia.csv", llm=llm)
+    for pregunta in [
+        "¿Cuántos tipos distintos de ship_type hay?",
+        "¿Cuáles son los ship_type más frecuentes?",
+        "¿Cuál es el rango de publication_date?",
+    ]:
+        print(f"   {pregunta}\n      → {qry_mar.ask(pregunta)}")
+
+    # =========================================================================
+    # EJEMPLO 4: Actualización incremental
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("➕ ACTUALIZACIÓN INCREMENTAL")
+    print("=" * 60)
+
+    nuevas = pd.DataFrame([
+        {"fecha": "2024-04-01", "producto": "Laptop Pro", "categoria": "Electrónica",
+         "cantidad": 4, "precio_unitario": 1299.99, "vendedor": "Luis Pérez", "region": "Este"},
+    ])
+    qry.append_data(nuevas)
+    print(f"   Filas: {qry.profile.rows}")
+    print(f"   → {qry.ask('¿Qué valores existen en region?')}")
+    print(f"   → {qry.ask('¿Cuál es el rango de fecha?')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Ejemplo 05: Validación de Consultas sin LLM
+===========================================
+
+Este ejemplo demuestra cómo validar preguntas antes de enviarlas al LLM
+con el índice local de columnas, valores y sinónimos de `BoundedAIBuilder`.
+
+Características demostradas:
+- Índice construido una vez a partir del perfil de columnas
+- Sinónimos español/inglés y valores de categorías
+- Búsqueda difusa para errores de escritura
+- Validación en lote como pre-flight de una cola de preguntas
+- Confirmación opcional con el LLM
+"""
+
+import time
+
+from perf import PerfQryDoc, StandInLLM
+
+
+def main():
+    llm = StandInLLM("local", latency=0.5)
+    qry = PerfQryDoc("examples/data/ventas.csv", llm=llm)
+    ai = qry.ai_builder
+
+    # =========================================================================
+    # EJEMPLO 1: Índice de referencias
+    # =========================================================================
+
+    print("=" * 60)
+    print("🗂️  ÍNDICE DE REFERENCIAS")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    index = ai.query_index
+    print(f"   {len(index)} términos indexados ({(time.perf_counter() - inicio) * 1000:.1f} ms)")
+
+    # =========================================================================
+    # EJEMPLO 2: Preguntas válidas e inválidas
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("✅ VALIDACIÓN LOCAL")
+    print("=" * 60)
+
+    preguntas = [
+        "Total de ventas por región",
+        "Average price per seller",
+        "Unidades vendidas de Laptop Pro en el Norte",
+        "Ventas por vendedro",           # error de escritura
+        "Margen por sucursal",           # palabras desconocidas: avisos, el LLM decide
+        'Ventas por "sucursal"',         # nombre entre comillas inexistente
+        "Ventas por semestre",           # periodo derivado de la fecha
+        "Top 5 productos por categoría",
+    ]
+    for pregunta in preguntas:
+        inicio = time.perf_counter()
+        es_valida, error = ai.validate_query(pregunta)
+        ms = (time.perf_counter() - inicio) * 1000
+        estado = "✅" if es_valida else "❌"
+        print(f"   {estado} ({ms:.3f} ms) {pregunta}")
+        if error:
+            print(f"      → {error}")
+
+    # =========================================================================
+    # EJEMPLO 3: Pre-flight de un lote
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📦 PRE-FLIGHT DE UN LOTE")
+    print("=" * 60)
+
+    lote = preguntas * 500
+    inicio = time.perf_counter()
+    resultados = ai.validate_queries(lote)
+    total = time.perf_counter() - inicio
+    validas = sum(r.is_valid for r in resultados)
+    print(f"   {len(lote):,} preguntas en {total * 1000:.1f} ms "
+          f"({total / len(lote) * 1e6:.1f} µs por pregunta)")
+    print(f"   Válidas: {validas:,}  |  Rechazadas sin llamar al LLM: {len(lote) - validas:,}")
+    print(f"   Tiempo ahorrado (a {llm.latency:.1f}s por llamada): "
+          f"{(len(lote) - validas) * llm.latency:,.0f}s")
+
+    # =========================================================================
+    # EJEMPLO 4: Detalle de una validación
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🔎 DETALLE")
+    print("=" * 60)
+
+    resultado = index.validate("Ventas por vendedro en la zona Sur")
+    for termino, referencia in resultado.resolved.items():
+        print(f"   {termino:<12} → {referencia}")
+
+
+if __name__ == "__main__":
+    main()
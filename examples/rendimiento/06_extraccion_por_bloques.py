@@ -0,0 +1,126 @@
+"""
+Ejemplo 06: Exportación a CSV por Bloques
+=========================================
+
+Este ejemplo demuestra cómo exportar extracciones grandes sin materializar
+el resultado completo: el LLM describe un filtro de filas y `PerfQryDoc`
+lo aplica bloque a bloque, escribiendo cada bloque al CSV.
+
+Características demostradas:
+- `extract_to_csv()` con filtros aplicados por bloques
+- Memoria extra constante: la de un bloque, no la del resultado
+- BOM UTF-8 y encabezado únicos (compatible con Excel)
+- Validación del filtro: sin llamadas a funciones ni columnas inexistentes
+"""
+
+import json
+import time
+import tracemalloc
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import ValidationError
+from qry_doc.csv_exporter import CSVExporter
+
+from perf import PerfQryDoc, RowFilter, StandInLLM
+
+
+# Filas del DataFrame sintético
+N_FILAS = 500_000
+OUTPUT_DIR = Path("output/rendimiento")
+
+FILTROS = {
+    "cantidad > 2": {"filter": "cantidad > 2", "columns": []},
+    "norte": {
+        "filter": "region == 'Norte' and precio_unitario >= 100",
+        "columns": ["fecha", "producto", "vendedor", "precio_unitario"],
+    },
+}
+
+
+def responder(prompt: str) -> str:
+    """LLM de reemplazo: filtro fijo según la petición."""
+    if "DataFrame.query()" not in prompt:
+        return StandInLLM.default_answer(prompt)
+    pedido = prompt.rsplit("Request:", 1)[-1].lower()
+    plan = FILTROS["norte"] if "norte" in pedido else FILTROS["cantidad > 2"]
+    return f"```json\n{json.dumps(plan)}\n```"
+
+
+def medir(funcion):
+    """Ejecuta una función y retorna (segundos, pico de memoria en MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcion()
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 1024 / 1024
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    base = pd.read_csv("examples/data/ventas.csv")
+    df = pd.concat([base] * (N_FILAS // len(base) + 1), ignore_index=True).head(N_FILAS)
+
+    llm = StandInLLM("local", latency=0.05, answer=responder)
+    qry = PerfQryDoc(df, llm=llm, extract_chunk_size=50_000)
+
+    # =========================================================================
+    # EJEMPLO 1: Materializado vs. por bloques
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📤 EXTRACCIÓN DE {N_FILAS:,} FILAS")
+    print("=" * 60)
+
+    ruta_completa = OUTPUT_DIR / "extracto_completo.csv"
+    ruta_bloques = OUTPUT_DIR / "extracto_bloques.csv"
+
+    segundos, pico = medir(lambda: CSVExporter.export(df.query("cantidad > 2"), ruta_completa))
+    print(f"   Materializado:  {segundos:5.2f}s  | memoria extra {pico:7.1f} MB")
+
+    segundos, pico = medir(lambda: qry.extract_to_csv("Todas las filas con cantidad > 2", ruta_bloques))
+    print(f"   Por bloques:    {segundos:5.2f}s  | memoria extra {pico:7.1f} MB")
+
+    iguales = ruta_completa.read_bytes() == ruta_bloques.read_bytes()
+    con_bom = ruta_bloques.read_bytes()[:3] == CSVExporter.get_encoding_bom("utf-8-sig")
+    print(f"\n   Archivos idénticos: {'✅' if iguales else '❌'}  |  BOM UTF-8: {'✅' if con_bom else '❌'}")
+
+    # =========================================================================
+    # EJEMPLO 2: Filtro con columnas seleccionadas
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧭 FILTRO CON COLUMNAS")
+    print("=" * 60)
+
+    ruta = OUTPUT_DIR / "extracto_norte.csv"
+    print(f"   {qry.extract_to_csv('Ventas del Norte con precio >= 100', ruta)}")
+    muestra = pd.read_csv(ruta, encoding="utf-8-sig")
+    print(f"   {len(muestra):,} filas, columnas: {', '.join(muestra.columns)}")
+
+    # =========================================================================
+    # EJEMPLO 3: Filtros rechazados
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🛡️  VALIDACIÓN DEL FILTRO")
+    print("=" * 60)
+
+    for expresion in [
+        "cantidad > 2 and region == 'Sur'",
+        "__import__('os').system('ls')",
+        "margen > 0.3",
+        "cantidad.max() > 2",
+    ]:
+        try:
+            RowFilter(expresion).validate(df.columns)
+            print(f"   ✅ {expresion}")
+        except ValidationError as e:
+            print(f"   ❌ {expresion}\n      → {e.user_message}")
+
+
+if __name__ == "__main__":
+    main()
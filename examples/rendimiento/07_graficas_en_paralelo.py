@@ -0,0 +1,126 @@
+"""
+Ejemplo 07: Gráficas de Reportes en Paralelo
+============================================
+
+Este ejemplo demuestra cómo renderizar las gráficas de un reporte en un
+pool de procesos precalentados con `PerfQryDoc(..., chart_workers=N)`.
+
+Características demostradas:
+- Agregación de todas las series en el proceso principal
+- Solo la serie agregada viaja a los procesos de trabajo
+- Procesos con matplotlib (Agg) importado antes de la primera gráfica
+- Imágenes retornadas como bytes PNG
+- Comparación con el renderizado secuencial
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import ChartConfig
+
+from perf import ChartRenderPool, PerfQryDoc, StandInLLM, render_chart, spec_from_config
+
+
+# Filas del DataFrame sintético
+N_FILAS = 500_000
+OUTPUT_DIR = Path("output/rendimiento")
+
+RESUMEN = "Resumen de ventas generado para la comparación de rendimiento."
+
+
+def crear_graficas() -> list[ChartConfig]:
+    """Diez gráficas sobre las columnas de ventas.csv."""
+    graficas = []
+    for agrupar in ("region", "categoria", "vendedor", "producto", "fecha"):
+        for tipo in ("bar", "barh") if agrupar != "fecha" else ("line", "area"):
+            graficas.append(ChartConfig(
+                chart_type=tipo,
+                title=f"Cantidad por {agrupar} ({tipo})",
+                group_by=agrupar,
+                value_column="cantidad",
+                color="#003366",
+            ))
+    return graficas
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    base = pd.read_csv("examples/data/ventas.csv")
+    df = pd.concat([base] * (N_FILAS // len(base) + 1), ignore_index=True).head(N_FILAS)
+    llm = StandInLLM("local", latency=0.1)
+    graficas = crear_graficas()
+
+    # =========================================================================
+    # EJEMPLO 1: Costo de cada gráfica
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📈 {len(graficas)} GRÁFICAS SOBRE {N_FILAS:,} FILAS")
+    print("=" * 60)
+
+    tiempos = []
+    for config in graficas:
+        spec = spec_from_config(df, config)
+        inicio = time.perf_counter()
+        imagen = render_chart(spec)
+        tiempos.append(time.perf_counter() - inicio)
+        print(f"   {config.title:<32} {len(spec):>3} puntos  {tiempos[-1]:.2f}s  {len(imagen) / 1024:6.1f} KB")
+    print(f"\n   Suma: {sum(tiempos):.2f}s  |  Más lenta: {max(tiempos):.2f}s")
+
+    # =========================================================================
+    # EJEMPLO 2: Reporte secuencial vs. pool de procesos
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("⚙️  REPORTE COMPLETO")
+    print("=" * 60)
+
+    workers = min(len(graficas), os.cpu_count() or 1)
+    print(f"   CPUs disponibles: {os.cpu_count()}  |  Procesos del pool: {workers}")
+
+    qry = PerfQryDoc(df, llm=llm)
+    template = qry.create_template().with_colors("#003366").with_charts(graficas)
+    inicio = time.perf_counter()
+    qry.generate_report_with_builder(
+        OUTPUT_DIR / "07_secuencial.pdf", template=template, title="Secuencial", summary=RESUMEN
+    )
+    secuencial = time.perf_counter() - inicio
+    print(f"   Secuencial:        {secuencial:.2f}s")
+
+    with PerfQryDoc(df, llm=llm, chart_workers=workers) as qry_pool:
+        inicio = time.perf_counter()
+        qry_pool.chart_pool  # Arranque y calentamiento fuera de la medición
+        print(f"   Arranque del pool: {time.perf_counter() - inicio:.2f}s (una sola vez)")
+
+        template = qry_pool.create_template().with_colors("#003366").with_charts(graficas)
+        inicio = time.perf_counter()
+        qry_pool.generate_report_with_builder(
+            OUTPUT_DIR / "07_paralelo.pdf", template=template, title="Paralelo", summary=RESUMEN
+        )
+        paralelo = time.perf_counter() - inicio
+        print(f"   Pool de procesos:  {paralelo:.2f}s")
+
+    if workers == 1:
+        print("\n   💡 Con una sola CPU no hay paralelismo; en una máquina con varios")
+        print("      núcleos el tiempo de gráficas se acerca al de la más lenta.")
+
+    # =========================================================================
+    # EJEMPLO 3: Pool reutilizable fuera de QryDoc
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧩 POOL REUTILIZABLE")
+    print("=" * 60)
+
+    specs = [spec_from_config(df, config) for config in graficas[:3]]
+    with ChartRenderPool(workers=workers) as pool:
+        imagenes = pool.render_many(specs)
+    for spec, imagen in zip(specs, imagenes):
+        print(f"   {spec.title:<32} {len(imagen) / 1024:6.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
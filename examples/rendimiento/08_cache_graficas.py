@@ -0,0 +1,131 @@
+"""
+Ejemplo 08: Caché de Gráficas por Contenido
+===========================================
+
+Este ejemplo demuestra cómo reutilizar imágenes de gráficas entre
+reportes y ejecuciones con `ChartCache`, en lugar de renderizar cada vez
+una imagen nueva con nombre aleatorio.
+
+Características demostradas:
+- Clave por contenido: tipo, título, serie, colores, tamaño y DPI
+- Reutilización dentro de un reporte, entre reportes y entre instancias
+- Memoria acotada con desalojo LRU y directorio opcional en disco
+- Gráficas del LLM movidas de `exports/charts/temp_chart_<uuid>.png`
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import ChartConfig
+
+from perf import ChartCache, PerfQryDoc, StandInLLM
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+CACHE_DIR = OUTPUT_DIR / "chart_cache"
+
+RESUMEN = "Resumen de ventas generado para la comparación de rendimiento."
+
+CODIGO_GRAFICA = '''import matplotlib.pyplot as plt
+df = execute_sql_query("SELECT region, SUM(cantidad) AS total FROM {table} GROUP BY region")
+plt.figure(figsize=(6, 4))
+plt.bar(df["region"], df["total"])
+plt.savefig("grafica.png")
+result = {{"type": "plot", "value": "grafica.png"}}'''
+
+
+def responder(prompt: str) -> str:
+    """LLM de reemplazo: una gráfica de barras con el código de PandasAI."""
+    tabla = prompt.split('table_name="', 1)[-1].split('"', 1)[0]
+    return CODIGO_GRAFICA.format(table=tabla)
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv("examples/data/ventas.csv")
+    df = pd.concat([df] * 5000, ignore_index=True)
+
+    graficas = [
+        ChartConfig(chart_type="bar", title="Ventas por Región", group_by="region",
+                    value_column="cantidad", color="#003366"),
+        ChartConfig(chart_type="pie", title="Distribución por Categoría", group_by="categoria",
+                    value_column="cantidad"),
+        ChartConfig(chart_type="barh", title="Top Vendedores", group_by="vendedor",
+                    value_column="cantidad", color="#5C2D91"),
+    ]
+
+    # =========================================================================
+    # EJEMPLO 1: Reportes repetidos
+    # =========================================================================
+
+    print("=" * 60)
+    print("🗃️  REPORTES REPETIDOS")
+    print("=" * 60)
+
+    cache = ChartCache(max_bytes=16 * 1024 * 1024, directory=CACHE_DIR)
+    qry = PerfQryDoc(df, llm=StandInLLM("local", latency=0.1), chart_cache=cache)
+    template = qry.create_template().with_colors("#003366").with_charts(graficas)
+
+    for intento in (1, 2, 3):
+        inicio = time.perf_counter()
+        qry.generate_report_with_builder(
+            OUTPUT_DIR / f"08_reporte_{intento}.pdf", template=template, summary=RESUMEN
+        )
+        print(f"   Reporte {intento}: {time.perf_counter() - inicio:.2f}s  "
+              f"| aciertos {cache.hits}, fallos {cache.misses}")
+
+    # =========================================================================
+    # EJEMPLO 2: generate_chart con caché
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📊 GENERATE_CHART")
+    print("=" * 60)
+
+    for intento in (1, 2):
+        inicio = time.perf_counter()
+        qry.generate_chart(OUTPUT_DIR / "08_grafica.png", chart_type="bar",
+                           group_by="producto", value_column="cantidad")
+        print(f"   Intento {intento}: {(time.perf_counter() - inicio) * 1000:.1f} ms")
+
+    # =========================================================================
+    # EJEMPLO 3: Otra instancia con el mismo directorio
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("💾 OTRA EJECUCIÓN")
+    print("=" * 60)
+
+    otra_cache = ChartCache(directory=CACHE_DIR)
+    otro = PerfQryDoc(df, llm=StandInLLM("local", latency=0.1), chart_cache=otra_cache)
+    inicio = time.perf_counter()
+    otro.generate_report_with_builder(
+        OUTPUT_DIR / "08_otra_ejecucion.pdf", template=template, summary=RESUMEN
+    )
+    print(f"   Reporte: {time.perf_counter() - inicio:.2f}s  "
+          f"| aciertos desde disco {otra_cache.hits}, fallos {otra_cache.misses}")
+    print(f"   Imágenes en {CACHE_DIR}: {len(list(CACHE_DIR.glob('*.png')))}")
+
+    # =========================================================================
+    # EJEMPLO 4: Gráficas generadas por el LLM
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧹 GRÁFICAS TEMPORALES DE PANDASAI")
+    print("=" * 60)
+
+    qry_llm = PerfQryDoc("examples/data/ventas.csv", llm=StandInLLM("local", latency=0.1, answer=responder),
+                         chart_cache=cache)
+    temporales = Path("exports/charts")
+    antes = len(list(temporales.glob("temp_chart_*.png"))) if temporales.exists() else 0
+    for _ in range(3):
+        respuesta = qry_llm.ask("Grafica el total de cantidad por región")
+    despues = len(list(temporales.glob("temp_chart_*.png"))) if temporales.exists() else 0
+    print(f"   Respuesta: {respuesta}")
+    print(f"   temp_chart_*.png nuevos en exports/charts: {despues - antes}")
+
+
+if __name__ == "__main__":
+    main()
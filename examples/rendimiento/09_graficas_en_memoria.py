@@ -0,0 +1,113 @@
+"""
+Ejemplo 09: Gráficas en Memoria
+===============================
+
+Este ejemplo demuestra cómo generar reportes con gráficas sin escribir
+archivos temporales: las imágenes se renderizan en buffers en memoria y
+se entregan directamente a los flowables de ReportLab.
+
+Características demostradas:
+- `generate_report()` y `generate_report_with_builder()` sin archivos PNG
+- `chart_image()` para obtener los bytes de una gráfica
+- Escritura a disco opcional con `generate_chart()` o `temp_dir`
+- Reportes concurrentes sin colisiones en directorios compartidos
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+from matplotlib.figure import Figure
+
+from qry_doc import ChartConfig, QryDoc
+
+from perf import PerfQryDoc, StandInLLM
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+N_REPORTES = 8
+
+RESUMEN = "Resumen de ventas generado para la comparación de rendimiento."
+
+
+def contar_escrituras():
+    """Cuenta las llamadas a savefig que escriben a un archivo."""
+    escrituras = []
+    original = Figure.savefig
+
+    def savefig(self, fname, *args, **kwargs):
+        if isinstance(fname, (str, Path)):
+            escrituras.append(str(fname))
+        return original(self, fname, *args, **kwargs)
+
+    Figure.savefig = savefig
+    return escrituras
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv("examples/data/ventas.csv")
+    llm = StandInLLM("local", latency=0.05)
+    escrituras = contar_escrituras()
+
+    # =========================================================================
+    # EJEMPLO 1: generate_report con archivo temporal vs. en memoria
+    # =========================================================================
+
+    print("=" * 60)
+    print("💾 GENERATE_REPORT")
+    print("=" * 60)
+
+    for nombre, clase in (("QryDoc", QryDoc), ("PerfQryDoc", PerfQryDoc)):
+        qry = clase(df, llm=llm)
+        escrituras.clear()
+        inicio = time.perf_counter()
+        for i in range(N_REPORTES):
+            qry.generate_report("ventas por región", OUTPUT_DIR / f"09_{nombre}_{i}.pdf",
+                                group_by="region", value_column="cantidad")
+        segundos = time.perf_counter() - inicio
+        print(f"   {nombre:<11} {segundos:5.2f}s  | PNG escritos a disco: {len(escrituras)}")
+
+    # =========================================================================
+    # EJEMPLO 2: Reportes concurrentes con varias gráficas
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧵 REPORTES CONCURRENTES")
+    print("=" * 60)
+
+    qry = PerfQryDoc(df, llm=llm)
+    graficas = [
+        ChartConfig(chart_type="bar", title="Ventas por Región", group_by="region", value_column="cantidad"),
+        ChartConfig(chart_type="pie", title="Por Categoría", group_by="categoria", value_column="cantidad"),
+    ]
+    template = qry.create_template().with_charts(graficas)
+
+    def generar(i: int) -> str:
+        return qry.generate_report_with_builder(
+            OUTPUT_DIR / f"09_concurrente_{i}.pdf", template=template, title=f"Reporte {i}", summary=RESUMEN
+        )
+
+    escrituras.clear()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        resultados = list(executor.map(generar, range(N_REPORTES)))
+    print(f"   {len(resultados)} reportes generados  | PNG escritos a disco: {len(escrituras)}")
+
+    # =========================================================================
+    # EJEMPLO 3: Bytes de una gráfica y escritura opcional
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🖼️  BYTES DE UNA GRÁFICA")
+    print("=" * 60)
+
+    png = qry.chart_image("bar", group_by="producto", value_column="cantidad")
+    print(f"   chart_image(): {len(png) / 1024:.1f} KB en memoria")
+    ruta = qry.generate_chart(OUTPUT_DIR / "09_productos.png", "bar",
+                              group_by="producto", value_column="cantidad")
+    print(f"   generate_chart(): {ruta} (misma imagen, desde la caché)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Ejemplo 10: Gráficas Vectoriales
+================================
+
+Este ejemplo compara las gráficas PNG de matplotlib con las gráficas
+vectoriales dibujadas directamente con ReportLab.
+
+Características demostradas:
+- `chart_backend="vector"` en `PerfQryDoc`
+- Tamaño del PDF con 1, 4 y 8 gráficas en cada backend
+- Tiempo de generación de cada reporte
+- `draw_chart()` para obtener el `Drawing` de una gráfica
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import ChartConfig, DEFAULT_TEMPLATE
+
+from perf import PerfQryDoc, StandInLLM, draw_chart, spec_from_config
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+
+RESUMEN = "Resumen de ventas generado para la comparación de rendimiento."
+
+GRAFICAS = [
+    ChartConfig(chart_type="bar", title="Ventas por Región", group_by="region", value_column="cantidad"),
+    ChartConfig(chart_type="pie", title="Por Categoría", group_by="categoria", value_column="cantidad"),
+    ChartConfig(chart_type="barh", title="Por Vendedor", group_by="vendedor", value_column="cantidad"),
+    ChartConfig(chart_type="bar", title="Por Producto", group_by="producto", value_column="cantidad"),
+]
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv("examples/data/ventas.csv")
+    llm = StandInLLM("local", latency=0.05)
+
+    # =========================================================================
+    # EJEMPLO 1: Tamaño y tiempo por número de gráficas
+    # =========================================================================
+
+    print("=" * 60)
+    print("📐 RASTER VS. VECTORIAL")
+    print("=" * 60)
+    print(f"   {'gráficas':>8} | {'raster':>18} | {'vector':>18}")
+
+    for n_graficas in (1, 4, 8):
+        charts = (GRAFICAS * 2)[:n_graficas]
+        fila = []
+        for backend in ("raster", "vector"):
+            with PerfQryDoc(df, llm=llm, chart_backend=backend) as qry:
+                template = qry.create_template().with_charts(charts)
+                ruta = OUTPUT_DIR / f"10_{backend}_{n_graficas}.pdf"
+                inicio = time.perf_counter()
+                qry.generate_report_with_builder(ruta, template=template, summary=RESUMEN)
+                segundos = time.perf_counter() - inicio
+            fila.append(f"{ruta.stat().st_size / 1024:7.1f} KB {segundos:6.2f}s")
+        print(f"   {n_graficas:>8} | {fila[0]:>18} | {fila[1]:>18}")
+
+    # =========================================================================
+    # EJEMPLO 2: generate_report con una gráfica vectorial
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 GENERATE_REPORT VECTORIAL")
+    print("=" * 60)
+
+    with PerfQryDoc(df, llm=llm, chart_backend="vector") as qry:
+        resultado = qry.generate_report(
+            "ventas por región", OUTPUT_DIR / "10_generate_report.pdf",
+            chart_type="bar", group_by="region", value_column="cantidad",
+        )
+        print(f"   {resultado}")
+
+    # =========================================================================
+    # EJEMPLO 3: Drawing de una gráfica
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("✏️  DRAWING DE REPORTLAB")
+    print("=" * 60)
+
+    spec = spec_from_config(df, GRAFICAS[0])
+    drawing = draw_chart(spec, DEFAULT_TEMPLATE.content_width)
+    print(f"   {spec.title}: {drawing.width:.0f} x {drawing.height:.0f} pt, "
+          f"{len(spec)} barras")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Ejemplo 11: Agregaciones Compartidas
+====================================
+
+Este ejemplo demuestra cómo las gráficas de un reporte comparten sus
+agregaciones: las que se repiten se calculan una vez y cada columna de
+agrupación se recorre una sola vez.
+
+Características demostradas:
+- `SharedAggregates` con `pd.factorize` y `np.bincount`
+- Tiempo de preparación con 1 a 12 gráficas sobre las mismas columnas
+- Resultados idénticos a `groupby`
+- Reutilización en tablas y en el prompt del resumen
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from qry_doc import ChartConfig
+
+from perf import SharedAggregates, StandInLLM, PerfQryDoc
+from perf.aggregation import aggregation_key
+
+
+N_FILAS = 1_000_000
+TIPOS = ("bar", "pie", "barh")
+COLUMNAS = ("region", "categoria", "vendedor")
+
+
+def crear_datos() -> pd.DataFrame:
+    """DataFrame de ventas sintético."""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        "region": rng.choice(["Norte", "Sur", "Este", "Oeste"], N_FILAS),
+        "categoria": rng.choice(["Electrónica", "Accesorios", "Hogar"], N_FILAS),
+        "vendedor": rng.choice([f"Vendedor {i}" for i in range(50)], N_FILAS),
+        "cantidad": rng.integers(1, 20, N_FILAS),
+    })
+
+
+def crear_graficas(n: int) -> list[ChartConfig]:
+    """n gráficas que reutilizan las tres columnas de agrupación."""
+    return [
+        ChartConfig(
+            chart_type=TIPOS[i % len(TIPOS)],
+            title=f"Gráfica {i + 1}",
+            group_by=COLUMNAS[i % len(COLUMNAS)],
+            value_column="cantidad",
+        )
+        for i in range(n)
+    ]
+
+
+def main():
+    df = crear_datos()
+
+    # =========================================================================
+    # EJEMPLO 1: groupby por gráfica vs. agregaciones compartidas
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📊 PREPARACIÓN DE GRÁFICAS ({N_FILAS:,} filas)")
+    print("=" * 60)
+    print(f"   {'gráficas':>8} | {'groupby':>9} | {'compartidas':>11} | pasadas")
+
+    for n_graficas in (1, 3, 6, 12):
+        charts = crear_graficas(n_graficas)
+
+        inicio = time.perf_counter()
+        for config in charts:
+            df.groupby(config.group_by)[config.value_column].sum()
+        t_groupby = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        compartidas = SharedAggregates.from_charts(df, charts)
+        for config in charts:
+            compartidas.get(*aggregation_key(config))
+        t_compartidas = time.perf_counter() - inicio
+
+        print(f"   {n_graficas:>8} | {t_groupby:8.3f}s | {t_compartidas:10.3f}s | {compartidas.passes}")
+
+    # =========================================================================
+    # EJEMPLO 2: Mismos resultados que groupby
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("✅ RESULTADOS")
+    print("=" * 60)
+
+    compartidas = SharedAggregates(df)
+    for columna in COLUMNAS:
+        for agg in ("sum", "mean", "count", "min", "max"):
+            esperado = df.groupby(columna)["cantidad"].agg(agg)
+            obtenido = compartidas.get(columna, "cantidad", agg)
+            assert np.allclose(esperado.to_numpy(), obtenido.to_numpy())
+            assert list(esperado.index) == list(obtenido.index)
+    print(f"   {len(compartidas)} agregaciones idénticas a groupby "
+          f"con {compartidas.passes} pasadas")
+    print(compartidas.frame("region", "cantidad", ("sum", "mean", "count")).to_string(index=False))
+
+    # =========================================================================
+    # EJEMPLO 3: Reportes que comparten agregaciones
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 REPORTES")
+    print("=" * 60)
+
+    ventas = pd.read_csv("examples/data/ventas.csv")
+    llm = StandInLLM("local", latency=0.05)
+    with PerfQryDoc(ventas, llm=llm) as qry:
+        template = qry.create_template().with_charts(crear_graficas(6))
+        qry.generate_report_with_builder("output/rendimiento/11_reporte.pdf", template=template)
+        qry.generate_report("cantidad por región", "output/rendimiento/11_generate_report.pdf",
+                            group_by="region", value_column="cantidad")
+        print(f"   Agregaciones calculadas: {len(qry.aggregates)} "
+              f"({qry.aggregates.passes} pasadas)")
+        print("   Incluidas en el prompt del resumen:")
+        for linea in qry.aggregates.to_prompt(max_groups=3).splitlines():
+            print(f"     {linea}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+"""
+Ejemplo 12: Gráficas para Datos Grandes
+=======================================
+
+Este ejemplo demuestra los tipos de gráfica de `PerfChartConfig`, que
+dibujan un número acotado de elementos sin importar cuántas filas haya.
+
+Características demostradas:
+- Línea con reducción LTTB a `max_points` puntos
+- Histograma con `np.histogram`
+- Dispersión como densidad 2-D cuando hay muchos puntos
+- Barras agrupadas y "Otros" automático en barras y pastel
+- Comparación con graficar todas las filas directamente
+"""
+
+import io
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from perf import PerfChartConfig, PerfQryDoc, SharedAggregates, StandInLLM, render_chart, spec_for_chart
+
+
+N_FILAS = 1_000_000
+
+
+def crear_datos() -> pd.DataFrame:
+    """Lecturas de sensores sintéticas, una por segundo."""
+    rng = np.random.default_rng(7)
+    tiempo = pd.date_range("2024-01-01", periods=N_FILAS, freq="s")
+    tendencia = np.sin(np.linspace(0, 20, N_FILAS)) * 10
+    temperatura = 20 + tendencia + rng.normal(0, 2, N_FILAS)
+    # Pocas estaciones concentran la mayoría de las lecturas
+    estaciones = [f"Estación {i:04d}" for i in range(3000)]
+    pesos = 1 / np.arange(1, len(estaciones) + 1)
+    return pd.DataFrame({
+        "tiempo": tiempo,
+        "temperatura": temperatura,
+        "humedad": 60 - temperatura + rng.normal(0, 5, N_FILAS),
+        "estacion": rng.choice(estaciones, N_FILAS, p=pesos / pesos.sum()),
+        "zona": rng.choice(["Norte", "Sur", "Este", "Oeste", "Centro"], N_FILAS),
+        "consumo": rng.gamma(2.0, 3.0, N_FILAS),
+    })
+
+
+GRAFICAS = [
+    PerfChartConfig(chart_type="line", title="Temperatura", group_by="tiempo",
+                    value_column="temperatura", agg="mean"),
+    PerfChartConfig(chart_type="hist", title="Consumo", value_column="consumo", bins=40),
+    PerfChartConfig(chart_type="scatter", title="Temperatura vs. Humedad",
+                    group_by="temperatura", value_column="humedad"),
+    PerfChartConfig(chart_type="grouped_bar", title="Consumo por Estación y Zona",
+                    group_by="estacion", series_column="zona", value_column="consumo", top_n=8),
+    PerfChartConfig(chart_type="bar", title="Consumo por Estación",
+                    group_by="estacion", value_column="consumo"),
+    PerfChartConfig(chart_type="pie", title="Lecturas por Estación",
+                    group_by="estacion", value_column="consumo", agg="count"),
+]
+
+
+def grafica_directa(df: pd.DataFrame, config: PerfChartConfig) -> bytes:
+    """Grafica todas las filas, como los ejemplos que usan matplotlib directamente."""
+    fig, ax = plt.subplots(figsize=(10, 6))
+    if config.chart_type == "line":
+        ax.plot(df[config.group_by], df[config.value_column])
+    elif config.chart_type == "scatter":
+        ax.scatter(df[config.group_by], df[config.value_column], alpha=0.5, s=10)
+    elif config.chart_type == "hist":
+        ax.hist(df[config.value_column], bins=config.bins)
+    else:
+        serie = df.groupby(config.group_by)[config.value_column].agg(config.agg)
+        if config.chart_type == "bar":
+            ax.bar(serie.index, serie.values)
+        else:
+            return b""  # Miles de porciones o grupos: no se grafican directamente
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=150)
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def main():
+    df = crear_datos()
+
+    # =========================================================================
+    # EJEMPLO 1: Todas las filas vs. series acotadas
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📈 GRÁFICAS SOBRE {N_FILAS:,} FILAS")
+    print("=" * 60)
+    print(f"   {'tipo':<12} | {'directa':>8} | {'preparar':>8} | {'renderizar':>10} | elementos")
+
+    aggregates = SharedAggregates(df)
+    for config in GRAFICAS:
+        inicio = time.perf_counter()
+        directa = grafica_directa(df, config)
+        t_directa = f"{time.perf_counter() - inicio:7.2f}s" if directa else "-"
+
+        inicio = time.perf_counter()
+        spec = spec_for_chart(df, config, aggregates)
+        t_preparar = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        render_chart(spec)
+        t_render = time.perf_counter() - inicio
+
+        elementos = spec.values.size
+        print(f"   {config.chart_type:<12} | {t_directa:>8} | {t_preparar:7.3f}s | "
+              f"{t_render:9.3f}s | {elementos:,}")
+
+    # =========================================================================
+    # EJEMPLO 2: Grupos mayores y "Otros"
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🥧 TOP-N Y \"OTROS\"")
+    print("=" * 60)
+
+    spec = spec_for_chart(df, GRAFICAS[5], aggregates)
+    for etiqueta, valor in zip(spec.labels, spec.values):
+        print(f"   {etiqueta:<15} {valor:>10,.0f}")
+
+    # =========================================================================
+    # EJEMPLO 3: Reporte con los tipos nuevos
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 REPORTE")
+    print("=" * 60)
+
+    llm = StandInLLM("local", latency=0.05)
+    with PerfQryDoc(df, llm=llm, chart_workers=2) as qry:
+        template = qry.create_template().with_charts(GRAFICAS)
+        inicio = time.perf_counter()
+        resultado = qry.generate_report_with_builder(
+            "output/rendimiento/12_datos_grandes.pdf", template=template,
+            summary="Lecturas de sensores de un año.",
+        )
+        print(f"   {resultado} ({time.perf_counter() - inicio:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
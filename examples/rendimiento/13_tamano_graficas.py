@@ -0,0 +1,94 @@
+"""
+Ejemplo 13: Tamaño de Gráficas según la Plantilla
+=================================================
+
+Este ejemplo demuestra cómo renderizar cada gráfica con los píxeles que
+necesita su tamaño en la página, en lugar de renderizarla a 150 DPI y
+dejar que ReportLab la reduzca.
+
+Características demostradas:
+- `fit_to_frame()` para ajustar el DPI al ancho de la plantilla
+- Perfiles de resolución: 'draft', 'screen' y 'print'
+- Tiempo de renderizado, tamaño del PNG y tamaño del PDF
+"""
+
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import ChartConfig, DEFAULT_TEMPLATE
+
+from perf import DPI_PROFILES, PerfQryDoc, StandInLLM, fit_to_frame, render_chart, spec_from_config
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+ALTO_MAXIMO = 280  # Igual que add_chart en examples/v0.1.3/08_maritimo_completo.py
+REPETICIONES = 5
+
+GRAFICAS = [
+    ChartConfig(chart_type="bar", title="Ventas por Región", group_by="region",
+                value_column="cantidad", figsize=(12, 6)),
+    ChartConfig(chart_type="barh", title="Por Vendedor", group_by="vendedor",
+                value_column="cantidad", figsize=(12, 6)),
+    ChartConfig(chart_type="line", title="Por Fecha", group_by="fecha",
+                value_column="cantidad", figsize=(12, 6)),
+    ChartConfig(chart_type="pie", title="Por Categoría", group_by="categoria",
+                value_column="cantidad", figsize=(8, 8)),
+]
+
+
+def medir(spec) -> tuple[float, int]:
+    """Tiempo medio de renderizado y bytes del PNG."""
+    inicio = time.perf_counter()
+    for _ in range(REPETICIONES):
+        png = render_chart(spec)
+    return (time.perf_counter() - inicio) / REPETICIONES, len(png)
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv("examples/data/ventas.csv")
+    ancho = DEFAULT_TEMPLATE.content_width
+
+    # =========================================================================
+    # EJEMPLO 1: 150 DPI fijos vs. DPI según el espacio en la página
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📏 GRÁFICA DE 12x6 PULGADAS EN {ancho:.0f}x{ALTO_MAXIMO} PUNTOS")
+    print("=" * 60)
+
+    spec = spec_from_config(df, GRAFICAS[0])
+    t_base, bytes_base = medir(spec)
+    print(f"   {'150 DPI fijos':<16} {spec.figsize[0] * spec.dpi:>5.0f} px  "
+          f"{t_base * 1000:6.0f} ms  {bytes_base / 1024:6.1f} KB")
+
+    for perfil in DPI_PROFILES:
+        ajustada = fit_to_frame(spec, ancho, ALTO_MAXIMO, dpi=perfil)
+        t, tamano = medir(ajustada)
+        print(f"   {perfil + ' (' + str(DPI_PROFILES[perfil]) + ' DPI)':<16} "
+              f"{ajustada.figsize[0] * ajustada.dpi:>5.0f} px  {t * 1000:6.0f} ms  "
+              f"{tamano / 1024:6.1f} KB  ({t_base / t:.1f}x)")
+
+    # =========================================================================
+    # EJEMPLO 2: Reportes completos por perfil
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 REPORTES POR PERFIL")
+    print("=" * 60)
+
+    llm = StandInLLM("local", latency=0.05)
+    for perfil in DPI_PROFILES:
+        with PerfQryDoc(df, llm=llm, chart_dpi=perfil) as qry:
+            template = qry.create_template().with_charts(GRAFICAS)
+            ruta = OUTPUT_DIR / f"13_{perfil}.pdf"
+            inicio = time.perf_counter()
+            qry.generate_report_with_builder(ruta, template=template, summary="Resumen de ventas.")
+            segundos = time.perf_counter() - inicio
+        print(f"   {perfil:<7} {segundos:5.2f}s  {ruta.stat().st_size / 1024:7.1f} KB  → {ruta}")
+
+
+if __name__ == "__main__":
+    main()
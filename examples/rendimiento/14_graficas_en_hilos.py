@@ -0,0 +1,163 @@
+"""
+Ejemplo 14: Gráficas en Varios Hilos
+====================================
+
+Este ejemplo demuestra que `render_chart` se puede llamar desde varios
+hilos a la vez: cada gráfica usa su propia `Figure` con lienzo Agg y un
+`ChartStyle` explícito, sin pyplot ni estado global de matplotlib.
+
+Características demostradas:
+- Prueba de estrés: las imágenes de 8 hilos son idénticas a las seriales
+- Un `plt.style.use()` global no cambia las imágenes
+- `ChartStyle` para cambiar fuentes y colores de una gráfica
+- Reportes completos generados desde varios hilos
+"""
+
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+
+import matplotlib
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from qry_doc import ChartConfig
+
+from perf import ChartStyle, PerfChartConfig, PerfQryDoc, StandInLLM, render_chart, spec_for_chart
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+HILOS = 8
+RONDAS = 10
+
+GRAFICAS = [
+    PerfChartConfig(chart_type="bar", title="Ventas por Región", group_by="region",
+                    value_column="cantidad"),
+    PerfChartConfig(chart_type="barh", title="Por Vendedor", group_by="vendedor",
+                    value_column="cantidad"),
+    PerfChartConfig(chart_type="line", title="Por Fecha", group_by="fecha",
+                    value_column="cantidad"),
+    PerfChartConfig(chart_type="pie", title="Por Categoría", group_by="categoria",
+                    value_column="cantidad", figsize=(8, 8)),
+    PerfChartConfig(chart_type="scatter", title="Cantidad vs. Precio", group_by="precio_unitario",
+                    value_column="cantidad"),
+    PerfChartConfig(chart_type="area", title="Acumulado por Fecha", group_by="fecha",
+                    value_column="cantidad"),
+    PerfChartConfig(chart_type="hist", title="Distribución de Cantidad",
+                    value_column="cantidad", bins=12),
+    PerfChartConfig(chart_type="grouped_bar", title="Región y Categoría", group_by="region",
+                    series_column="categoria", value_column="cantidad"),
+]
+
+
+def huella(png: bytes) -> str:
+    return hashlib.sha256(png).hexdigest()[:12]
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv("examples/data/ventas.csv")
+    specs = [replace(spec_for_chart(df, grafica), dpi=72) for grafica in GRAFICAS]
+
+    # =========================================================================
+    # EJEMPLO 1: Línea base serial
+    # =========================================================================
+
+    print("=" * 60)
+    print("🧵 LÍNEA BASE SERIAL")
+    print("=" * 60)
+
+    inicio = time.perf_counter()
+    base = [huella(render_chart(spec)) for spec in specs]
+    t_serial = time.perf_counter() - inicio
+    for spec, h in zip(specs, base):
+        print(f"   {spec.chart_type:<12} {h}")
+    print(f"   {len(specs)} gráficas en {t_serial:.2f}s")
+
+    # =========================================================================
+    # EJEMPLO 2: Prueba de estrés con varios hilos
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print(f"🔥 {HILOS} HILOS x {RONDAS} RONDAS")
+    print("=" * 60)
+
+    trabajos = [i for _ in range(RONDAS) for i in range(len(specs))]
+    hilos_usados = set()
+
+    def renderizar(i: int) -> tuple[int, str]:
+        hilos_usados.add(threading.get_ident())
+        return i, huella(render_chart(specs[i]))
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=HILOS) as executor:
+        resultados = list(executor.map(renderizar, trabajos))
+    segundos = time.perf_counter() - inicio
+
+    diferentes = sum(1 for i, h in resultados if h != base[i])
+    print(f"   Renderizadas: {len(resultados)} en {len(hilos_usados)} hilos, {segundos:.2f}s")
+    print(f"   Distintas a la línea base: {diferentes}")
+    print(f"   {'✅ Todas idénticas' if diferentes == 0 else '❌ Hay imágenes distintas'}")
+
+    # =========================================================================
+    # EJEMPLO 3: El estilo global de matplotlib no afecta
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🎨 ESTILO GLOBAL DE MATPLOTLIB")
+    print("=" * 60)
+
+    with matplotlib.rc_context():
+        plt.style.use("dark_background")
+        matplotlib.rcParams["font.size"] = 6
+        with ThreadPoolExecutor(max_workers=HILOS) as executor:
+            con_estilo = list(executor.map(lambda spec: huella(render_chart(spec)), specs))
+    iguales = sum(1 for a, b in zip(base, con_estilo) if a == b)
+    print("   plt.style.use('dark_background') y font.size=6 antes de renderizar")
+    print(f"   Imágenes iguales a la línea base: {iguales}/{len(specs)}")
+
+    estilo = ChartStyle(font_family="DejaVu Serif", font_size=12, background="#f7f7f2",
+                        text_color="#333333", axes_color="#666666")
+    png = render_chart(replace(specs[0], style=estilo, dpi=100))
+    ruta = OUTPUT_DIR / "14_estilo_propio.png"
+    ruta.write_bytes(png)
+    print(f"   ChartStyle propio: {huella(png)} → {ruta}")
+
+    # =========================================================================
+    # EJEMPLO 4: Reportes generados desde varios hilos
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 REPORTES EN PARALELO (HILOS)")
+    print("=" * 60)
+
+    llm = StandInLLM("local", latency=0.05)
+    regiones = sorted(df["region"].unique())
+
+    def reporte(region: str) -> tuple[str, float, Path]:
+        datos = df[df["region"] == region]
+        inicio = time.perf_counter()
+        with PerfQryDoc(datos, llm=llm) as qry:
+            template = qry.create_template().with_charts([
+                ChartConfig(chart_type="bar", title=f"{region}: por Categoría",
+                            group_by="categoria", value_column="cantidad"),
+                ChartConfig(chart_type="line", title=f"{region}: por Fecha",
+                            group_by="fecha", value_column="cantidad"),
+            ])
+            ruta = OUTPUT_DIR / f"14_{region.lower()}.pdf"
+            qry.generate_report_with_builder(ruta, template=template,
+                                             summary=f"Ventas de la región {region}.")
+        return region, time.perf_counter() - inicio, ruta
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(regiones)) as executor:
+        for region, segundos, ruta in executor.map(reporte, regiones):
+            print(f"   {region:<8} {segundos:5.2f}s  {ruta.stat().st_size / 1024:6.1f} KB  → {ruta}")
+    print(f"   Total: {time.perf_counter() - inicio:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
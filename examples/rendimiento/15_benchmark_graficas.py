@@ -0,0 +1,97 @@
+"""
+Ejemplo 15: Benchmark de Gráficas
+=================================
+
+Este ejemplo mide cada tipo de gráfica con datos sintéticos de 1.000 a
+10 millones de filas y de 10 a 100.000 grupos, separando el tiempo de
+agregación, renderizado, codificación PNG e inserción en el PDF.
+
+Características demostradas:
+- `synthetic_sales()` con la forma de `examples/data/ventas.csv`
+- `run_chart_benchmark()` con todos los tipos y los backends raster y vector
+- `QryDoc.generate_chart` de la versión instalada como referencia
+- Resultados en JSON y comparación con una ejecución anterior
+
+La primera ejecución guarda la línea base; las siguientes (por ejemplo,
+después de actualizar qry-doc o matplotlib) muestran las etapas que se
+volvieron más lentas.
+"""
+
+import shutil
+import time
+from pathlib import Path
+
+from perf import ChartTiming, compare_benchmarks, load_benchmark, run_chart_benchmark, save_benchmark
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+RESULTADOS = OUTPUT_DIR / "15_benchmark_graficas.json"
+LINEA_BASE = OUTPUT_DIR / "15_benchmark_base.json"
+
+FILAS = (1_000, 100_000, 1_000_000, 10_000_000)
+CATEGORIAS = (10, 1_000, 100_000)
+REPETICIONES = 3
+
+
+def ms(segundos) -> str:
+    return "      -" if segundos is None else f"{segundos * 1000:7.1f}"
+
+
+def mostrar(t: ChartTiming) -> None:
+    if t.error:
+        print(f"   {t.chart_type:<12} {t.backend:<7} {t.rows:>10,} {t.categories:>8,}  ❌ {t.error}")
+        return
+    print(f"   {t.chart_type:<12} {t.backend:<7} {t.rows:>10,} {t.categories:>8,} "
+          f"{ms(t.aggregation)} {ms(t.render)} {ms(t.encode)} {ms(t.embed)} "
+          f"{ms(t.generate_chart)} {t.image_bytes / 1024:6.1f}")
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # =========================================================================
+    # EJEMPLO 1: Todas las gráficas en todos los tamaños
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"⏱️  BENCHMARK DE GRÁFICAS (ms, mejor de {REPETICIONES})")
+    print("=" * 60)
+    print(f"   {'Tipo':<12} {'Backend':<7} {'Filas':>10} {'Grupos':>8} "
+          f"{'agreg.':>7} {'render':>7} {'encode':>7} {'embed':>7} {'qry-doc':>7} {'KB':>6}")
+
+    inicio = time.perf_counter()
+    resultados = run_chart_benchmark(
+        rows=FILAS, categories=CATEGORIAS, repeat=REPETICIONES, on_result=mostrar,
+    )
+    print(f"\n   Total: {time.perf_counter() - inicio:.0f}s")
+    entorno = resultados["environment"]["packages"]
+    print(f"   qry-doc {entorno['qry-doc']}, matplotlib {entorno['matplotlib']}, "
+          f"reportlab {entorno['reportlab']}")
+    print(f"   📁 {save_benchmark(resultados, RESULTADOS)}")
+
+    # =========================================================================
+    # EJEMPLO 2: Comparación con la línea base
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📊 COMPARACIÓN CON LA LÍNEA BASE")
+    print("=" * 60)
+
+    if not LINEA_BASE.exists():
+        shutil.copyfile(RESULTADOS, LINEA_BASE)
+        print(f"   Línea base guardada en {LINEA_BASE}")
+        print("   Vuelva a ejecutar después de actualizar dependencias para comparar")
+        return
+
+    regresiones = compare_benchmarks(load_benchmark(LINEA_BASE), load_benchmark(RESULTADOS))
+    if not regresiones:
+        print("   ✅ Ninguna etapa es más de 10% más lenta")
+    for r in regresiones[:20]:
+        print(f"   ⚠️  {r['chart_type']:<12} {r['backend']:<7} {r['rows']:>10,} {r['categories']:>8,} "
+              f"{r['stage']:<14} {ms(r['baseline'])} → {ms(r['current'])} ms ({r['ratio']:.1f}x)")
+    if len(regresiones) > 20:
+        print(f"   ... y {len(regresiones) - 20} más")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Ejemplo 16: Tablas Grandes con Memoria Acotada
+==============================================
+
+Este ejemplo demuestra cómo incluir un anexo de 100.000 filas en un
+reporte. `ReportGenerator` arma una sola tabla de ReportLab con todas
+las celdas y la vuelve a partir en cada página; `PerfReportGenerator`
+usa `StreamingTable`, que formatea solo las filas de cada página.
+
+Características demostradas:
+- Tiempo y memoria de ReportGenerator vs. StreamingTable
+- Tiempo lineal en el número de filas
+- Memoria casi constante al crecer la tabla
+"""
+
+import time
+import tracemalloc
+from pathlib import Path
+
+from qry_doc.report_generator import ReportGenerator
+
+from perf import PerfReportGenerator, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+FILAS_COMPARACION = 3_000
+FILAS_ANEXO = (10_000, 30_000, 100_000)
+FILAS_MEMORIA = (5_000, 20_000)
+
+
+def datos(filas: int):
+    df = synthetic_sales(filas, categories=1_000)
+    df["fecha"] = df["fecha"].dt.date
+    return df
+
+
+def generar(generator, df) -> float:
+    """Segundos que tarda un reporte."""
+    inicio = time.perf_counter()
+    generator.build(title="Anexo de Ventas", summary="Detalle de todas las ventas.", dataframe=df)
+    return time.perf_counter() - inicio
+
+
+def pico_memoria(generator, df) -> float:
+    """Pico de memoria de un reporte en MB (tracemalloc lo hace más lento)."""
+    tracemalloc.start()
+    try:
+        generar(generator, df)
+        return tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # =========================================================================
+    # EJEMPLO 1: ReportGenerator vs. StreamingTable
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📋 TABLA DE {FILAS_COMPARACION:,} FILAS")
+    print("=" * 60)
+
+    df = datos(FILAS_COMPARACION)
+    original = OUTPUT_DIR / "16_tabla_original.pdf"
+    streaming = OUTPUT_DIR / "16_tabla_streaming.pdf"
+    t_base = generar(ReportGenerator(original), df)
+    mem_base = pico_memoria(ReportGenerator(original), df)
+    print(f"   ReportGenerator:      {t_base:6.2f}s  pico {mem_base:6.1f} MB")
+    t_perf = generar(PerfReportGenerator(streaming), df)
+    mem_perf = pico_memoria(PerfReportGenerator(streaming), df)
+    print(f"   PerfReportGenerator:  {t_perf:6.2f}s  pico {mem_perf:6.1f} MB  "
+          f"({t_base / t_perf:.1f}x más rápido)")
+
+    # =========================================================================
+    # EJEMPLO 2: Tiempo lineal en el número de filas
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📈 ANEXOS GRANDES")
+    print("=" * 60)
+
+    for filas in FILAS_ANEXO:
+        ruta = OUTPUT_DIR / f"16_anexo_{filas}.pdf"
+        segundos = generar(PerfReportGenerator(ruta), datos(filas))
+        print(f"   {filas:>8,} filas  {segundos:6.2f}s  {segundos / filas * 1_000_000:5.0f} ms/1000 filas  "
+              f"{ruta.stat().st_size / 1024 / 1024:5.1f} MB")
+
+    # =========================================================================
+    # EJEMPLO 3: Memoria casi constante
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧠 MEMORIA AL CRECER LA TABLA")
+    print("=" * 60)
+
+    for filas in FILAS_MEMORIA:
+        df = datos(filas)
+        ruta = OUTPUT_DIR / "16_memoria.pdf"
+        pico = pico_memoria(PerfReportGenerator(ruta), df)
+        print(f"   {filas:>8,} filas  pico {pico:6.1f} MB  "
+              f"(DataFrame: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB, "
+              f"PDF: {ruta.stat().st_size / 1024 / 1024:.1f} MB)")
+    print("   ReportLab guarda las páginas ya escritas hasta cerrar el PDF:")
+    print("   fuera de eso, la memoria no depende del número de filas")
+
+
+if __name__ == "__main__":
+    main()
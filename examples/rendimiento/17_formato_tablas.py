@@ -0,0 +1,140 @@
+"""
+Ejemplo 17: Formato de Tablas por Columnas
+==========================================
+
+Este ejemplo compara cómo arman una tabla `ReportGenerator` y
+`PerfReportGenerator`. El primero convierte cada celda por separado y
+crea una `Paragraph` para cada texto largo; el segundo formatea columna
+por columna, parte el texto largo en líneas simples y reutiliza el
+mismo `TableStyle` en todas las tablas de igual forma.
+
+Características demostradas:
+- Tiempo de armar la tabla y de la sección completa del reporte
+- `column_formats` para números, moneda y fechas
+- Un solo `TableStyle` por plantilla y tamaño de letra
+"""
+
+import time
+from pathlib import Path
+
+import numpy as np
+
+from qry_doc.report_generator import ReportGenerator
+
+from perf import PerfReportGenerator, synthetic_sales
+from perf.tables import table_style
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+FILAS = 1_000
+REPETICIONES = 5
+
+FORMATOS = {
+    "cantidad": "integer",
+    "precio_unitario": "currency",
+    "fecha": "%d/%m/%Y",
+}
+
+
+def datos(filas: int):
+    df = synthetic_sales(filas, categories=100)
+    df["fecha"] = df["fecha"].dt.date
+    df["nota"] = np.where(
+        np.arange(filas) % 3 == 0,
+        "Entrega programada para la siguiente semana en horario de oficina",
+        "OK",
+    )
+    return df
+
+
+def mejor(funcion) -> float:
+    """Mejor tiempo de varias ejecuciones, en segundos."""
+    tiempos = []
+    for _ in range(REPETICIONES):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return min(tiempos)
+
+
+def seccion(crear, df) -> float:
+    """Segundos que agrega la tabla a un reporte (con tabla menos sin tabla)."""
+    vacio = mejor(lambda: crear().build(title="Ventas", summary="Resumen.", dataframe=None))
+    lleno = mejor(lambda: crear().build(title="Ventas", summary="Resumen.", dataframe=df))
+    return lleno - vacio
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = datos(FILAS)
+    ruta = OUTPUT_DIR / "17_tabla.pdf"
+
+    generadores = {
+        "ReportGenerator": lambda: ReportGenerator(ruta),
+        "PerfReportGenerator": lambda: PerfReportGenerator(ruta),
+        "  + column_formats": lambda: PerfReportGenerator(ruta, column_formats=FORMATOS),
+    }
+
+    # =========================================================================
+    # EJEMPLO 1: Armar la tabla
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"🧱 ARMAR UNA TABLA DE {FILAS:,} FILAS (mejor de {REPETICIONES})")
+    print("=" * 60)
+
+    base = None
+    for nombre, crear in generadores.items():
+        generador = crear()
+        segundos = mejor(lambda: generador._auto_adjust_table(df))
+        base = base or segundos
+        print(f"   {nombre:<22} {segundos * 1000:7.1f} ms  ({base / segundos:.1f}x)")
+
+    # =========================================================================
+    # EJEMPLO 2: La sección completa del reporte
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 SECCIÓN DE TABLA EN EL PDF")
+    print("=" * 60)
+
+    base = None
+    for nombre, crear in generadores.items():
+        segundos = seccion(crear, df)
+        base = base or segundos
+        print(f"   {nombre:<22} {segundos:7.2f} s   ({base / segundos:.1f}x)")
+    print("   El resto es ReportLab dibujando y comprimiendo las páginas")
+
+    # =========================================================================
+    # EJEMPLO 3: Formatos por columna
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🔢 FORMATOS POR COLUMNA")
+    print("=" * 60)
+
+    muestra = df.head(3).copy()
+    muestra.loc[muestra.index[1], "precio_unitario"] = None
+    tabla = PerfReportGenerator(ruta, column_formats=FORMATOS)._auto_adjust_table(muestra)
+    columnas = list(muestra.columns)
+    for fila in tabla._cellvalues[1:]:
+        celdas = {c: fila[columnas.index(c)] for c in ("fecha", "cantidad", "precio_unitario")}
+        print(f"   {celdas}")
+    print("   Los nulos quedan vacíos")
+
+    # =========================================================================
+    # EJEMPLO 4: Un TableStyle compartido
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🎨 ESTILO DE TABLA COMPARTIDO")
+    print("=" * 60)
+
+    a = PerfReportGenerator(OUTPUT_DIR / "17_a.pdf")._table_style(9)
+    b = PerfReportGenerator(OUTPUT_DIR / "17_b.pdf")._table_style(9)
+    print(f"   Dos reportes con la misma plantilla: mismo objeto = {a is b}")
+    print(f"   {table_style.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Ejemplo 18: Plantillas Compiladas
+=================================
+
+Este ejemplo demuestra cómo generar muchos reportes con la misma
+plantilla sin repetir la preparación. `ReportGenerator` crea la hoja de
+estilos y vuelve a registrar las fuentes TTF en cada reporte;
+`compile_template()` lo hace una vez y la `CompiledTemplate` resultante
+se comparte entre generadores e hilos.
+
+Características demostradas:
+- Costo de crear 500 generadores con fuentes propias
+- Reportes en varios hilos con una sola plantilla compilada
+- TemplateBuilder con gráficas y portada sobre una plantilla compilada
+"""
+
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import matplotlib
+import pandas as pd
+from reportlab import rl_config
+
+from qry_doc import ChartConfig, CoverBuilder, TemplateBuilder
+from qry_doc.report_generator import ReportGenerator
+
+from perf import PerfQryDoc, PerfReportGenerator, StandInLLM, compile_template
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+GENERADORES = 500
+REPORTES = 24
+HILOS = 4
+
+# Las fuentes DejaVu vienen con matplotlib
+FUENTES = Path(matplotlib.get_data_path()) / "fonts" / "ttf"
+
+
+def plantilla() -> TemplateBuilder:
+    return (
+        TemplateBuilder()
+        .with_colors(primary="#0066CC")
+        .with_custom_fonts(title_font_path=FUENTES / "DejaVuSans-Bold.ttf",
+                           body_font_path=FUENTES / "DejaVuSans.ttf")
+    )
+
+
+def huella(ruta: Path) -> str:
+    return hashlib.sha256(ruta.read_bytes()).hexdigest()[:12]
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = pd.read_csv("examples/data/ventas.csv")
+    template = plantilla().build()
+
+    # =========================================================================
+    # EJEMPLO 1: Preparar la plantilla una vez
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"🧩 CREAR {GENERADORES} GENERADORES")
+    print("=" * 60)
+
+    ruta = OUTPUT_DIR / "18_reporte.pdf"
+    inicio = time.perf_counter()
+    for _ in range(GENERADORES):
+        ReportGenerator(ruta, template)
+    t_base = time.perf_counter() - inicio
+    print(f"   ReportGenerator(ruta, plantilla):     {t_base:6.2f}s")
+
+    inicio = time.perf_counter()
+    compiled = compile_template(template)
+    t_compilar = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    for _ in range(GENERADORES):
+        PerfReportGenerator(ruta, compiled)
+    t_perf = time.perf_counter() - inicio
+    print(f"   compile_template():                   {t_compilar:6.2f}s (una vez)")
+    print(f"   PerfReportGenerator(ruta, compilada): {t_perf:6.2f}s")
+    print(f"   Fuentes: {compiled.title_font}, {compiled.body_font}")
+
+    # =========================================================================
+    # EJEMPLO 2: Una plantilla compilada en varios hilos
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print(f"🧵 {REPORTES} REPORTES EN {HILOS} HILOS")
+    print("=" * 60)
+
+    # PDFs sin fecha ni ID aleatorio, para comparar los bytes
+    rl_config.invariant = 1
+    regiones = sorted(df["region"].unique())
+
+    def reporte(i: int) -> tuple[int, str]:
+        region = regiones[i % len(regiones)]
+        destino = OUTPUT_DIR / f"18_hilo_{i}.pdf"
+        PerfReportGenerator(destino, compiled).build(
+            title=f"Ventas {region}", summary=f"Ventas de la región {region}.",
+            dataframe=df[df["region"] == region].head(30),
+        )
+        return i, huella(destino)
+
+    base = dict(reporte(i) for i in range(len(regiones)))
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=HILOS) as executor:
+        resultados = list(executor.map(reporte, range(REPORTES)))
+    segundos = time.perf_counter() - inicio
+    distintos = sum(1 for i, h in resultados if h != base[i % len(regiones)])
+    print(f"   {REPORTES} reportes en {segundos:.2f}s")
+    print(f"   {'✅ Idénticos' if distintos == 0 else f'❌ {distintos} distintos'} a los generados en serie")
+
+    # =========================================================================
+    # EJEMPLO 3: TemplateBuilder con gráficas y portada
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📄 GRÁFICAS Y PORTADA")
+    print("=" * 60)
+
+    compiled = compile_template(plantilla().with_charts([
+        ChartConfig(chart_type="bar", title="Ventas por Región", group_by="region",
+                    value_column="cantidad"),
+    ]))
+    portada = CoverBuilder().set_background_image(
+        Path(matplotlib.get_data_path()) / "images" / "matplotlib_large.png"
+    )
+    with_cover = compile_template(compiled, cover=portada)
+    print(f"   Gráficas en la plantilla: {len(compiled.charts)}")
+    print(f"   Misma hoja de estilos con portada: {with_cover.styles is compiled.styles}")
+
+    with PerfQryDoc(df, llm=StandInLLM("local")) as qry:
+        destino = OUTPUT_DIR / "18_portada.pdf"
+        qry.generate_report_with_builder(destino, cover=portada, template=compiled,
+                                         summary="Ventas por región.")
+        print(f"   📁 {destino} ({destino.stat().st_size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
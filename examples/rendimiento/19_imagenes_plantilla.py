@@ -0,0 +1,95 @@
+"""
+Ejemplo 19: Logos y Portada Reducidos
+=====================================
+
+Este ejemplo genera un reporte de varias páginas con el logo de
+`public/logo_op.png` en el pie y `public/portada.png` como portada.
+ReportLab ya guarda cada imagen una vez por PDF, pero con su resolución
+original, y la vuelve a codificar en cada reporte; `compile_template()`
+la reduce al tamaño en que se dibuja y la guarda en una caché en disco.
+
+Características demostradas:
+- Tamaño y tiempo del PDF con las imágenes originales y reducidas
+- Cada imagen aparece una sola vez en el PDF
+- La segunda compilación reutiliza las imágenes de la caché
+"""
+
+import time
+from pathlib import Path
+
+from qry_doc import ReportTemplate
+from qry_doc.report_generator import ReportGenerator
+
+from perf import PerfReportGenerator, compile_template, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+CACHE_DIR = OUTPUT_DIR / "19_imagenes"
+FILAS = 400
+
+PLANTILLA = ReportTemplate(
+    footer_logo_path=Path("public/logo_op.png"),
+    cover_image_path=Path("public/portada.png"),
+)
+
+
+def generar(generator, df) -> float:
+    """Segundos que tarda un reporte."""
+    inicio = time.perf_counter()
+    generator.build(title="Ventas", summary="Detalle de ventas.", dataframe=df)
+    return time.perf_counter() - inicio
+
+
+def imagenes(ruta: Path) -> int:
+    """Imágenes guardadas en el PDF (la transparencia cuenta como otra)."""
+    return ruta.read_bytes().count(b"/Subtype /Image")
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = synthetic_sales(FILAS, categories=10)
+
+    # =========================================================================
+    # EJEMPLO 1: Imágenes originales y reducidas
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"🖼️  REPORTE CON LOGO Y PORTADA ({FILAS} FILAS)")
+    print("=" * 60)
+
+    ruta = OUTPUT_DIR / "19_original.pdf"
+    generator = ReportGenerator(ruta, PLANTILLA)
+    segundos = generar(generator, df)
+    print(f"   {'ReportGenerator':<28} {segundos:5.2f}s  {ruta.stat().st_size / 1024:6.0f} KB  "
+          f"{generator.header_footer_calls} páginas, {imagenes(ruta)} imágenes")
+
+    for dpi in (None, "print", "screen"):
+        ruta = OUTPUT_DIR / f"19_{dpi or 'sin_reducir'}.pdf"
+        compiled = compile_template(PLANTILLA, image_dpi=dpi, image_dir=CACHE_DIR)
+        segundos = generar(PerfReportGenerator(ruta, compiled), df)
+        print(f"   {'image_dpi=' + repr(dpi):<28} {segundos:5.2f}s  {ruta.stat().st_size / 1024:6.0f} KB  "
+              f"{imagenes(ruta)} imágenes")
+
+    # =========================================================================
+    # EJEMPLO 2: Caché en disco
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("💾 CACHÉ DE IMÁGENES REDUCIDAS")
+    print("=" * 60)
+
+    for intento in ("primera", "segunda"):
+        if intento == "primera":
+            for archivo in CACHE_DIR.glob("*"):
+                archivo.unlink()
+        inicio = time.perf_counter()
+        compiled = compile_template(PLANTILLA, image_dir=CACHE_DIR)
+        print(f"   compile_template() {intento} vez: {(time.perf_counter() - inicio) * 1000:6.1f} ms")
+
+    for nombre, imagen in (("Portada", compiled.cover), ("Logo del pie", compiled.footer_logo)):
+        print(f"   {nombre:<13} {imagen.source.stat().st_size / 1024:6.0f} KB → "
+              f"{imagen.path.stat().st_size / 1024:5.0f} KB  ({imagen.path.name[:12]}…{imagen.path.suffix})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Ejemplo 20: Reportes en Lote
+============================
+
+Este ejemplo genera un reporte por columna y medida con
+`generate_reports()`. Los resúmenes se piden al LLM en el proceso
+principal mientras un pool de procesos arma los PDFs; los datos se
+comparten con los procesos como un archivo Arrow mapeado en memoria.
+
+Características demostradas:
+- Tiempo de `generate_report()` en serie y de `generate_reports()`
+- Reportes con distintas plantillas en el mismo lote
+- Un reporte que falla no detiene el lote
+"""
+
+import os
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from qry_doc import ReportTemplate
+
+from perf import PerfQryDoc, ReportSpec, StandInLLM, compile_template, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento/20_lote")
+FILAS = 200_000
+PROCESOS = 4
+
+# Latencia simulada del LLM para cada resumen
+LATENCIA_LLM = 0.3
+
+
+# Un reporte por cada columna de agrupación y medida
+AGRUPACIONES = ["region", "vendedor", "categoria", "producto"]
+MEDIDAS = ["cantidad", "precio_unitario"]
+
+
+def especificaciones() -> list[ReportSpec]:
+    return [
+        ReportSpec(
+            OUTPUT_DIR / f"{medida}_por_{columna}.pdf",
+            query=f"{medida} por {columna}",
+            title=f"{medida} por {columna}",
+            group_by=columna,
+            value_column=medida,
+        )
+        for columna in AGRUPACIONES
+        for medida in MEDIDAS
+    ]
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = synthetic_sales(FILAS, categories=12)
+    n_reportes = len(AGRUPACIONES) * len(MEDIDAS)
+    llm = StandInLLM("local", latency=LATENCIA_LLM, jitter=0.0, seed=1)
+
+    # =========================================================================
+    # EJEMPLO 1: En serie y en lote
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📚 {n_reportes} REPORTES SOBRE {FILAS:,} FILAS ({os.cpu_count()} CPU)")
+    print("=" * 60)
+
+    with PerfQryDoc(df, llm=llm) as qry:
+        inicio = time.perf_counter()
+        for spec in especificaciones():
+            qry.generate_report(spec.query, spec.output_path, title=spec.title,
+                                group_by=spec.group_by, value_column=spec.value_column)
+        t_serie = time.perf_counter() - inicio
+        print(f"   generate_report() en serie:        {t_serie:6.2f}s")
+
+        for procesos in (0, PROCESOS):
+            inicio = time.perf_counter()
+            resultados = qry.generate_reports(especificaciones(), workers=procesos)
+            segundos = time.perf_counter() - inicio
+            correctos = sum(r.ok for r in resultados)
+            print(f"   generate_reports(workers={procesos}):      {segundos:6.2f}s  "
+                  f"({correctos}/{len(resultados)} correctos)")
+
+    # =========================================================================
+    # EJEMPLO 2: Plantillas distintas y errores por reporte
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧾 RESULTADOS POR REPORTE")
+    print("=" * 60)
+
+    azul = compile_template(ReportTemplate(primary_color="#0066CC"))
+    specs = [
+        ReportSpec(OUTPUT_DIR / "resumen.pdf", title="Resumen", summary="Ventas del periodo.",
+                   template=azul),
+        ReportSpec(OUTPUT_DIR / "regiones.pdf", query="ventas por región", title="Regiones",
+                   group_by="region", value_column="cantidad", template=azul),
+        # La ruta no se puede escribir: este reporte falla, los demás no
+        ReportSpec(Path("/proc/no_se_puede.pdf"), title="Inválido", summary="Sin destino."),
+        ReportSpec(OUTPUT_DIR / "vendedores.pdf", query="ventas por vendedor", title="Vendedores",
+                   group_by="vendedor", value_column="cantidad",
+                   template=ReportTemplate(primary_color="#CC3300")),
+    ]
+    with PerfQryDoc(pd.read_csv("examples/data/ventas.csv"), llm=llm) as qry:
+        for resultado in qry.generate_reports(specs, workers=PROCESOS):
+            if resultado.ok:
+                print(f"   ✅ {resultado.output_path} ({resultado.seconds:.2f}s)")
+            else:
+                print(f"   ❌ {resultado.output_path}: {resultado.error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Ejemplo 21: Un Reporte por Entidad
+==================================
+
+Este ejemplo genera un PDF por producto. El camino habitual es filtrar
+los datos y llamar a `generate_report_with_builder()` en cada vuelta, lo
+que recorre todas las filas y prepara la plantilla otra vez por
+producto. `burst_reports()` separa los datos en una sola pasada, compila
+la plantilla una vez y arma los PDFs en un pool de procesos.
+
+Características demostradas:
+- Bucle con filtro frente a `burst_reports()`
+- Nombres de archivo a partir de un patrón
+- Resumen de cada reporte calculado sobre sus filas
+"""
+
+import os
+import time
+from pathlib import Path
+
+from qry_doc import ChartConfig, CoverBuilder, TemplateBuilder
+
+from perf import PerfQryDoc, StandInLLM, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento/21_por_producto")
+FILAS = 300_000
+PRODUCTOS = 24
+PROCESOS = 4
+
+
+def plantilla() -> TemplateBuilder:
+    return (
+        TemplateBuilder()
+        .with_colors(primary="#0066CC")
+        .with_footer(logo_path=Path("public/logo_op.png"))
+        .with_charts([
+            ChartConfig(chart_type="bar", title="Cantidad por Región", group_by="region",
+                        value_column="cantidad"),
+            ChartConfig(chart_type="pie", title="Cantidad por Vendedor", group_by="vendedor",
+                        value_column="cantidad"),
+        ])
+    )
+
+
+def portada() -> CoverBuilder:
+    return CoverBuilder().set_title("Ventas por Producto").set_background_image(Path("public/portada.png"))
+
+
+def main():
+    df = synthetic_sales(FILAS, categories=PRODUCTOS)
+    productos = sorted(df["producto"].unique())
+
+    # =========================================================================
+    # EJEMPLO 1: Bucle con filtro y burst_reports()
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📦 {len(productos)} REPORTES SOBRE {FILAS:,} FILAS ({os.cpu_count()} CPU)")
+    print("=" * 60)
+
+    destino = OUTPUT_DIR / "bucle"
+    destino.mkdir(parents=True, exist_ok=True)
+    inicio = time.perf_counter()
+    for producto in productos:
+        filas = df[df["producto"] == producto]
+        with PerfQryDoc(filas, llm=StandInLLM("local")) as qry:
+            qry.generate_report_with_builder(
+                destino / f"producto_{producto}.pdf", cover=portada(), template=plantilla(),
+                title=producto, summary=f"{len(filas):,} registros de producto {producto}.",
+            )
+    t_bucle = time.perf_counter() - inicio
+    print(f"   Filtro + generate_report_with_builder(): {t_bucle:6.2f}s")
+
+    with PerfQryDoc(df, llm=StandInLLM("local")) as qry:
+        for procesos in (0, PROCESOS):
+            inicio = time.perf_counter()
+            resultados = qry.burst_reports(
+                "producto", output_dir=OUTPUT_DIR / f"burst_{procesos}",
+                cover=portada(), template=plantilla(), workers=procesos,
+            )
+            segundos = time.perf_counter() - inicio
+            correctos = sum(r.ok for r in resultados.values())
+            print(f"   {f'burst_reports(workers={procesos}):':<41} {segundos:6.2f}s  "
+                  f"({correctos}/{len(resultados)} correctos)")
+
+        # =====================================================================
+        # EJEMPLO 2: Patrón de nombres y resumen por entidad
+        # =====================================================================
+
+        print("\n" + "=" * 60)
+        print("🏷️  UN REPORTE POR VENDEDOR")
+        print("=" * 60)
+
+        def resumen(vendedor, filas) -> str:
+            mejor = filas.groupby("region", observed=True)["cantidad"].sum().idxmax()
+            return f"{vendedor} vendió {filas['cantidad'].sum():,} unidades; su mejor región es {mejor}."
+
+        resultados = qry.burst_reports(
+            "vendedor", output_dir=OUTPUT_DIR, name="ventas_{value}.pdf",
+            template=plantilla(), title="Ventas de {value}", summary=resumen, workers=PROCESOS,
+        )
+        for vendedor, resultado in resultados.items():
+            estado = "✅" if resultado.ok else f"❌ {resultado.error}"
+            print(f"   {estado} {vendedor:<15} → {resultado.output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Ejemplo 22: Secciones en Caché
+==============================
+
+Este ejemplo regenera varias veces un reporte con ocho gráficas sobre
+300.000 filas, cambiando una parte en cada vuelta, como al ajustar un
+reporte o al actualizarlo cada hora. Con una `SectionCache`, las
+secciones que no cambiaron (resumen, cada gráfica, tabla) se reutilizan
+ya armadas y solo se vuelve a paginar el documento.
+
+Características demostradas:
+- Regenerar tras cambiar el resumen o una gráfica
+- El PDF es idéntico byte a byte al generado sin caché
+- Aciertos y fallos de la caché en cada vuelta
+- `PerfQryDoc` con la caché compartida entre actualizaciones
+"""
+
+import hashlib
+import time
+from pathlib import Path
+
+from reportlab import rl_config
+
+from qry_doc import ChartConfig, TemplateBuilder
+
+from perf import PerfQryDoc, PerfReportGenerator, SectionCache, StandInLLM, compile_template, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+FILAS = 300_000
+
+GRAFICAS = [
+    ChartConfig(chart_type=tipo, title=f"{valor} por {columna}", group_by=columna, value_column=valor)
+    for columna in ("region", "vendedor", "producto", "categoria")
+    for valor, tipo in (("cantidad", "bar"), ("precio_unitario", "pie"))
+]
+
+
+def huella(ruta: Path) -> str:
+    return hashlib.sha256(ruta.read_bytes()).hexdigest()[:12]
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # PDFs sin fecha ni ID aleatorio, para comparar los bytes
+    rl_config.invariant = 1
+    df = synthetic_sales(FILAS, categories=24)
+    compiled = compile_template(TemplateBuilder().with_colors(primary="#0066CC"))
+
+    graficas = list(GRAFICAS)
+    cambiada = list(GRAFICAS)
+    cambiada[2] = ChartConfig(chart_type="barh", title="Cantidad por vendedor (horizontal)",
+                              group_by="vendedor", value_column="cantidad")
+    vueltas = [
+        ("Primera generación", "Ventas del periodo.", graficas),
+        ("Mismo reporte", "Ventas del periodo.", graficas),
+        ("Cambia el resumen", "Ventas del periodo, revisadas.", graficas),
+        ("Cambia una gráfica", "Ventas del periodo, revisadas.", cambiada),
+    ]
+
+    # =========================================================================
+    # EJEMPLO 1: Regenerar cambiando una parte
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"♻️  REGENERAR UN REPORTE DE {len(GRAFICAS)} GRÁFICAS ({FILAS:,} FILAS)")
+    print("=" * 60)
+
+    cache = SectionCache()
+    distintos = 0
+    for nombre, resumen, charts in vueltas:
+        hits, misses = cache.hits, cache.misses
+        tiempos, huellas = [], []
+        for secciones in (None, cache):
+            destino = OUTPUT_DIR / f"22_{'con' if secciones else 'sin'}_cache.pdf"
+            inicio = time.perf_counter()
+            PerfReportGenerator(destino, compiled, section_cache=secciones).build_with_charts(
+                "Ventas", resumen, charts, df.head(20), chart_data=df
+            )
+            tiempos.append(time.perf_counter() - inicio)
+            huellas.append(huella(destino))
+        distintos += huellas[0] != huellas[1]
+        print(f"   {nombre:<20} sin caché {tiempos[0]:5.2f}s  con caché {tiempos[1]:5.2f}s  "
+              f"({cache.hits - hits} reutilizadas, {cache.misses - misses} armadas)")
+    print(f"\n   {'✅ PDFs idénticos' if distintos == 0 else f'❌ {distintos} PDFs distintos'} "
+          f"con y sin caché; {len(cache)} secciones guardadas")
+
+    # =========================================================================
+    # EJEMPLO 2: PerfQryDoc con caché de secciones
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🔁 ACTUALIZACIÓN PERIÓDICA CON PerfQryDoc")
+    print("=" * 60)
+
+    # Cada actualización crea otra instancia: las agregaciones no se comparten
+    builder = TemplateBuilder().with_colors(primary="#0066CC").with_charts(GRAFICAS)
+    for actualizacion in range(1, 3):
+        hits = cache.hits
+        inicio = time.perf_counter()
+        with PerfQryDoc(df, llm=StandInLLM("local"), section_cache=cache) as qry:
+            qry.generate_report_with_builder(OUTPUT_DIR / "22_periodico.pdf", template=builder,
+                                             title="Ventas", summary="Ventas del periodo.")
+        print(f"   Actualización {actualizacion}: {time.perf_counter() - inicio:5.2f}s  "
+              f"({cache.hits - hits} secciones reutilizadas)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Ejemplo 23: Reportes en Memoria
+===============================
+
+Este ejemplo genera reportes sin archivos: `generate_report()` y
+`generate_report_with_builder()` aceptan un flujo binario en lugar de
+una ruta, `pdf_bytes()` retorna el PDF y `iter_pdf()` lo entrega en
+bloques para una respuesta HTTP.
+
+Características demostradas:
+- Archivo temporal frente a `pdf_bytes()`
+- Mismo PDF en disco y en memoria
+- Una aplicación WSGI que responde el PDF por bloques
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from wsgiref.util import setup_testing_defaults
+
+import pandas as pd
+from reportlab import rl_config
+
+from qry_doc import ChartConfig, TemplateBuilder
+
+from perf import PerfQryDoc, StandInLLM, compile_template, iter_pdf, pdf_bytes
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+REPORTES = 50
+
+PLANTILLA = TemplateBuilder().with_colors(primary="#0066CC").with_charts([
+    ChartConfig(chart_type="bar", title="Ventas por Región", group_by="region", value_column="cantidad"),
+])
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    # PDFs sin fecha ni ID aleatorio, para comparar los bytes
+    rl_config.invariant = 1
+    df = pd.read_csv("examples/data/ventas.csv")
+    compiled = compile_template(PLANTILLA)
+
+    with PerfQryDoc(df, llm=StandInLLM("local")) as qry:
+
+        def reporte(destino):
+            return qry.generate_report_with_builder(destino, template=compiled, title="Ventas",
+                                                    summary="Ventas por región.")
+
+        # =====================================================================
+        # EJEMPLO 1: Archivo temporal y memoria
+        # =====================================================================
+
+        print("=" * 60)
+        print(f"💾 {REPORTES} REPORTES PARA ENVIAR")
+        print("=" * 60)
+
+        inicio = time.perf_counter()
+        for _ in range(REPORTES):
+            descriptor, ruta = tempfile.mkstemp(suffix=".pdf")
+            os.close(descriptor)
+            try:
+                reporte(ruta)
+                en_disco = Path(ruta).read_bytes()
+            finally:
+                os.unlink(ruta)
+        t_disco = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        for _ in range(REPORTES):
+            en_memoria = pdf_bytes(reporte)
+        t_memoria = time.perf_counter() - inicio
+
+        print(f"   Archivo temporal, leer y borrar: {t_disco:6.2f}s")
+        print(f"   pdf_bytes():                     {t_memoria:6.2f}s")
+        iguales = hashlib.sha256(en_disco).digest() == hashlib.sha256(en_memoria).digest()
+        print(f"   {'✅ Mismo PDF' if iguales else '❌ PDFs distintos'} ({len(en_memoria) / 1024:.0f} KB)")
+
+        # =====================================================================
+        # EJEMPLO 2: Respuesta HTTP por bloques
+        # =====================================================================
+
+        print("\n" + "=" * 60)
+        print("🌐 APLICACIÓN WSGI")
+        print("=" * 60)
+
+        def app(environ, start_response):
+            start_response("200 OK", [("Content-Type", "application/pdf"),
+                                      ("Content-Disposition", 'attachment; filename="ventas.pdf"')])
+            return iter_pdf(lambda out: qry.generate_report(
+                "ventas por región", out, group_by="region", value_column="cantidad"
+            ), chunk_size=16 * 1024)
+
+        environ = {}
+        setup_testing_defaults(environ)
+        cabeceras = []
+        cuerpo = app(environ, lambda status, headers: cabeceras.extend([status, *headers]))
+        destino = OUTPUT_DIR / "23_respuesta.pdf"
+        bloques = 0
+        with open(destino, "wb") as archivo:
+            for bloque in cuerpo:
+                archivo.write(bloque)
+                bloques += 1
+        print(f"   {cabeceras[0]} · {cabeceras[1][1]}")
+        print(f"   {bloques} bloques, {destino.stat().st_size / 1024:.0f} KB → {destino}")
+
+
+if __name__ == "__main__":
+    main()
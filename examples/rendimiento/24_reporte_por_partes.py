@@ -0,0 +1,90 @@
+"""
+Ejemplo 24: Reporte Grande por Partes
+=====================================
+
+Este ejemplo arma un reporte de 16 gráficas y un anexo de 30.000 filas
+(más de mil páginas). `build_in_chunks()` reparte las secciones de la
+plantilla en partes, arma cada una como un PDF en un pool de procesos y
+las une sin volver a renderizarlas, con los números de página corregidos
+y un marcador por sección.
+
+Características demostradas:
+- Una sola historia frente a partes en paralelo
+- Mismas páginas con y sin partes
+- `merge_pdfs()` para unir reportes ya generados
+"""
+
+import os
+import time
+from pathlib import Path
+
+from qry_doc import ChartConfig, SectionConfig, SectionType, TemplateBuilder
+
+from perf import PerfReportGenerator, compile_template, merge_pdfs, pdf_bytes, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+FILAS = 30_000
+PROCESOS = 4
+
+GRAFICAS = [
+    ChartConfig(chart_type=tipo, title=f"{valor} por {columna}", group_by=columna, value_column=valor)
+    for columna in ("region", "vendedor", "producto", "categoria")
+    for valor, tipo in (("cantidad", "bar"), ("precio_unitario", "pie"), ("cantidad", "barh"),
+                        ("precio_unitario", "line"))
+]
+
+SECCIONES = [
+    SectionConfig(SectionType.SUMMARY),
+    *[SectionConfig(SectionType.CHART)] * len(GRAFICAS),
+    SectionConfig(SectionType.CUSTOM, custom_content="El anexo lista todas las ventas del periodo."),
+    SectionConfig(SectionType.DATA),
+]
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    df = synthetic_sales(FILAS, categories=24)
+    compiled = compile_template(TemplateBuilder().with_colors(primary="#0066CC").with_sections(SECCIONES))
+
+    # =========================================================================
+    # EJEMPLO 1: Una sola historia y partes en paralelo
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📚 {len(GRAFICAS)} GRÁFICAS Y {FILAS:,} FILAS ({os.cpu_count()} CPU)")
+    print("=" * 60)
+
+    paginas = []
+    for nombre, procesos, partes in (("Una sola historia", 0, 1), (f"{PROCESOS} procesos", PROCESOS, None)):
+        destino = OUTPUT_DIR / f"24_{'partes' if partes is None else 'historia'}.pdf"
+        generator = PerfReportGenerator(destino, compiled)
+        inicio = time.perf_counter()
+        generator.build_in_chunks("Ventas del Periodo", "Ventas por región, vendedor y producto.",
+                                  GRAFICAS, df, workers=procesos, chunks=partes)
+        paginas.append(generator.header_footer_calls)
+        print(f"   {nombre:<18} {time.perf_counter() - inicio:6.2f}s  "
+              f"{generator.header_footer_calls:,} páginas, {destino.stat().st_size / 1024 ** 2:.1f} MB")
+    print(f"   {'✅ Mismas páginas' if paginas[0] == paginas[1] else '❌ Páginas distintas'}")
+
+    # =========================================================================
+    # EJEMPLO 2: Unir reportes ya generados
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("📎 UN PDF CON UN REPORTE POR REGIÓN")
+    print("=" * 60)
+
+    reportes = []
+    for region, filas in df.groupby("region", observed=True):
+        reportes.append(pdf_bytes(lambda out: PerfReportGenerator(out, compiled).build_with_charts(
+            f"Ventas de {region}", f"{len(filas):,} ventas.", GRAFICAS[:2], filas.head(20), chart_data=filas
+        )))
+    destino = OUTPUT_DIR / "24_regiones.pdf"
+    inicio = time.perf_counter()
+    destino.write_bytes(merge_pdfs(reportes))
+    print(f"   {len(reportes)} reportes unidos en {time.perf_counter() - inicio:.3f}s → {destino}")
+
+
+if __name__ == "__main__":
+    main()
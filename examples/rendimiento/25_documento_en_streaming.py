@@ -0,0 +1,125 @@
+"""
+Ejemplo 25: Documento de Miles de Páginas en Streaming
+======================================================
+
+Este ejemplo arma un libro de ventas con una sección por región y mes.
+Armar la historia en `generator.story` y llamar a `_build_document()`
+guarda en memoria todos los flowables y todas las páginas hasta cerrar
+el PDF; `build_stream()` toma los flowables de un generador a medida que
+se dibujan y escribe las páginas en el archivo cada `flush_pages`.
+
+Características demostradas:
+- Historia en una lista frente a un generador: pico de memoria
+- Mismas páginas con los dos métodos
+- Memoria que no crece con el número de páginas
+"""
+
+import time
+import tracemalloc
+from pathlib import Path
+
+from reportlab.platypus import PageBreak, Paragraph
+
+from perf import PerfReportGenerator, synthetic_sales
+
+
+OUTPUT_DIR = Path("output/rendimiento")
+FILAS_COMPARACION = 20_000
+FILAS_MEMORIA = (10_000, 40_000)
+FILAS_LIBRO = 120_000
+PAGINAS_POR_SEGMENTO = 100
+
+
+def historia(generator, df):
+    """Una sección por región y mes: título, resumen y la tabla de sus ventas."""
+    styles = generator.styles
+    yield Paragraph("Libro de Ventas", styles['Title'])
+    for (region, mes), filas in df.groupby(["region", df["fecha"].dt.month], observed=True):
+        yield Paragraph(f"{region} · mes {mes}", styles['Heading'])
+        yield Paragraph(f"{len(filas):,} ventas, {filas['cantidad'].sum():,} unidades.", styles['Body'])
+        yield from generator.table_flowables(filas)
+        yield PageBreak()
+
+
+def pico_memoria(construir) -> tuple[float, float]:
+    """Segundos y pico de memoria en MB (tracemalloc lo hace más lento)."""
+    tracemalloc.start()
+    try:
+        inicio = time.perf_counter()
+        construir()
+        return time.perf_counter() - inicio, tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+    # =========================================================================
+    # EJEMPLO 1: Historia en una lista vs. generador
+    # =========================================================================
+
+    print("=" * 60)
+    print(f"📖 LIBRO DE VENTAS CON {FILAS_COMPARACION:,} FILAS")
+    print("=" * 60)
+
+    df = synthetic_sales(FILAS_COMPARACION, categories=200)
+
+    lista = PerfReportGenerator(OUTPUT_DIR / "25_lista.pdf")
+
+    def con_lista():
+        lista.story.extend(historia(lista, df))
+        lista._build_document()
+
+    t_lista, mem_lista = pico_memoria(con_lista)
+    print(f"   story + _build_document(): {t_lista:6.2f}s  pico {mem_lista:6.1f} MB  "
+          f"{lista.header_footer_calls:,} páginas")
+
+    streaming = PerfReportGenerator(OUTPUT_DIR / "25_streaming.pdf")
+    t_stream, mem_stream = pico_memoria(
+        lambda: streaming.build_stream(historia(streaming, df), flush_pages=PAGINAS_POR_SEGMENTO)
+    )
+    print(f"   build_stream():            {t_stream:6.2f}s  pico {mem_stream:6.1f} MB  "
+          f"{streaming.header_footer_calls:,} páginas")
+    iguales = lista.header_footer_calls == streaming.header_footer_calls
+    print(f"   {'✅ Mismas páginas' if iguales else '❌ Páginas distintas'} "
+          f"({mem_lista / mem_stream:.1f}x menos memoria)")
+
+    # =========================================================================
+    # EJEMPLO 2: Memoria al crecer el documento
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print("🧠 MEMORIA AL CRECER EL DOCUMENTO")
+    print("=" * 60)
+
+    for filas in FILAS_MEMORIA:
+        df = synthetic_sales(filas, categories=200)
+        generator = PerfReportGenerator(OUTPUT_DIR / "25_memoria.pdf")
+        _, pico = pico_memoria(
+            lambda: generator.build_stream(historia(generator, df), flush_pages=PAGINAS_POR_SEGMENTO)
+        )
+        print(f"   {filas:>8,} filas  {generator.header_footer_calls:>6,} páginas  pico {pico:6.1f} MB")
+    print(f"   En memoria quedan la página en curso y las del segmento ({PAGINAS_POR_SEGMENTO} páginas)")
+
+    # =========================================================================
+    # EJEMPLO 3: Un documento de miles de páginas
+    # =========================================================================
+
+    print("\n" + "=" * 60)
+    print(f"📚 {FILAS_LIBRO:,} FILAS")
+    print("=" * 60)
+
+    df = synthetic_sales(FILAS_LIBRO, categories=200)
+    destino = OUTPUT_DIR / "25_libro.pdf"
+    generator = PerfReportGenerator(destino)
+    inicio = time.perf_counter()
+    generator.build_stream(historia(generator, df), flush_pages=PAGINAS_POR_SEGMENTO)
+    segundos = time.perf_counter() - inicio
+    print(f"   {generator.header_footer_calls:,} páginas en {segundos:.1f}s "
+          f"({generator.header_footer_calls / segundos:.0f} páginas/s), "
+          f"{destino.stat().st_size / 1024 / 1024:.1f} MB → {destino}")
+
+
+if __name__ == "__main__":
+    main()
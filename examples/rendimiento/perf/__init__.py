@@ -0,0 +1,101 @@
+"""
+Utilidades de rendimiento para los ejemplos de qry-doc.
+
+Este paquete agrupa los componentes reutilizables que usan los ejemplos
+de `examples/rendimiento/`. Todos se construyen sobre la API pública de
+qry-doc, PandasAI y ReportLab.
+"""
+from perf.standin import StandInLLM
+from perf.llm_router import LLMRouter, LatencyHistogram
+from perf.context import BoundedAIBuilder, ContextWindow, llm_summarizer
+from perf.text_to_sql import SQLGuard, TextToSQL
+from perf.profile import DataProfile, ColumnProfile
+from perf.validation import QueryIndex, QueryValidation
+from perf.streaming_csv import RowFilter, StreamingExtractor, write_csv_chunks
+from perf.aggregation import SharedAggregates
+from perf.charts import DPI_PROFILES, ChartRenderPool, ChartSpec, ChartStyle, fit_to_frame, render_chart, spec_from_config
+from perf.chart_types import PerfChartConfig, lttb, spec_for_chart
+from perf.chart_cache import ChartCache, LLMChartStore, chart_key
+from perf.vector_charts import VECTOR_CHART_TYPES, draw_chart
+from perf.tables import StreamingTable
+from perf.templates import CompiledTemplate, compile_template
+from perf.images import resample_image
+from perf.sections import SectionCache
+from perf.output import iter_pdf, pdf_bytes
+from perf.pdf_merge import PdfAppender, merge_pdfs
+from perf.streaming_doc import LazyStory, StreamingDocTemplate
+from perf.report import PerfReportGenerator
+from perf.batch import ReportRenderer, ReportResult, ReportSpec
+from perf.qrydoc import PerfQryDoc
+from perf.chart_benchmark import (
+    ChartTiming,
+    compare_benchmarks,
+    load_benchmark,
+    run_chart_benchmark,
+    save_benchmark,
+    synthetic_sales,
+)
+
+__all__ = [
+    # QryDoc
+    "PerfQryDoc",
+    # LLMs
+    "StandInLLM",
+    "LLMRouter",
+    "LatencyHistogram",
+    # AIBuilder
+    "BoundedAIBuilder",
+    "ContextWindow",
+    "llm_summarizer",
+    # Perfil de datos
+    "DataProfile",
+    "ColumnProfile",
+    "QueryIndex",
+    "QueryValidation",
+    # Gráficas y reportes
+    "SharedAggregates",
+    "PerfChartConfig",
+    "spec_for_chart",
+    "lttb",
+    "ChartRenderPool",
+    "ChartSpec",
+    "ChartStyle",
+    "render_chart",
+    "spec_from_config",
+    "fit_to_frame",
+    "DPI_PROFILES",
+    "ChartCache",
+    "LLMChartStore",
+    "chart_key",
+    "draw_chart",
+    "VECTOR_CHART_TYPES",
+    "StreamingTable",
+    "CompiledTemplate",
+    "compile_template",
+    "resample_image",
+    "SectionCache",
+    "PerfReportGenerator",
+    "pdf_bytes",
+    "iter_pdf",
+    "merge_pdfs",
+    "PdfAppender",
+    "StreamingDocTemplate",
+    "LazyStory",
+    "ReportSpec",
+    "ReportResult",
+    "ReportRenderer",
+    # Benchmarks
+    "run_chart_benchmark",
+    "synthetic_sales",
+    "ChartTiming",
+    "save_benchmark",
+    "load_benchmark",
+    "compare_benchmarks",
+    # Exportación
+    "RowFilter",
+    "StreamingExtractor",
+    "write_csv_chunks",
+    # SQL
+    "SQLGuard",
+    "TextToSQL",
+]
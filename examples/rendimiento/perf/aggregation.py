@@ -0,0 +1,300 @@
+"""
+Agregaciones compartidas entre las gráficas y tablas de un reporte.
+
+Varias gráficas de un reporte suelen agrupar por las mismas columnas
+(`region`, `categoria`...) y sumar la misma columna de valores. En lugar
+de un `groupby` por gráfica, `SharedAggregates` reúne primero todas las
+agregaciones pedidas, elimina las repetidas y calcula cada columna de
+agrupación una sola vez: `pd.factorize` asigna un código entero a cada
+grupo y `np.bincount` suma, cuenta o promedia todas las columnas de
+valores sobre esos códigos. Los resultados se reutilizan en las gráficas,
+en las tablas y en el prompt del resumen.
+"""
+import logging
+import threading
+from collections import defaultdict
+from typing import TYPE_CHECKING, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    from qry_doc import ChartConfig
+
+logger = logging.getLogger(__name__)
+
+# Agregaciones disponibles
+AGGREGATIONS = ("sum", "mean", "count", "min", "max")
+
+# (columna de agrupación, columna de valores, agregación)
+AggKey = tuple[str, str, str]
+
+# Combinaciones máximas de dos columnas de agrupación (grupos x series)
+MAX_PAIR_GROUPS = 5_000_000
+
+
+def _format_number(value: float) -> str:
+    if float(value).is_integer():
+        return f"{int(value):,}"
+    return f"{value:,.2f}"
+
+
+def aggregation_key(config: "ChartConfig") -> Optional[AggKey]:
+    """
+    Agregación que necesita una gráfica, o None si no agrupa.
+
+    Las configuraciones con su propio método `aggregation_key()` (como
+    `PerfChartConfig`) deciden su agregación.
+    """
+    custom = getattr(config, "aggregation_key", None)
+    if callable(custom):
+        return custom()
+    if config.group_by and config.value_column:
+        return (config.group_by, config.value_column, "sum")
+    return None
+
+
+class SharedAggregates:
+    """
+    Agregaciones por grupo calculadas una vez y reutilizadas.
+
+    Los resultados coinciden con `df.groupby(group_by)[value_column].agg(agg)`:
+    grupos ordenados, sin el grupo de valores nulos y con los nulos de la
+    columna de valores ignorados.
+
+    Example:
+        ```python
+        aggregates = SharedAggregates(df)
+        aggregates.plan([("region", "cantidad", "sum"), ("categoria", "cantidad", "sum")])
+        aggregates.compute()                       # Una pasada por columna de agrupación
+        ventas = aggregates.get("region", "cantidad")
+        tabla = aggregates.frame("region", "cantidad", ("sum", "mean", "count"))
+        ```
+    """
+
+    def __init__(self, df: pd.DataFrame) -> None:
+        """
+        Inicializa las agregaciones (no calcula nada todavía).
+
+        Args:
+            df: Datos de origen.
+        """
+        self._df = df
+        self._pending: set[AggKey] = set()
+        self._results: dict[AggKey, pd.Series] = {}
+        self._codes: dict[str, tuple[np.ndarray, pd.Index]] = {}
+        self._lock = threading.Lock()
+        self.passes = 0  # Columnas de agrupación factorizadas
+
+    @classmethod
+    def from_charts(cls, df: pd.DataFrame, charts: Iterable["ChartConfig"]) -> "SharedAggregates":
+        """Planifica y calcula las agregaciones de un conjunto de gráficas."""
+        aggregates = cls(df)
+        aggregates.plan(key for key in map(aggregation_key, charts) if key is not None)
+        aggregates.compute()
+        return aggregates
+
+    def plan(self, keys: Iterable[AggKey]) -> None:
+        """
+        Registra agregaciones para el próximo `compute()`.
+
+        Raises:
+            ValueError: Si una agregación no está en `AGGREGATIONS`.
+        """
+        for group_by, value_column, agg in keys:
+            if agg not in AGGREGATIONS:
+                raise ValueError(f"Agregación inválida: '{agg}'. Use: {', '.join(AGGREGATIONS)}")
+            with self._lock:
+                if (group_by, value_column, agg) not in self._results:
+                    self._pending.add((group_by, value_column, agg))
+
+    def compute(self) -> None:
+        """
+        Calcula todas las agregaciones pendientes, agrupando por columna.
+
+        Raises:
+            KeyError: Si una columna no existe.
+            ValueError: Si una columna de valores no es numérica. Las
+                demás agregaciones pendientes se calculan igualmente.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            by_group: dict[str, dict[str, set[str]]] = defaultdict(lambda: defaultdict(set))
+            for group_by, value_column, agg in pending:
+                by_group[group_by][value_column].add(agg)
+
+            first_error: Optional[Exception] = None
+            for group_by, columns in by_group.items():
+                for value_column, aggs in columns.items():
+                    try:
+                        codes, groups = self._group_codes(group_by)
+                        results = self._aggregate(codes, groups, value_column, aggs)
+                    except (KeyError, ValueError, TypeError) as e:
+                        first_error = first_error or e
+                        continue
+                    for agg, series in results.items():
+                        self._results[(group_by, value_column, agg)] = series
+
+        if first_error is not None:
+            raise first_error
+
+    def _group_codes(self, group_by: str) -> tuple[np.ndarray, pd.Index]:
+        """Códigos enteros de cada fila y grupos ordenados (una pasada por columna)."""
+        if group_by not in self._codes:
+            codes, groups = pd.factorize(self._df[group_by], sort=True)
+            groups = pd.Index(groups, name=group_by)
+            self._codes[group_by] = (codes, groups)
+            self.passes += 1
+        return self._codes[group_by]
+
+    def _aggregate(
+        self,
+        codes: np.ndarray,
+        groups: pd.Index,
+        value_column: str,
+        aggs: set[str],
+    ) -> dict[str, pd.Series]:
+        """Calcula varias agregaciones de una columna sobre los mismos códigos."""
+        column = self._df[value_column]
+        if not (pd.api.types.is_numeric_dtype(column) or pd.api.types.is_bool_dtype(column)):
+            raise ValueError(f"La columna '{value_column}' no es numérica")
+
+        values = column.to_numpy(dtype=float, na_value=np.nan)
+        # Filas sin grupo (código -1) o sin valor no cuentan, igual que en groupby
+        valid = (codes >= 0) & ~np.isnan(values)
+        valid_codes, valid_values = codes[valid], values[valid]
+        n_groups = len(groups)
+        integer = pd.api.types.is_integer_dtype(column) or pd.api.types.is_bool_dtype(column)
+
+        results: dict[str, np.ndarray] = {}
+        count = np.bincount(valid_codes, minlength=n_groups)
+        if aggs & {"sum", "mean"}:
+            total = np.bincount(valid_codes, weights=valid_values, minlength=n_groups)
+            results["sum"] = total.astype(np.int64) if integer else total
+            if "mean" in aggs:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    results["mean"] = total / count
+        if "count" in aggs:
+            results["count"] = count
+        for agg, ufunc, start in (("min", np.minimum, np.inf), ("max", np.maximum, -np.inf)):
+            if agg in aggs:
+                extreme = np.full(n_groups, start)
+                ufunc.at(extreme, valid_codes, valid_values)
+                extreme[count == 0] = np.nan
+                results[agg] = extreme.astype(np.int64) if integer and (count > 0).all() else extreme
+
+        return {
+            agg: pd.Series(result, index=groups, name=value_column)
+            for agg, result in results.items() if agg in aggs
+        }
+
+    def get(self, group_by: str, value_column: str, agg: str = "sum") -> pd.Series:
+        """
+        Resultado de una agregación, calculándola si no estaba planificada.
+
+        Returns:
+            Serie indexada por los grupos ordenados.
+        """
+        key = (group_by, value_column, agg)
+        if key not in self._results:
+            self.plan([key])
+            self.compute()
+        return self._results[key]
+
+    def get_pair(
+        self,
+        group_by: str,
+        series_column: str,
+        value_column: str,
+        agg: str = "sum",
+    ) -> pd.DataFrame:
+        """
+        Agregación por dos columnas, p. ej. para barras agrupadas.
+
+        Reutiliza los códigos ya calculados de cada columna y combina
+        ambos en un solo código por par (grupo, serie).
+
+        Returns:
+            DataFrame con un grupo por fila y una serie por columna. Las
+            combinaciones sin filas valen 0 (o NaN en mean/min/max).
+
+        Raises:
+            ValueError: Si la agregación es inválida o hay demasiadas
+                combinaciones.
+        """
+        if agg not in AGGREGATIONS:
+            raise ValueError(f"Agregación inválida: '{agg}'. Use: {', '.join(AGGREGATIONS)}")
+        with self._lock:
+            group_codes, groups = self._group_codes(group_by)
+            series_codes, series = self._group_codes(series_column)
+            if len(groups) * len(series) > MAX_PAIR_GROUPS:
+                raise ValueError(
+                    f"Demasiadas combinaciones de '{group_by}' y '{series_column}': "
+                    f"{len(groups) * len(series):,}"
+                )
+            codes = np.where(
+                (group_codes >= 0) & (series_codes >= 0),
+                group_codes * len(series) + series_codes,
+                -1,
+            )
+            pairs = pd.MultiIndex.from_product([groups, series])
+            result = self._aggregate(codes, pairs, value_column, {agg})[agg]
+        return result.unstack(series_column)
+
+    def frame(
+        self,
+        group_by: str,
+        value_column: str,
+        aggs: tuple[str, ...] = ("sum",),
+    ) -> pd.DataFrame:
+        """
+        Varias agregaciones de una columna como tabla.
+
+        Returns:
+            DataFrame con `group_by` y una columna por agregación.
+        """
+        self.plan((group_by, value_column, agg) for agg in aggs)
+        self.compute()
+        table = pd.DataFrame({agg: self._results[(group_by, value_column, agg)] for agg in aggs})
+        return table.reset_index()
+
+    def partition(self, group_by: str) -> tuple[np.ndarray, dict]:
+        """
+        Orden de filas que deja juntas las filas de cada grupo.
+
+        Usa los mismos códigos que las agregaciones, así que no vuelve a
+        agrupar una columna ya usada en una gráfica o tabla.
+
+        Returns:
+            Posiciones de las filas ordenadas por grupo (sin las filas
+            nulas en `group_by`) y el `slice` de cada grupo en ese orden.
+        """
+        with self._lock:
+            codes, groups = self._group_codes(group_by)
+        order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(groups))
+        # Los nulos (código -1) quedan al principio del orden
+        order = order[len(codes) - counts.sum():]
+        bounds = np.concatenate([[0], np.cumsum(counts)]).tolist()
+        return order, {group: slice(bounds[i], bounds[i + 1]) for i, group in enumerate(groups)}
+
+    def to_prompt(self, max_groups: int = 10) -> str:
+        """
+        Resultados calculados como texto, para incluirlos en un prompt.
+
+        Args:
+            max_groups: Grupos máximos por agregación (los de mayor valor).
+        """
+        lines = []
+        for (group_by, value_column, agg), series in sorted(self._results.items()):
+            top = series.dropna().sort_values(ascending=False).head(max_groups)
+            values = ", ".join(f"{group}={_format_number(value)}" for group, value in top.items())
+            more = f" (+{len(series) - len(top)} more)" if len(series) > len(top) else ""
+            lines.append(f"- {agg}({value_column}) by {group_by}: {values}{more}")
+        return "\n".join(lines)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def __contains__(self, key: AggKey) -> bool:
+        return key in self._results
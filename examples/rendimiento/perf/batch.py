@@ -0,0 +1,534 @@
+"""
+Generación de reportes en lote con un pool de procesos.
+
+Cada llamada a `generate_report` o `generate_report_with_builder`
+prepara la tabla, las gráficas y el PDF en el proceso actual, uno tras
+otro. `ReportRenderer` separa esa parte, que no usa el LLM, para que
+pueda correr en otros procesos: el proceso principal pide los resúmenes
+al LLM y, a medida que están listos, los procesos de trabajo arman los
+PDFs.
+
+Los datos se escriben una vez en un archivo Arrow que cada proceso abre
+con `memory_map`, en lugar de enviar el DataFrame con pickle a cada
+proceso. Cada proceso convierte a DataFrame solo las filas y columnas
+de cada reporte; los reportes sobre todos los datos que necesitan
+todas las columnas convierten la tabla entera, una vez por proceso.
+Cada reporte retorna su propio resultado: un reporte que falla
+no detiene el lote.
+"""
+import io
+import logging
+import os
+import pickle
+import re
+import tempfile
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import ipc
+
+from qry_doc import CoverBuilder, ReportTemplate, TemplateBuilder
+from qry_doc.validators import OutputValidator
+
+from perf.aggregation import SharedAggregates, aggregation_key
+from perf.chart_cache import ChartCache
+from perf.charts import ChartRenderPool, ChartSpec, fit_to_frame, render_chart, spec_from_frame
+from perf.output import PdfOutput, is_stream
+from perf.report import PerfReportGenerator
+from perf.sections import SectionCache
+from perf.templates import CompiledTemplate, compile_template
+from perf.vector_charts import VECTOR_CHART_TYPES, draw_chart
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReportSpec:
+    """
+    Un reporte del lote.
+
+    Con `query`, el reporte es el de `generate_report` (gráfica y tabla
+    de `group_by`/`value_column`); sin `query`, el de
+    `generate_report_with_builder` (gráficas del TemplateBuilder y las
+    primeras 20 filas). `rows` limita el reporte a un rango de filas de
+    los datos, como los de `ReportRenderer.split`.
+    """
+    output_path: PdfOutput
+    query: Optional[str] = None
+    title: str = "Reporte Automático"
+    summary: Optional[str] = None
+    template: Union[ReportTemplate, TemplateBuilder, CompiledTemplate, None] = None
+    cover: Optional[CoverBuilder] = None
+    include_chart: bool = True
+    include_table: bool = True
+    chart_type: str = 'auto'
+    group_by: Optional[str] = None
+    value_column: Optional[str] = None
+    rows: Optional[slice] = None
+
+
+@dataclass
+class ReportResult:
+    """Resultado de un reporte del lote (`output_path` es None si se escribió en un flujo)."""
+    output_path: Optional[Path]
+    error: Optional[str] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def safe_name(value: Any) -> str:
+    """Valor como parte de un nombre de archivo: sin separadores ni caracteres raros."""
+    return re.sub(r"[^\w.-]+", "_", str(value)).strip("._") or "_"
+
+
+def _error_message(error: BaseException) -> str:
+    return getattr(error, "user_message", None) or OutputValidator.sanitize_error_message(error)
+
+
+class ReportRenderer:
+    """
+    Arma los PDFs de `PerfQryDoc` a partir de los datos, sin LLM.
+
+    Example:
+        ```python
+        renderer = ReportRenderer(df)
+        renderer.render(ReportSpec("ventas.pdf", query="ventas"), compile_template(), resumen)
+        ```
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        chart_cache: Optional[ChartCache] = None,
+        chart_backend: str = "raster",
+        chart_dpi: int = 200,
+        chart_pool: Optional[ChartRenderPool] = None,
+        section_cache: Optional[SectionCache] = None,
+    ) -> None:
+        """
+        Inicializa el renderizador.
+
+        Args:
+            df: Datos de los reportes.
+            chart_cache: Caché de gráficas. None = caché en memoria propia.
+            chart_backend: 'raster' o 'vector'.
+            chart_dpi: Resolución impresa de las gráficas PNG.
+            chart_pool: Pool de procesos para las gráficas de los reportes
+                con TemplateBuilder. None = en el proceso actual.
+            section_cache: Caché de secciones ya armadas. No se envía a
+                los procesos de `ReportBatch`. None = sin caché.
+        """
+        self.df = df
+        self.chart_cache = chart_cache if chart_cache is not None else ChartCache()
+        self.chart_backend = chart_backend
+        self.chart_dpi = chart_dpi
+        self.chart_pool = chart_pool
+        self.section_cache = section_cache
+        self._aggregates: Optional[SharedAggregates] = None
+
+    @property
+    def aggregates(self) -> SharedAggregates:
+        """Agregaciones por grupo de los datos, compartidas entre reportes."""
+        if self._aggregates is None:
+            self._aggregates = SharedAggregates(self.df)
+        return self._aggregates
+
+    def split(self, by: str) -> tuple["ReportRenderer", dict[Any, slice]]:
+        """
+        Separa los datos por los valores de una columna en una sola pasada.
+
+        Returns:
+            Un renderizador con las filas ordenadas por `by` y el rango de
+            filas de cada valor, para usar en `ReportSpec.rows`.
+        """
+        order, slices = self.aggregates.partition(by)
+        return self._with_frame(self.df.take(order)), slices
+
+    def _with_frame(self, df: pd.DataFrame) -> "ReportRenderer":
+        return ReportRenderer(
+            df,
+            chart_cache=self.chart_cache,
+            chart_backend=self.chart_backend,
+            chart_dpi=self.chart_dpi,
+            chart_pool=self.chart_pool,
+            section_cache=self.section_cache,
+        )
+
+    def chart_columns(self, group_by: Optional[str], value_column: Optional[str]) -> tuple[str, str]:
+        """Columnas por defecto de una gráfica: primera categórica y primera numérica."""
+        if group_by is None:
+            non_numeric = self.df.select_dtypes(exclude=['number']).columns
+            group_by = non_numeric[0] if len(non_numeric) > 0 else self.df.columns[0]
+        if value_column is None:
+            numeric = self.df.select_dtypes(include=['number']).columns
+            value_column = numeric[0] if len(numeric) > 0 else self.df.columns[-1]
+        return group_by, value_column
+
+    def chart_spec(
+        self,
+        chart_type: str,
+        group_by: Optional[str],
+        value_column: Optional[str],
+        title: Optional[str],
+        top_n: int,
+    ) -> ChartSpec:
+        """Serie de `generate_chart`: suma por grupo, los `top_n` mayores."""
+        group_by, value_column = self.chart_columns(group_by, value_column)
+        if group_by in self.df.columns and value_column in self.df.columns:
+            agg_df = self.aggregates.get(group_by, value_column, "sum").reset_index()
+            agg_df = agg_df.sort_values(value_column, ascending=False).head(top_n)
+        else:
+            agg_df = self.df.head(top_n)
+
+        if chart_type == 'auto':
+            n_categories = len(agg_df)
+            chart_type = 'pie' if n_categories <= 6 else 'bar' if n_categories <= 10 else 'barh'
+
+        return spec_from_frame(
+            agg_df,
+            chart_type=chart_type,
+            title=title or f"{value_column} por {group_by}",
+            x_column=group_by,
+            y_column=value_column,
+        )
+
+    def query_content(self, spec: ReportSpec, compiled: CompiledTemplate) -> tuple[Any, Optional[pd.DataFrame]]:
+        """Gráfica y tabla de un reporte con `query`, como `generate_report`."""
+        group_by, value_column = spec.group_by, spec.value_column
+        chart = None
+        if spec.include_chart:
+            try:
+                group_by, value_column = self.chart_columns(group_by, value_column)
+                if group_by in self.df.columns and value_column in self.df.columns:
+                    chart_spec = self.chart_spec(spec.chart_type, group_by, value_column, None, 10)
+                    width = compiled.template.content_width
+                    if self.chart_backend == "vector" and chart_spec.chart_type in VECTOR_CHART_TYPES:
+                        chart = draw_chart(chart_spec, width)
+                    else:
+                        chart_spec = fit_to_frame(chart_spec, width, dpi=self.chart_dpi)
+                        chart = self.chart_cache.get_or_render(chart_spec, render_chart)
+            except Exception as e:
+                logger.warning(f"Report chart failed: {e}")
+
+        table_data = None
+        if spec.include_table:
+            try:
+                if group_by and value_column:
+                    table_data = self.aggregates.frame(group_by, value_column, ('sum', 'mean', 'count'))
+                    table_data.columns = [group_by, 'Total', 'Promedio', 'Cantidad']
+                else:
+                    table_data = self.df.head(20)
+            except Exception:
+                table_data = None
+        return chart, table_data
+
+    def prepare(self, spec: ReportSpec, compiled: CompiledTemplate) -> None:
+        """
+        Calcula las agregaciones del reporte antes de pedir el resumen.
+
+        El prompt del resumen incluye las agregaciones ya calculadas, así
+        que se calculan las mismas que usarán la gráfica y la tabla.
+        """
+        if spec.query is None:
+            self.aggregates.plan(
+                key for key in map(aggregation_key, compiled.charts)
+                if key is not None and key[0] in self.df.columns and key[1] in self.df.columns
+            )
+            try:
+                self.aggregates.compute()
+            except Exception as e:
+                logger.warning(f"Chart aggregation failed: {e}")
+            return
+
+        group_by, value_column = spec.group_by, spec.value_column
+        if spec.include_chart:
+            group_by, value_column = self.chart_columns(group_by, value_column)
+        if group_by in self.df.columns and value_column in self.df.columns:
+            try:
+                if spec.include_chart:
+                    self.aggregates.get(group_by, value_column, "sum")
+                if spec.include_table:
+                    self.aggregates.frame(group_by, value_column, ('sum', 'mean', 'count'))
+            except Exception as e:
+                logger.warning(f"Report aggregation failed: {e}")
+
+    def render(self, spec: ReportSpec, compiled: CompiledTemplate, summary: str) -> Optional[Path]:
+        """
+        Escribe el PDF de un reporte con el resumen ya generado.
+
+        Returns:
+            Ruta del PDF, o None si se escribió en un flujo.
+        """
+        if spec.rows is not None:
+            return self._with_frame(self.df.iloc[spec.rows]).render(replace(spec, rows=None), compiled, summary)
+
+        generator = PerfReportGenerator(
+            output_path=spec.output_path,
+            template=compiled,
+            chart_pool=self.chart_pool,
+            chart_cache=self.chart_cache,
+            chart_backend=self.chart_backend,
+            chart_dpi=self.chart_dpi,
+            section_cache=self.section_cache,
+        )
+        if spec.query is not None:
+            chart, table_data = self.query_content(spec, compiled)
+            generator.build(title=spec.title, summary=summary, chart_path=chart, dataframe=table_data)
+            return generator.output_path
+
+        table_data = self.df.head(20) if spec.include_table else None
+        if compiled.charts:
+            generator.build_with_charts(
+                title=spec.title,
+                summary=summary,
+                charts=list(compiled.charts),
+                dataframe=table_data if table_data is not None else pd.DataFrame(),
+                chart_data=self.df,
+                aggregates=self.aggregates,
+            )
+        else:
+            generator.build(title=spec.title, summary=summary, dataframe=table_data)
+        return generator.output_path
+
+
+# Estado de cada proceso de trabajo: la tabla mapeada, las opciones del
+# renderizador y las plantillas del lote
+_worker_table: Optional[pa.Table] = None
+_worker_options: dict[str, Any] = {}
+_worker_renderer: Optional[ReportRenderer] = None
+_worker_templates: list[CompiledTemplate] = []
+
+
+def write_shared_frame(df: pd.DataFrame, path: Path) -> Path:
+    """Guarda el DataFrame en un archivo Arrow sin comprimir para `memory_map`."""
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    with ipc.new_file(str(path), table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def read_shared_table(path: Path) -> pa.Table:
+    """
+    Abre el archivo de `write_shared_frame` como una tabla mapeada en memoria.
+
+    Las columnas de la tabla apuntan al archivo mapeado: el proceso no
+    copia los datos hasta que `frame_from_table` convierte una parte a
+    DataFrame. El mapa queda abierto mientras viva la tabla.
+    """
+    return ipc.open_file(pa.memory_map(str(path))).read_all()
+
+
+def frame_from_table(
+    table: pa.Table,
+    rows: Optional[slice] = None,
+    columns: Optional[list[str]] = None,
+) -> pd.DataFrame:
+    """
+    Convierte a DataFrame solo las filas y columnas indicadas de la tabla.
+
+    `slice` y `select` no copian datos, y `to_pandas` sin consolidar los
+    bloques reutiliza los buffers del archivo mapeado en las columnas
+    numéricas sin nulos; los textos y las categorías sí se copian.
+
+    Args:
+        table: Tabla de `read_shared_table`.
+        rows: Rango de filas. None = todas.
+        columns: Columnas. None = todas.
+    """
+    if rows is not None:
+        start, stop, step = rows.indices(table.num_rows)
+        if step == 1:
+            table = table.slice(start, max(stop - start, 0))
+        else:
+            table = table.take(pa.array(range(start, stop, step), type=pa.int64()))
+    if columns is not None:
+        # Las columnas del índice se conservan para reconstruirlo
+        index_columns = [name for name in (table.schema.pandas_metadata or {}).get("index_columns", [])
+                         if isinstance(name, str) and name not in columns]
+        table = table.select(list(dict.fromkeys(columns)) + index_columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def _report_columns(schema: pa.Schema, spec: ReportSpec) -> Optional[list[str]]:
+    """Columnas que lee un reporte con `query`; None = todas."""
+    if spec.query is None:
+        return None
+    group_by, value_column = spec.group_by, spec.value_column
+    if spec.include_chart:
+        empty = ReportRenderer(schema.empty_table().to_pandas())
+        group_by, value_column = empty.chart_columns(group_by, value_column)
+    if group_by not in schema.names or value_column not in schema.names:
+        # Sin esas columnas la tabla del reporte son las primeras filas
+        return None
+    return [group_by, value_column]
+
+
+def _init_batch_worker(
+    data_path: str,
+    templates: list[CompiledTemplate],
+    chart_backend: str,
+    chart_dpi: int,
+    chart_cache_dir: Optional[Path],
+) -> None:
+    global _worker_table, _worker_options, _worker_renderer, _worker_templates
+    _worker_table = read_shared_table(Path(data_path))
+    _worker_options = dict(
+        chart_cache=ChartCache(directory=chart_cache_dir),
+        chart_backend=chart_backend,
+        chart_dpi=chart_dpi,
+    )
+    _worker_renderer = None
+    _worker_templates = templates
+
+
+def _worker_renderer_for(spec: ReportSpec) -> tuple[ReportRenderer, ReportSpec]:
+    """Renderizador con las filas y columnas del reporte, y el reporte sin `rows`."""
+    global _worker_renderer
+    columns = _report_columns(_worker_table.schema, spec)
+    if spec.rows is None and columns is None:
+        # Todos los datos: se convierten una vez y sus agregaciones se comparten
+        if _worker_renderer is None:
+            _worker_renderer = ReportRenderer(frame_from_table(_worker_table), **_worker_options)
+        return _worker_renderer, spec
+    frame = frame_from_table(_worker_table, spec.rows, columns)
+    return ReportRenderer(frame, **_worker_options), replace(spec, rows=None)
+
+
+def _render_in_worker(
+    spec: ReportSpec,
+    template_index: int,
+    summary: str,
+) -> tuple[Union[Path, bytes], float]:
+    """Arma un PDF en el proceso de trabajo; sin `output_path`, retorna sus bytes."""
+    started = time.perf_counter()
+    renderer, spec = _worker_renderer_for(spec)
+    if spec.output_path is None:
+        buffer = io.BytesIO()
+        renderer.render(replace(spec, output_path=buffer), _worker_templates[template_index], summary)
+        return buffer.getvalue(), time.perf_counter() - started
+    path = renderer.render(spec, _worker_templates[template_index], summary)
+    return path, time.perf_counter() - started
+
+
+class ReportBatch:
+    """
+    Lote de reportes sobre los mismos datos.
+
+    `PerfQryDoc.generate_reports` lo usa por dentro; `summarize` es la
+    función que pide el resumen de cada reporte al LLM.
+    """
+
+    def __init__(self, renderer: ReportRenderer, summarize, workers: Optional[int] = None) -> None:
+        """
+        Inicializa el lote.
+
+        Args:
+            renderer: Renderizador del proceso principal.
+            summarize: `(spec, compiled) -> str` con el resumen de un reporte.
+            workers: Procesos de trabajo. None = número de CPUs; 0 = en el
+                proceso actual.
+        """
+        self.renderer = renderer
+        self.summarize = summarize
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+
+    def run(self, specs: list[ReportSpec]) -> list[ReportResult]:
+        """
+        Genera todos los reportes.
+
+        Returns:
+            Un resultado por reporte, en el mismo orden que `specs`.
+        """
+        results = [ReportResult(None if is_stream(spec.output_path) else Path(spec.output_path))
+                   for spec in specs]
+
+        # Cada plantilla (con su portada) se compila una vez para todo el lote
+        templates: list[CompiledTemplate] = []
+        compiled_for: dict[tuple[int, int], Union[int, str]] = {}
+        template_index: list[Optional[int]] = []
+        for spec, result in zip(specs, results):
+            key = (id(spec.template), id(spec.cover))
+            if key not in compiled_for:
+                try:
+                    templates.append(compile_template(spec.template, spec.cover))
+                    compiled_for[key] = len(templates) - 1
+                except Exception as e:
+                    compiled_for[key] = _error_message(e)
+            if isinstance(compiled_for[key], str):
+                result.error = compiled_for[key]
+                template_index.append(None)
+            else:
+                template_index.append(compiled_for[key])
+
+        workers = self.workers
+        if workers > 0:
+            try:
+                pickle.dumps(templates)
+            except Exception as e:
+                # Plantillas con callbacks que no se pueden enviar a otro proceso
+                logger.warning(f"Templates cannot be sent to worker processes ({e}); rendering locally")
+                workers = 0
+
+        if workers <= 0:
+            for spec, index, result in zip(specs, template_index, results):
+                if index is not None:
+                    self._run_local(spec, templates[index], result)
+            return results
+
+        with tempfile.TemporaryDirectory(prefix="qry_doc_batch_") as tmp:
+            data_path = write_shared_frame(self.renderer.df, Path(tmp) / "data.arrow")
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_batch_worker,
+                initargs=(str(data_path), templates, self.renderer.chart_backend,
+                          self.renderer.chart_dpi, self.renderer.chart_cache.directory),
+            )
+            try:
+                futures: dict[int, Future] = {}
+                for i, (spec, index) in enumerate(zip(specs, template_index)):
+                    if index is None:
+                        continue
+                    # Los resúmenes se piden mientras los procesos arman los PDFs anteriores
+                    try:
+                        summary = self.summarize(spec, templates[index])
+                    except Exception as e:
+                        results[i].error = _error_message(e)
+                        continue
+                    # Los flujos no pasan a otro proceso: el PDF vuelve como bytes
+                    output_path = None if is_stream(spec.output_path) else spec.output_path
+                    futures[i] = executor.submit(
+                        _render_in_worker,
+                        replace(spec, output_path=output_path, template=None, cover=None),
+                        index,
+                        summary,
+                    )
+                for i, future in futures.items():
+                    try:
+                        output, results[i].seconds = future.result()
+                        if isinstance(output, bytes):
+                            specs[i].output_path.write(output)
+                        else:
+                            results[i].output_path = output
+                    except Exception as e:
+                        logger.warning(f"Report {specs[i].output_path} failed: {e}")
+                        results[i].error = _error_message(e)
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+        return results
+
+    def _run_local(self, spec: ReportSpec, compiled: CompiledTemplate, result: ReportResult) -> None:
+        started = time.perf_counter()
+        try:
+            summary = self.summarize(spec, compiled)
+            result.output_path = self.renderer.render(spec, compiled, summary)
+        except Exception as e:
+            result.error = _error_message(e)
+        result.seconds = time.perf_counter() - started
@@ -0,0 +1,415 @@
+"""
+Micro-benchmark de gráficas por tipo y tamaño de datos.
+
+Mide cada etapa de una gráfica de reporte por separado:
+
+- aggregation: de las filas a la serie de la gráfica (`spec_for_chart`)
+- render: construir la figura y rasterizarla (o dibujar el `Drawing`)
+- encode: comprimir el mapa de bits a PNG
+- embed: agregar la imagen a la historia y escribir el PDF
+
+y, para los tipos de `VALID_CHART_TYPES`, el tiempo total de
+`QryDoc.generate_chart` de la versión instalada de qry-doc. Los datos son
+sintéticos, con la forma de `examples/data/ventas.csv`, y los resultados
+se guardan como JSON para comparar versiones.
+"""
+import io
+import json
+import logging
+import platform
+import tempfile
+import time
+import warnings
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Optional, Union
+
+import numpy as np
+import pandas as pd
+from reportlab.platypus import SimpleDocTemplate
+
+from qry_doc import DEFAULT_TEMPLATE, VALID_CHART_TYPES, QryDoc, ReportTemplate
+
+from perf.aggregation import SharedAggregates
+from perf.chart_types import PERF_CHART_TYPES, PerfChartConfig, spec_for_chart
+from perf.charts import MAX_CHART_HEIGHT, draw_figure, fit_to_frame, render_chart
+from perf.report import CHART_BACKENDS, PerfReportGenerator
+from perf.standin import StandInLLM
+from perf.vector_charts import VECTOR_CHART_TYPES, draw_chart
+
+logger = logging.getLogger(__name__)
+
+# Tamaños por defecto: filas y grupos distintos (productos y fechas)
+BENCHMARK_ROWS = (1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+BENCHMARK_CATEGORIES = (10, 100, 1_000, 10_000, 100_000)
+
+STAGES = ("aggregation", "render", "encode", "embed")
+
+# Se incrementa cuando cambia lo que mide cada etapa
+BENCHMARK_VERSION = 1
+
+SAMPLE_DATA = Path(__file__).resolve().parents[2] / "data" / "ventas.csv"
+
+
+@dataclass
+class ChartTiming:
+    """
+    Tiempos de una gráfica, en segundos (mejor de las repeticiones).
+
+    Attributes:
+        chart_type: Tipo de gráfica.
+        backend: 'raster' o 'vector'.
+        rows: Filas de los datos.
+        categories: Grupos distintos de los datos.
+        aggregation: De las filas a la serie de la gráfica.
+        render: Construir y rasterizar la figura (o dibujar el vector).
+        encode: Comprimir el mapa de bits a PNG (0 en 'vector').
+        embed: Agregar la gráfica a la historia y escribir el PDF.
+        generate_chart: `QryDoc.generate_chart` completo, o None si el
+            tipo no existe en qry-doc.
+        points: Puntos de la serie después de agregar.
+        image_bytes: Bytes del PNG (0 en 'vector').
+        pdf_bytes: Bytes del PDF con la gráfica.
+        error: Mensaje de error si la gráfica falló.
+    """
+    chart_type: str
+    backend: str
+    rows: int
+    categories: int
+    aggregation: float = 0.0
+    render: float = 0.0
+    encode: float = 0.0
+    embed: float = 0.0
+    generate_chart: Optional[float] = None
+    points: int = 0
+    image_bytes: int = 0
+    pdf_bytes: int = 0
+    error: Optional[str] = None
+
+    @property
+    def total(self) -> float:
+        """Suma de las etapas del reporte."""
+        return sum(getattr(self, stage) for stage in STAGES)
+
+    @property
+    def key(self) -> tuple[str, str, int, int]:
+        return (self.chart_type, self.backend, self.rows, self.categories)
+
+
+def synthetic_sales(
+    rows: int,
+    categories: int,
+    seed: int = 0,
+    sample: Union[str, Path] = SAMPLE_DATA,
+) -> pd.DataFrame:
+    """
+    Ventas sintéticas con las columnas y distribuciones de `ventas.csv`.
+
+    Cada fila toma categoría, vendedor, región, cantidad y precio de una
+    fila real al azar (el precio con ±10% de ruido). `producto` y `fecha`
+    tienen `categories` valores distintos; las fechas cubren un año.
+    Las columnas de texto son categóricas para que 10M de filas quepan en
+    memoria.
+
+    Args:
+        rows: Filas a generar.
+        categories: Productos y fechas distintos.
+        seed: Semilla del generador.
+        sample: CSV de muestra.
+    """
+    rng = np.random.default_rng(seed)
+    base = pd.read_csv(sample)
+    source = rng.integers(0, len(base), rows)
+
+    products = base["producto"].unique()
+    names = [f"{products[i % len(products)]} {i:06d}" for i in range(categories)]
+    product_codes = rng.integers(0, categories, rows)
+    date_codes = rng.integers(0, categories, rows)
+
+    start = pd.Timestamp(base["fecha"].min())
+    step = pd.Timedelta(days=365) / categories
+    dates = pd.DatetimeIndex(start + step * np.arange(categories))
+
+    def sampled(column: str) -> pd.Categorical:
+        codes, uniques = pd.factorize(base[column], sort=True)
+        return pd.Categorical.from_codes(codes[source], uniques)
+
+    noise = rng.uniform(0.9, 1.1, rows)
+    return pd.DataFrame({
+        "fecha": dates[date_codes],
+        "producto": pd.Categorical.from_codes(product_codes, names),
+        "categoria": sampled("categoria"),
+        "cantidad": base["cantidad"].to_numpy()[source],
+        "precio_unitario": np.round(base["precio_unitario"].to_numpy()[source] * noise, 2),
+        "vendedor": sampled("vendedor"),
+        "region": sampled("region"),
+    })
+
+
+def benchmark_config(chart_type: str) -> PerfChartConfig:
+    """Gráfica representativa de cada tipo sobre `synthetic_sales`."""
+    if chart_type in ("line", "area"):
+        return PerfChartConfig(chart_type=chart_type, title="Cantidad por fecha",
+                               group_by="fecha", value_column="cantidad")
+    if chart_type == "scatter":
+        return PerfChartConfig(chart_type=chart_type, title="Cantidad vs. precio",
+                               group_by="precio_unitario", value_column="cantidad")
+    if chart_type == "hist":
+        return PerfChartConfig(chart_type=chart_type, title="Precio unitario",
+                               value_column="precio_unitario", bins=40)
+    if chart_type == "grouped_bar":
+        return PerfChartConfig(chart_type=chart_type, title="Producto y región",
+                               group_by="producto", series_column="region",
+                               value_column="cantidad")
+    return PerfChartConfig(chart_type=chart_type, title="Cantidad por producto",
+                           group_by="producto", value_column="cantidad")
+
+
+def _best(run: Callable[[], object], repeat: int) -> tuple[float, object]:
+    """Mejor tiempo de `repeat` ejecuciones y el último resultado."""
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def _encode(fig) -> bytes:
+    """Comprime a PNG el lienzo ya rasterizado, como hace `savefig`."""
+    from PIL import Image as PILImage
+
+    buffer = io.BytesIO()
+    PILImage.frombuffer("RGBA", fig.canvas.get_width_height(),
+                        fig.canvas.buffer_rgba(), "raw", "RGBA", 0, 1).save(buffer, format="png")
+    return buffer.getvalue()
+
+
+def _embed(generator: PerfReportGenerator, image) -> int:
+    """Agrega la gráfica a una historia nueva y escribe el PDF en memoria."""
+    template = generator.template
+    generator.story = []
+    generator._add_chart(image)
+    buffer = io.BytesIO()
+    SimpleDocTemplate(
+        buffer,
+        pagesize=template.page_size,
+        leftMargin=template.margin_left,
+        rightMargin=template.margin_right,
+        topMargin=template.margin_top,
+        bottomMargin=template.margin_bottom,
+    ).build(generator.story)
+    return len(buffer.getvalue())
+
+
+def time_chart(
+    df: pd.DataFrame,
+    config: PerfChartConfig,
+    backend: str = "raster",
+    template: ReportTemplate = DEFAULT_TEMPLATE,
+    dpi: Union[str, int] = "print",
+    repeat: int = 3,
+    qry: Optional[QryDoc] = None,
+    categories: int = 0,
+) -> ChartTiming:
+    """
+    Mide las etapas de una gráfica de reporte.
+
+    Args:
+        df: Datos.
+        config: Gráfica a medir.
+        backend: 'raster' o 'vector' (solo para `VECTOR_CHART_TYPES`).
+        template: Plantilla del reporte (define el espacio de la gráfica).
+        dpi: Resolución impresa de las gráficas PNG.
+        repeat: Repeticiones por etapa; se guarda la mejor.
+        qry: `QryDoc` sobre `df` para medir también `generate_chart`.
+        categories: Grupos distintos de `df`, solo para el resultado.
+
+    Returns:
+        Los tiempos, o el error si la gráfica falló.
+    """
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"backend inválido: '{backend}'. Use: {', '.join(CHART_BACKENDS)}")
+    timing = ChartTiming(config.chart_type, backend, len(df), categories)
+    generator = PerfReportGenerator(Path("benchmark.pdf"), template, chart_dpi=dpi)
+
+    try:
+        # Agregaciones nuevas en cada repetición: se mide el cálculo, no la caché
+        timing.aggregation, spec = _best(
+            lambda: spec_for_chart(df, config, SharedAggregates(df)), repeat
+        )
+        timing.points = len(spec)
+
+        if backend == "vector":
+            if config.chart_type not in VECTOR_CHART_TYPES:
+                raise ValueError(f"Tipo sin versión vectorial: '{config.chart_type}'")
+            timing.render, image = _best(
+                lambda: draw_chart(spec, template.content_width, MAX_CHART_HEIGHT), repeat
+            )
+        else:
+            spec = fit_to_frame(spec, template.content_width, MAX_CHART_HEIGHT, dpi)
+
+            def rasterize():
+                fig = draw_figure(spec)
+                fig.canvas.draw()
+                return fig
+
+            timing.render, fig = _best(rasterize, repeat)
+            timing.encode, _ = _best(lambda: _encode(fig), repeat)
+            # La imagen que se incrusta es la de render_chart, con su recorte
+            image = render_chart(spec)
+            timing.image_bytes = len(image)
+
+        timing.embed, timing.pdf_bytes = _best(lambda: _embed(generator, image), repeat)
+
+        if qry is not None and config.chart_type in VALID_CHART_TYPES:
+            with tempfile.TemporaryDirectory() as tmp, warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)
+                timing.generate_chart, _ = _best(
+                    lambda: qry.generate_chart(
+                        Path(tmp) / "chart.png", chart_type=config.chart_type,
+                        group_by=config.group_by, value_column=config.value_column,
+                        title=config.title,
+                    ),
+                    repeat,
+                )
+    except Exception as e:
+        logger.warning(f"Benchmark of {config.chart_type} ({backend}) failed: {e}")
+        timing.error = str(e)
+    return timing
+
+
+def environment() -> dict:
+    """Versiones que afectan los tiempos, para comparar resultados."""
+    from importlib.metadata import PackageNotFoundError, version
+
+    versions = {}
+    for package in ("qry-doc", "matplotlib", "reportlab", "pandas", "numpy", "pillow"):
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return {
+        "benchmark_version": BENCHMARK_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "packages": versions,
+    }
+
+
+def run_chart_benchmark(
+    rows: Iterable[int] = BENCHMARK_ROWS,
+    categories: Iterable[int] = BENCHMARK_CATEGORIES,
+    chart_types: Iterable[str] = PERF_CHART_TYPES,
+    backends: Iterable[str] = ("raster", "vector"),
+    template: ReportTemplate = DEFAULT_TEMPLATE,
+    dpi: Union[str, int] = "print",
+    repeat: int = 3,
+    seed: int = 0,
+    on_result: Optional[Callable[[ChartTiming], None]] = None,
+) -> dict:
+    """
+    Mide todas las gráficas en todos los tamaños.
+
+    Las combinaciones con más grupos que filas se omiten. El backend
+    'vector' solo se mide en `VECTOR_CHART_TYPES`.
+
+    Args:
+        rows: Tamaños de los datos, en filas.
+        categories: Grupos distintos (productos y fechas).
+        chart_types: Tipos a medir.
+        backends: Backends a medir.
+        template: Plantilla del reporte.
+        dpi: Resolución impresa de las gráficas PNG.
+        repeat: Repeticiones por etapa; se guarda la mejor.
+        seed: Semilla de los datos sintéticos.
+        on_result: Función opcional llamada con cada resultado.
+
+    Returns:
+        Diccionario serializable a JSON con `environment`, `settings` y
+        `results`.
+    """
+    chart_types, backends = tuple(chart_types), tuple(backends)
+    settings = {
+        "rows": list(rows), "categories": list(categories), "chart_types": list(chart_types),
+        "backends": list(backends), "dpi": dpi, "repeat": repeat, "seed": seed,
+    }
+    llm = StandInLLM("benchmark", latency=0)
+    results = []
+    for n_rows in settings["rows"]:
+        for n_categories in settings["categories"]:
+            if n_categories > n_rows:
+                continue
+            df = synthetic_sales(n_rows, n_categories, seed)
+            qry = QryDoc(df, llm=llm)
+            for chart_type in chart_types:
+                for backend in backends:
+                    if backend == "vector" and chart_type not in VECTOR_CHART_TYPES:
+                        continue
+                    timing = time_chart(
+                        df, benchmark_config(chart_type), backend, template, dpi, repeat,
+                        qry=qry if backend == "raster" else None, categories=n_categories,
+                    )
+                    results.append(timing)
+                    if on_result is not None:
+                        on_result(timing)
+            del df, qry
+
+    return {
+        "environment": environment(),
+        "settings": settings,
+        "results": [asdict(timing) for timing in results],
+    }
+
+
+def save_benchmark(results: dict, path: Union[str, Path]) -> Path:
+    """Guarda los resultados como JSON."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def load_benchmark(path: Union[str, Path]) -> list[ChartTiming]:
+    """Lee los resultados de un JSON de `save_benchmark`."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    return [ChartTiming(**result) for result in data["results"]]
+
+
+def compare_benchmarks(
+    baseline: Iterable[ChartTiming],
+    current: Iterable[ChartTiming],
+    tolerance: float = 0.10,
+    min_seconds: float = 0.005,
+) -> list[dict]:
+    """
+    Etapas que se volvieron más lentas entre dos ejecuciones.
+
+    Args:
+        baseline: Resultados de referencia (p. ej. la versión anterior).
+        current: Resultados nuevos.
+        tolerance: Aumento relativo permitido (0.10 = 10%).
+        min_seconds: Diferencias absolutas menores se ignoran (ruido).
+
+    Returns:
+        Una entrada por etapa más lenta, de mayor a menor proporción.
+    """
+    previous = {timing.key: timing for timing in baseline}
+    regressions = []
+    for timing in current:
+        before = previous.get(timing.key)
+        if before is None or before.error or timing.error:
+            continue
+        for stage in STAGES + ("generate_chart",):
+            old, new = getattr(before, stage), getattr(timing, stage)
+            if old is None or new is None or new - old < min_seconds:
+                continue
+            if old == 0 or new > old * (1 + tolerance):
+                regressions.append({
+                    "chart_type": timing.chart_type, "backend": timing.backend,
+                    "rows": timing.rows, "categories": timing.categories,
+                    "stage": stage, "baseline": old, "current": new,
+                    "ratio": new / old if old else float("inf"),
+                })
+    return sorted(regressions, key=lambda r: r["ratio"], reverse=True)
@@ -0,0 +1,289 @@
+"""
+Caché de gráficas direccionada por contenido.
+
+La clave de cada imagen es un hash de todo lo que la define: tipo,
+título, serie agregada, colores, tamaño y DPI. Dos gráficas iguales,
+en el mismo reporte, en otro reporte o en otra ejecución, producen la
+misma clave y la imagen se reutiliza sin volver a renderizarla.
+"""
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+import numpy as np
+from pandasai.constants import DEFAULT_CHART_DIRECTORY
+
+from perf.charts import ChartSpec
+
+logger = logging.getLogger(__name__)
+
+# Se incrementa cuando cambia el renderizado, para invalidar imágenes viejas
+RENDERER_VERSION = 3
+
+# Destino por defecto de las gráficas del LLM (ver LLMChartStore)
+LLM_CHART_DIRECTORY = Path(DEFAULT_CHART_DIRECTORY) / "by_content"
+
+# PandasAI reescribe toda ruta .png del código generado a este patrón
+_TEMP_CHART_RE = re.compile(r"[^\s'\"]*temp_chart_[0-9a-f\-]{36}\.png")
+
+
+def chart_key(spec: ChartSpec) -> str:
+    """Hash SHA-256 del contenido de una gráfica."""
+    digest = hashlib.sha256()
+    header = (
+        RENDERER_VERSION, spec.chart_type, spec.title, spec.x_label, spec.y_label,
+        spec.color, tuple(spec.palette), tuple(spec.figsize), spec.dpi,
+        spec.values.shape, spec.series, spec.extent, spec.style,
+    )
+    digest.update(repr(header).encode("utf-8"))
+    digest.update("\x1f".join(spec.labels).encode("utf-8"))
+    digest.update(spec.values.astype("<f8").tobytes())
+    if spec.x is not None:
+        digest.update(str(spec.x.dtype).encode("utf-8"))
+        digest.update(np.ascontiguousarray(spec.x).tobytes())
+    return digest.hexdigest()
+
+
+def evict_directory(directory: Path, max_bytes: int) -> int:
+    """
+    Elimina los PNG con el acceso más antiguo hasta respetar `max_bytes`.
+
+    Returns:
+        Bytes de PNG que quedan en el directorio.
+    """
+    files = []
+    for path in directory.glob("*.png"):
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+    return total
+
+
+class ChartCache:
+    """
+    Caché LRU de imágenes de gráficas con tamaño máximo en bytes.
+
+    Features:
+    - Claves por contenido (`chart_key`), sin nombres aleatorios
+    - Memoria acotada por `max_bytes` con desalojo LRU
+    - Directorio opcional para reutilizar imágenes entre ejecuciones,
+      acotado por `max_disk_bytes` con desalojo por último acceso
+    - Seguro entre hilos
+
+    Example:
+        ```python
+        cache = ChartCache(max_bytes=32 * 1024 * 1024, directory="output/chart_cache")
+        png = cache.get_or_render(spec, render_chart)
+        ```
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        directory: Optional[Union[str, Path]] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        """
+        Inicializa la caché.
+
+        Args:
+            max_bytes: Bytes máximos en memoria.
+            directory: Directorio opcional para persistir las imágenes.
+            max_disk_bytes: Bytes máximos en el directorio.
+        """
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.directory = Path(directory) if directory is not None else None
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._disk_size = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            self._disk_size = evict_directory(self.directory, self.max_disk_bytes)
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.png"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Imagen de una clave, o None si no está en la caché."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return data
+
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                data = path.read_bytes()
+                os.utime(path)  # Marca el acceso para el desalojo en disco
+            except OSError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self.hits += 1
+                self._store(key, data)
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, data: bytes) -> None:
+        """Guarda una imagen en memoria y, si hay directorio, en disco."""
+        self._store(key, data)
+        if self.directory is not None:
+            path = self._path(key)
+            partial = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.part")
+            try:
+                previous = path.stat().st_size if path.exists() else 0
+                partial.write_bytes(data)
+                os.replace(partial, path)
+            except OSError as e:
+                partial.unlink(missing_ok=True)
+                logger.warning(f"Chart cache write failed: {e}")
+                return
+            with self._lock:
+                self._disk_size += len(data) - previous
+                over = self._disk_size > self.max_disk_bytes
+            if over:
+                self._evict_disk()
+
+    def _store(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def _evict_disk(self) -> None:
+        """
+        Elimina las imágenes menos usadas hasta respetar `max_disk_bytes`.
+
+        Solo se llama al pasar el límite: el tamaño del directorio se
+        lleva en memoria y aquí se vuelve a medir, por si otros procesos
+        escriben en el mismo directorio.
+        """
+        size = evict_directory(self.directory, self.max_disk_bytes)
+        with self._lock:
+            self._disk_size = size
+
+    def get_or_render(self, spec: ChartSpec, render: Callable[[ChartSpec], bytes]) -> bytes:
+        """Retorna la imagen de la caché o la renderiza y la guarda."""
+        key = chart_key(spec)
+        data = self.get(key)
+        if data is None:
+            data = render(spec)
+            self.put(key, data)
+        return data
+
+    def clear(self) -> None:
+        """Vacía la memoria (el directorio se conserva)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        """Bytes en memoria."""
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+
+class LLMChartStore:
+    """
+    Directorio de las gráficas de las respuestas del LLM, acotado en bytes.
+
+    PandasAI guarda cada gráfica generada por el LLM como
+    `exports/charts/temp_chart_<uuid>.png`, así que se acumulan sin fin.
+    `adopt` mueve cada archivo mencionado en una respuesta a
+    `directory/<sha256>.png` (dos gráficas iguales comparten archivo) y
+    actualiza las rutas del texto. Solo se tocan las rutas de la
+    respuesta: las gráficas de otras instancias o hilos que generan al
+    mismo tiempo quedan donde están.
+
+    Al pasar de `max_bytes` se borran las gráficas con el acceso más
+    antiguo, así que la ruta de una respuesta vieja puede dejar de
+    existir: copie la imagen si la necesita por más tiempo. Use un
+    directorio propio, no el de un `ChartCache`.
+
+    Example:
+        ```python
+        store = LLMChartStore("output/llm_charts", max_bytes=16 * 1024 * 1024)
+        qry = PerfQryDoc(df, llm=llm, llm_chart_store=store)
+        ```
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path] = LLM_CHART_DIRECTORY,
+        max_bytes: int = 64 * 1024 * 1024,
+    ) -> None:
+        """
+        Inicializa el directorio.
+
+        Args:
+            directory: Directorio de las gráficas; se crea en el primer uso.
+            max_bytes: Bytes máximos en el directorio.
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._size: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def adopt(self, text: str) -> str:
+        """
+        Mueve las gráficas temporales mencionadas en `text` al directorio.
+
+        Returns:
+            El texto con las rutas nuevas.
+        """
+        for match in set(_TEMP_CHART_RE.findall(text)):
+            path = Path(match)
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue
+            target = self.directory / f"{hashlib.sha256(data).hexdigest()}.png"
+            with self._lock:
+                if self._size is None:
+                    self.directory.mkdir(parents=True, exist_ok=True)
+                    self._size = evict_directory(self.directory, self.max_bytes)
+                if target.exists():
+                    os.utime(target)  # Marca el acceso para el desalojo
+                else:
+                    target.write_bytes(data)
+                    self._size += len(data)
+                if self._size > self.max_bytes:
+                    self._size = evict_directory(self.directory, self.max_bytes)
+            path.unlink(missing_ok=True)
+            text = text.replace(match, str(target))
+        return text
@@ -0,0 +1,366 @@
+"""
+Tipos de gráfica para datos grandes.
+
+`ChartConfig` admite barras, pastel, línea, dispersión y área, y cada
+gráfica dibuja tantos elementos como grupos o filas haya.
+`PerfChartConfig` agrega histogramas y barras agrupadas y prepara cada
+gráfica para que dibuje un número acotado de elementos:
+
+- Líneas: un punto por valor de X y, con más de `max_points`, reducción
+  con LTTB (Largest-Triangle-Three-Buckets), que conserva la forma
+- Histogramas: intervalos calculados con `np.histogram`
+- Dispersión: con más de `max_points` filas, densidad en una rejilla 2-D
+- Barras y pastel: los `top_n` grupos mayores y el resto en "Otros"
+
+El trabajo proporcional al número de filas se hace con NumPy al preparar
+la gráfica; el renderizado solo recibe la serie reducida.
+"""
+import logging
+from dataclasses import dataclass, replace
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from qry_doc import ChartConfig, VALID_CHART_TYPES
+
+from perf.aggregation import AGGREGATIONS, AggKey, SharedAggregates
+from perf.charts import ChartSpec, spec_from_config
+
+logger = logging.getLogger(__name__)
+
+# Tipos que agrega PerfChartConfig a los de ChartConfig
+EXTRA_CHART_TYPES = ("hist", "grouped_bar")
+PERF_CHART_TYPES = tuple(sorted(VALID_CHART_TYPES)) + EXTRA_CHART_TYPES
+
+# Grupos máximos por tipo cuando no se indica `top_n`
+AUTO_TOP_N = {"bar": 20, "barh": 20, "pie": 8, "area": 30, "grouped_bar": 12}
+
+# Series máximas en barras agrupadas (el resto se suma en "Otros")
+MAX_SERIES = 6
+
+# Celdas por eje de la rejilla de densidad
+DENSITY_BINS = 80
+
+OTHERS_LABEL = "Otros"
+
+
+@dataclass
+class PerfChartConfig(ChartConfig):
+    """
+    ChartConfig con tipos y opciones para datos grandes.
+
+    Attributes:
+        agg: Agregación por grupo ('sum', 'mean', 'count', 'min', 'max').
+        top_n: Grupos que se muestran; el resto se agrupa en "Otros".
+            None = automático según el tipo (`AUTO_TOP_N`).
+        bins: Intervalos del histograma.
+        series_column: Columna de las series en 'grouped_bar'.
+        max_points: Puntos máximos en líneas y dispersión.
+
+    Example:
+        ```python
+        charts = [
+            PerfChartConfig(chart_type="line", title="Ventas diarias",
+                            group_by="fecha", value_column="cantidad"),
+            PerfChartConfig(chart_type="hist", title="Cantidades",
+                            value_column="cantidad", bins=40),
+            PerfChartConfig(chart_type="grouped_bar", title="Región y categoría",
+                            group_by="region", series_column="categoria",
+                            value_column="cantidad"),
+        ]
+        ```
+    """
+    agg: str = "sum"
+    top_n: Optional[int] = None
+    bins: int = 30
+    series_column: Optional[str] = None
+    max_points: int = 2000
+
+    def validate(self) -> tuple[bool, Optional[str]]:
+        """Valida la configuración, incluidos los tipos y opciones nuevos."""
+        if self.chart_type not in PERF_CHART_TYPES:
+            return (
+                False,
+                f"Invalid chart_type '{self.chart_type}'. "
+                f"Must be one of: {', '.join(PERF_CHART_TYPES)}"
+            )
+        if self.chart_type in EXTRA_CHART_TYPES:
+            # El resto de validaciones de ChartConfig no depende del tipo
+            is_valid, error = ChartConfig.validate(replace(self, chart_type="bar"))
+        else:
+            is_valid, error = super().validate()
+        if not is_valid:
+            return (is_valid, error)
+
+        if self.agg not in AGGREGATIONS:
+            return (False, f"Invalid agg '{self.agg}'. Must be one of: {', '.join(AGGREGATIONS)}")
+        if self.top_n is not None and self.top_n < 1:
+            return (False, f"top_n must be positive, got {self.top_n}")
+        if self.bins < 1:
+            return (False, f"bins must be positive, got {self.bins}")
+        if self.max_points < 3:
+            return (False, f"max_points must be at least 3, got {self.max_points}")
+        if self.chart_type == "hist" and not self.value_column:
+            return (False, "hist charts require value_column")
+        if self.chart_type == "grouped_bar" and not (self.group_by and self.series_column and self.value_column):
+            return (False, "grouped_bar charts require group_by, series_column and value_column")
+        if self.chart_type in ("line", "scatter") and not (self.group_by and self.value_column):
+            return (False, f"{self.chart_type} charts require group_by and value_column")
+        return (True, None)
+
+    def aggregation_key(self) -> Optional[AggKey]:
+        """Agregación por grupo compartible (ver `SharedAggregates`)."""
+        if self.chart_type in ("hist", "scatter", "grouped_bar"):
+            return None
+        if self.group_by and self.value_column:
+            return (self.group_by, self.value_column, self.agg)
+        return None
+
+    @property
+    def effective_top_n(self) -> Optional[int]:
+        """`top_n` indicado o el automático del tipo."""
+        return self.top_n if self.top_n is not None else AUTO_TOP_N.get(self.chart_type)
+
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Índices de los puntos que conserva Largest-Triangle-Three-Buckets.
+
+    Divide la serie en `n_out - 2` cubetas y de cada una conserva el
+    punto que forma el triángulo de mayor área con el punto elegido en la
+    cubeta anterior y el promedio de la siguiente. El primer y el último
+    punto siempre se conservan.
+
+    Args:
+        x: Posiciones, en orden creciente.
+        y: Valores.
+        n_out: Puntos a conservar.
+
+    Returns:
+        Índices crecientes de los puntos conservados.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = x.astype(float)
+    y = y.astype(float)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+
+    previous = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[next_start:next_end].mean()
+        next_y = y[next_start:next_end].mean()
+        # Doble del área del triángulo (punto anterior, candidato, promedio siguiente)
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+    return selected
+
+
+def fold_others(
+    values: pd.Series,
+    top_n: Optional[int],
+    agg: str = "sum",
+    counts: Optional[pd.Series] = None,
+) -> pd.Series:
+    """
+    Conserva los `top_n` grupos mayores y agrega el resto en "Otros".
+
+    "Otros" se calcula con la misma agregación: suma de las sumas y los
+    conteos, mínimo de los mínimos, máximo de los máximos y, para 'mean',
+    promedio ponderado por `counts`.
+
+    Returns:
+        La serie sin cambios si tiene `top_n` grupos o menos; si no, los
+        mayores en orden descendente seguidos de "Otros".
+    """
+    values = values.dropna()
+    if top_n is None or len(values) <= top_n:
+        return values
+
+    order = values.sort_values(ascending=False)
+    top, rest = order.iloc[:top_n], order.iloc[top_n:]
+    if agg in ("sum", "count"):
+        others = rest.sum()
+    elif agg == "min":
+        others = rest.min()
+    elif agg == "max":
+        others = rest.max()
+    else:
+        weights = counts.reindex(rest.index).fillna(0) if counts is not None else None
+        others = np.average(rest, weights=weights) if weights is not None and weights.sum() else rest.mean()
+    folded = pd.concat([top, pd.Series([others], index=[OTHERS_LABEL])])
+    folded.index = [str(label) for label in folded.index]
+    return folded
+
+
+def _numeric(series: pd.Series, name: str) -> np.ndarray:
+    if not (pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series)):
+        raise ValueError(f"La columna '{name}' no es numérica")
+    return series.to_numpy(dtype=float, na_value=np.nan)
+
+
+def _base_spec(config: PerfChartConfig, **fields) -> ChartSpec:
+    return ChartSpec(
+        chart_type=config.chart_type,
+        title=config.title,
+        color=config.color,
+        figsize=tuple(config.figsize),
+        **fields,
+    )
+
+
+def _category_spec(df: pd.DataFrame, config: PerfChartConfig, aggregates: SharedAggregates) -> ChartSpec:
+    """Barras, pastel y área: agregación por grupo con "Otros"."""
+    if not (config.group_by in df.columns and config.value_column in df.columns):
+        return spec_from_config(df, config)
+    series = aggregates.get(config.group_by, config.value_column, config.agg)
+    counts = aggregates.get(config.group_by, config.value_column, "count") if config.agg == "mean" else None
+    series = fold_others(series, config.effective_top_n, config.agg, counts)
+    return _base_spec(
+        config,
+        labels=[str(label) for label in series.index],
+        values=series.to_numpy(dtype=float),
+        x_label=config.group_by,
+        y_label=config.value_column,
+    )
+
+
+def _line_spec(df: pd.DataFrame, config: PerfChartConfig, aggregates: SharedAggregates) -> ChartSpec:
+    """Línea: un punto por valor de X y reducción LTTB a `max_points`."""
+    series = aggregates.get(config.group_by, config.value_column, config.agg).dropna()
+    index = series.index
+    y = series.to_numpy(dtype=float)
+
+    labels: list[str] = []
+    if pd.api.types.is_datetime64_any_dtype(index):
+        x = index.to_numpy(dtype="datetime64[ns]")
+        positions = x.astype("int64").astype(float)
+    elif pd.api.types.is_numeric_dtype(index):
+        x = positions = index.to_numpy(dtype=float)
+    else:
+        # Categorías ordenadas (p. ej. fechas como texto): posiciones 0..n-1
+        x = positions = np.arange(len(index), dtype=float)
+        labels = [str(label) for label in index]
+
+    keep = lttb(positions, y, config.max_points)
+    return _base_spec(
+        config,
+        labels=[labels[i] for i in keep] if labels else [],
+        values=y[keep],
+        x=x[keep],
+        x_label=config.group_by,
+        y_label=config.value_column,
+    )
+
+
+def _hist_spec(df: pd.DataFrame, config: PerfChartConfig, aggregates: SharedAggregates) -> ChartSpec:
+    """Histograma: conteos por intervalo con `np.histogram`."""
+    values = _numeric(df[config.value_column], config.value_column)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        raise ValueError(f"La columna '{config.value_column}' no tiene valores")
+    counts, edges = np.histogram(values, bins=config.bins)
+    return _base_spec(
+        config,
+        labels=[],
+        values=counts.astype(float),
+        x=edges,
+        x_label=config.value_column,
+        y_label="Frecuencia",
+    )
+
+
+def _scatter_spec(df: pd.DataFrame, config: PerfChartConfig, aggregates: SharedAggregates) -> ChartSpec:
+    """Dispersión: puntos si son pocos, densidad en rejilla 2-D si no."""
+    x = _numeric(df[config.group_by], config.group_by)
+    y = _numeric(df[config.value_column], config.value_column)
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    if len(x) == 0:
+        raise ValueError("La gráfica de dispersión no tiene datos")
+
+    if len(x) <= config.max_points:
+        return _base_spec(config, labels=[], values=y, x=x,
+                          x_label=config.group_by, y_label=config.value_column)
+
+    grid, x_edges, y_edges = np.histogram2d(x, y, bins=DENSITY_BINS)
+    return _base_spec(
+        config,
+        labels=[],
+        values=grid.T,  # Filas = Y, como espera imshow
+        extent=(float(x_edges[0]), float(x_edges[-1]), float(y_edges[0]), float(y_edges[-1])),
+        x_label=config.group_by,
+        y_label=config.value_column,
+    )
+
+
+def _combine(frame: pd.DataFrame, agg: str, axis: int) -> pd.Series:
+    """Agrega filas (axis=0) o columnas (axis=1) de una tabla para "Otros"."""
+    return getattr(frame, agg)(axis=axis)
+
+
+def _grouped_spec(df: pd.DataFrame, config: PerfChartConfig, aggregates: SharedAggregates) -> ChartSpec:
+    """Barras agrupadas: grupos x series, con "Otros" en ambos ejes."""
+    table = aggregates.get_pair(config.group_by, config.series_column, config.value_column, config.agg)
+    fold = "sum" if config.agg in ("sum", "count") else config.agg
+
+    top_n = config.effective_top_n
+    if top_n is not None and len(table) > top_n:
+        order = table.sum(axis=1).sort_values(ascending=False).index
+        others = _combine(table.loc[order[top_n:]], fold, axis=0)
+        table = pd.concat([table.loc[order[:top_n]], others.to_frame(OTHERS_LABEL).T])
+
+    if table.shape[1] > MAX_SERIES:
+        order = table.sum().sort_values(ascending=False).index
+        others = _combine(table[order[MAX_SERIES - 1:]], fold, axis=1)
+        table = table[order[:MAX_SERIES - 1]].assign(**{OTHERS_LABEL: others})
+
+    return _base_spec(
+        config,
+        labels=[str(label) for label in table.index],
+        values=table.to_numpy(dtype=float).T,
+        series=tuple(str(name) for name in table.columns),
+        x_label=config.group_by,
+        y_label=config.value_column,
+    )
+
+
+_BUILDERS = {
+    "line": _line_spec,
+    "hist": _hist_spec,
+    "scatter": _scatter_spec,
+    "grouped_bar": _grouped_spec,
+}
+
+
+def spec_for_chart(
+    df: pd.DataFrame,
+    config: ChartConfig,
+    aggregates: Optional[SharedAggregates] = None,
+) -> ChartSpec:
+    """
+    Prepara la serie de cualquier configuración de gráfica.
+
+    Un `ChartConfig` normal se prepara igual que en `ReportGenerator`
+    (`spec_from_config`); un `PerfChartConfig` usa el preparador de su tipo.
+
+    Raises:
+        ValueError: Si las columnas no sirven para el tipo de gráfica.
+        KeyError: Si una columna no existe.
+    """
+    if not isinstance(config, PerfChartConfig):
+        return spec_from_config(df, config, aggregates)
+    if aggregates is None:
+        aggregates = SharedAggregates(df)
+    builder = _BUILDERS.get(config.chart_type, _category_spec)
+    return builder(df, config, aggregates)
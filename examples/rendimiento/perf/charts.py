@@ -0,0 +1,447 @@
+"""
+Renderizado de gráficas en procesos de trabajo.
+
+Las gráficas de un reporte se preparan en el proceso principal, donde
+viven los datos, y solo la serie ya agregada (`ChartSpec`) viaja a los
+procesos de trabajo. Cada proceso tiene matplotlib importado desde que
+arranca y retorna la imagen como bytes PNG.
+
+El renderizado usa objetos `Figure` con su propio lienzo Agg y estilos
+explícitos (`ChartStyle`), sin pyplot ni estado global: también es
+seguro renderizar desde varios hilos del mismo proceso.
+"""
+import io
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from qry_doc.chart_generator import ChartGenerator
+
+if TYPE_CHECKING:
+    from matplotlib.figure import Figure
+
+    from qry_doc import ChartConfig
+
+    from perf.aggregation import SharedAggregates
+
+logger = logging.getLogger(__name__)
+
+# Resolución de las imágenes en el PDF, en píxeles por pulgada impresa
+DPI_PROFILES = {"draft": 72, "screen": 110, "print": 200}
+
+# Alto máximo de una gráfica en puntos (igual que ReportGenerator._add_chart)
+MAX_CHART_HEIGHT = 300
+
+
+@dataclass(frozen=True)
+class ChartStyle:
+    """
+    Estilo explícito de una gráfica.
+
+    `render_chart` aplica estos valores directamente a cada elemento en
+    lugar de leerlos de `matplotlib.rcParams`, así que un
+    `plt.style.use()` o un cambio de `rcParams` en otro hilo no altera la
+    imagen. Los valores por defecto reproducen el estilo de `ChartGenerator`.
+    """
+    font_family: str = "DejaVu Sans"
+    font_size: float = 10
+    title_size: float = 14
+    text_color: str = "black"
+    axes_color: str = "black"
+    background: str = "white"
+    grid_color: str = "#b0b0b0"
+    grid_alpha: float = 0.3
+    line_width: float = 2
+
+
+@dataclass
+class ChartSpec:
+    """
+    Serie agregada y estilo de una gráfica, lista para renderizar.
+
+    Además de categorías (`labels`) y valores, admite:
+    - `x`: posiciones numéricas o fechas (líneas y dispersión) o los
+      bordes de los intervalos (histogramas)
+    - `series`: nombres de las series de una gráfica de barras agrupadas;
+      `values` tiene una fila por serie
+    - `extent`: límites (xmin, xmax, ymin, ymax) de una dispersión
+      resumida como densidad; `values` es la rejilla de conteos
+    """
+    chart_type: str
+    title: str
+    labels: list[str]
+    values: np.ndarray
+    x_label: str
+    y_label: str
+    color: Optional[str] = None
+    figsize: tuple[float, float] = (10, 6)
+    dpi: int = 150
+    palette: tuple[str, ...] = field(default_factory=lambda: tuple(ChartGenerator.COLORS))
+    x: Optional[np.ndarray] = None
+    series: tuple[str, ...] = ()
+    extent: Optional[tuple[float, float, float, float]] = None
+    style: ChartStyle = field(default_factory=ChartStyle)
+
+    def __len__(self) -> int:
+        """Categorías, puntos o intervalos de la gráfica."""
+        return self.values.shape[-1] if self.values.ndim else 0
+
+
+def resolve_dpi(dpi: Union[str, int]) -> int:
+    """
+    Resolución de un perfil ('draft', 'screen', 'print') o un valor en DPI.
+
+    Raises:
+        ValueError: Si el perfil no existe o el valor no es positivo.
+    """
+    if isinstance(dpi, str):
+        if dpi not in DPI_PROFILES:
+            raise ValueError(f"Perfil de DPI inválido: '{dpi}'. Use: {', '.join(DPI_PROFILES)}")
+        return DPI_PROFILES[dpi]
+    if dpi <= 0:
+        raise ValueError(f"dpi debe ser mayor que 0, se recibió {dpi}")
+    return int(dpi)
+
+
+def frame_size(
+    figsize: tuple[float, float],
+    max_width: float,
+    max_height: float = MAX_CHART_HEIGHT,
+) -> tuple[float, float]:
+    """
+    Tamaño en puntos que ocupa una gráfica en el reporte.
+
+    Conserva la proporción de `figsize` y la ajusta al ancho y alto
+    disponibles, igual que `ReportGenerator._add_chart` ajusta las imágenes.
+    """
+    fig_width, fig_height = figsize
+    scale = min(max_width / fig_width, max_height / fig_height)
+    return fig_width * scale, fig_height * scale
+
+
+def fit_to_frame(
+    spec: ChartSpec,
+    max_width: float,
+    max_height: float = MAX_CHART_HEIGHT,
+    dpi: Union[str, int] = "print",
+) -> ChartSpec:
+    """
+    Ajusta la resolución de una gráfica al espacio que ocupará en el PDF.
+
+    El tamaño de la figura no cambia (la gráfica se ve igual); solo se
+    reduce el DPI para que la imagen tenga los píxeles que necesita el
+    tamaño impreso con la resolución pedida, en lugar de renderizarla a
+    150 DPI y que ReportLab la reduzca.
+
+    Args:
+        spec: Gráfica a ajustar.
+        max_width: Ancho disponible en puntos (`template.content_width`).
+        max_height: Alto máximo en puntos.
+        dpi: Perfil de `DPI_PROFILES` o resolución impresa en DPI.
+
+    Returns:
+        Una copia de `spec` con el DPI de renderizado ajustado.
+    """
+    width, _ = frame_size(spec.figsize, max_width, max_height)
+    printed_inches = width / 72
+    render_dpi = resolve_dpi(dpi) * printed_inches / spec.figsize[0]
+    return replace(spec, dpi=max(int(round(render_dpi)), 1))
+
+
+def spec_from_frame(
+    df: pd.DataFrame,
+    chart_type: str,
+    title: str,
+    x_column: Optional[str] = None,
+    y_column: Optional[str] = None,
+    color: Optional[str] = None,
+    figsize: tuple[float, float] = (10, 6),
+) -> ChartSpec:
+    """Serie de un DataFrame ya agregado, como la recibe `ChartGenerator.generate`."""
+    if x_column is None or y_column is None:
+        x_column, y_column = ChartGenerator._auto_detect_columns(df)
+    labels = df[x_column] if x_column in df.columns else df.index
+    values = df[y_column] if y_column in df.columns else df.iloc[:, 0]
+    return ChartSpec(
+        chart_type=chart_type,
+        title=title,
+        labels=[str(label) for label in labels],
+        values=np.asarray(values, dtype=float),
+        x_label=str(x_column),
+        y_label=str(y_column),
+        color=color,
+        figsize=tuple(figsize),
+    )
+
+
+def spec_from_config(
+    df: pd.DataFrame,
+    config: "ChartConfig",
+    aggregates: Optional["SharedAggregates"] = None,
+) -> ChartSpec:
+    """
+    Agrega los datos de un `ChartConfig` igual que `ReportGenerator`.
+
+    Con `group_by` y `value_column` se suma `value_column` por grupo;
+    sin ellos se grafican las columnas detectadas automáticamente. Con
+    `aggregates` (calculadas sobre `df`) la suma se reutiliza en lugar de
+    repetir el `groupby`.
+    """
+    x_column, y_column = config.group_by, config.value_column
+    if x_column in df.columns and y_column in df.columns:
+        if aggregates is not None:
+            df = aggregates.get(x_column, y_column, "sum").reset_index()
+        else:
+            df = df.groupby(x_column)[y_column].sum().reset_index()
+    return spec_from_frame(
+        df,
+        chart_type=config.chart_type,
+        title=config.title,
+        x_column=x_column,
+        y_column=y_column,
+        color=config.color,
+        figsize=config.figsize,
+    )
+
+
+def _style_text(text, style: "ChartStyle", size: Optional[float] = None) -> None:
+    text.set_fontfamily(style.font_family)
+    text.set_fontsize(size or style.font_size)
+    text.set_color(style.text_color)
+
+
+# Propiedades de línea que algunos estilos globales cambian
+_LINE = {
+    "markersize": 6, "markeredgewidth": 1.0, "linestyle": "-",
+    "solid_capstyle": "projecting", "solid_joinstyle": "round",
+}
+
+
+def _style_axes(ax, style: "ChartStyle", grid: bool) -> None:
+    """Fija los valores que los estilos globales suelen cambiar (rejilla, ticks, márgenes)."""
+    for spine in ax.spines.values():
+        spine.set_visible(True)
+        spine.set_edgecolor(style.axes_color)
+        spine.set_linewidth(0.8)
+    ax.tick_params(
+        which="major", direction="out", length=3.5, width=0.8, pad=3.5,
+        top=False, right=False, bottom=True, left=True,
+        colors=style.axes_color, labelcolor=style.text_color, labelsize=style.font_size,
+    )
+    ax.minorticks_off()
+    ax.set_axisbelow(True)
+    if grid:
+        ax.grid(True, alpha=style.grid_alpha, color=style.grid_color, linewidth=0.8, linestyle="-")
+    else:
+        ax.grid(False)
+
+
+def _rotate_labels(labels) -> None:
+    for label in labels:
+        label.set_rotation(45)
+        label.set_horizontalalignment("right")
+
+
+def draw_figure(spec: ChartSpec) -> "Figure":
+    """
+    Construye la `Figure` de una gráfica, con su lienzo Agg, sin rasterizarla.
+
+    Usa una `Figure` propia, sin pyplot: no registra la figura en el
+    estado global ni lee o modifica estilos globales más allá de los
+    valores por defecto que `spec.style` no fija. Se puede llamar desde
+    varios hilos a la vez.
+    """
+    import matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    style = spec.style
+    fig = Figure(figsize=spec.figsize, dpi=spec.dpi, facecolor=style.background)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot(facecolor=style.background)
+    color = spec.color or spec.palette[0]
+    x_label, y_label = spec.x_label or "Categoría", spec.y_label or "Valor"
+    rotate_x = grid = False
+
+    if spec.chart_type == "grouped_bar":
+        positions = np.arange(len(spec.labels))
+        width = 0.8 / max(len(spec.series), 1)
+        for i, name in enumerate(spec.series):
+            offset = (i - (len(spec.series) - 1) / 2) * width
+            ax.bar(positions + offset, spec.values[i], width, label=name,
+                   color=spec.palette[i % len(spec.palette)], linewidth=0, edgecolor="none")
+        ax.set_xticks(positions, spec.labels)
+        rotate_x = True
+        legend = ax.legend(
+            prop={"family": style.font_family, "size": style.font_size}, labelcolor=style.text_color,
+            facecolor=style.background, edgecolor=style.axes_color, frameon=True, framealpha=0.8,
+            fancybox=True, shadow=False, loc="best", ncols=1, borderpad=0.4, labelspacing=0.5,
+            handlelength=2.0, handletextpad=0.8, borderaxespad=0.5, columnspacing=2.0,
+        )
+        legend.get_frame().set_linewidth(1.0)
+    elif spec.chart_type == "hist":
+        ax.bar(spec.x[:-1], spec.values, width=np.diff(spec.x), align="edge",
+               color=color, edgecolor=style.background, linewidth=1, alpha=0.8)
+        grid = True
+    elif spec.chart_type == "scatter" and spec.extent is not None:
+        from matplotlib.colors import LogNorm
+        density = ax.imshow(np.ma.masked_equal(spec.values, 0), origin="lower", aspect="auto",
+                            extent=spec.extent, cmap="Blues", norm=LogNorm())
+        colorbar = fig.colorbar(density, ax=ax)
+        colorbar.set_label("Registros", fontfamily=style.font_family,
+                           fontsize=style.font_size, color=style.text_color)
+        colorbar.ax.tick_params(colors=style.axes_color, labelcolor=style.text_color,
+                                labelsize=style.font_size)
+    elif spec.chart_type == "scatter" and spec.x is not None:
+        ax.scatter(spec.x, spec.values, color=color, alpha=0.5, s=10, linewidths=0)
+        grid = True
+    elif spec.chart_type == "line" and spec.x is not None:
+        ax.plot(spec.x, spec.values, color=color, linewidth=style.line_width * 0.75,
+                marker="o" if len(spec) <= 50 else None, **_LINE)
+        if spec.labels:
+            ticks = np.unique(np.linspace(0, len(spec.labels) - 1, min(len(spec.labels), 10)).astype(int))
+            ax.set_xticks(spec.x[ticks], [spec.labels[i] for i in ticks])
+            rotate_x = True
+        elif np.issubdtype(spec.x.dtype, np.datetime64):
+            fig.autofmt_xdate()
+        grid = True
+    elif spec.chart_type == "bar":
+        ax.bar(spec.labels, spec.values, color=color, linewidth=0)
+        rotate_x = True
+    elif spec.chart_type == "barh":
+        ax.barh(spec.labels, spec.values, color=color, linewidth=0)
+        x_label, y_label = y_label, x_label
+    elif spec.chart_type == "line":
+        ax.plot(spec.labels, spec.values, color=color, marker="o", linewidth=style.line_width, **_LINE)
+        rotate_x = True
+        grid = True
+    elif spec.chart_type == "pie":
+        colors = spec.palette[:len(spec.labels)]
+        ax.pie(spec.values, labels=spec.labels, autopct="%1.1f%%", colors=colors,
+               textprops={"fontfamily": style.font_family, "fontsize": style.font_size,
+                          "color": style.text_color})
+        ax.axis("equal")
+    elif spec.chart_type == "scatter":
+        ax.scatter(spec.labels, spec.values, color=color, alpha=0.7, s=36, linewidths=0)
+        grid = True
+    elif spec.chart_type == "area":
+        positions = range(len(spec.values))
+        ax.fill_between(positions, spec.values, color=color, alpha=0.5, linewidth=0)
+        ax.plot(positions, spec.values, color=color, linewidth=style.line_width, **_LINE)
+        ax.set_xticks(positions, spec.labels)
+        rotate_x = True
+
+    if spec.chart_type != "pie":
+        ax.set_xlabel(x_label, labelpad=4)
+        ax.set_ylabel(y_label, labelpad=4)
+        for text in (ax.xaxis.label, ax.yaxis.label):
+            _style_text(text, style)
+        if spec.extent is None:
+            ax.margins(0.05)
+        _style_axes(ax, style, grid)
+        # Los ticks nuevos copian las propiedades del primero
+        for label in ax.get_xticklabels() + ax.get_yticklabels():
+            label.set_fontfamily(style.font_family)
+        if rotate_x:
+            _rotate_labels(ax.get_xticklabels())
+
+    if spec.title:
+        ax.set_title(spec.title, fontweight="bold", pad=6)
+        _style_text(ax.title, style, style.title_size)
+    # tight_layout mide el margen en unidades del tamaño de fuente global
+    fig.tight_layout(pad=1.08 * style.font_size / matplotlib.rcParams["font.size"])
+    return fig
+
+
+def render_chart(spec: ChartSpec) -> bytes:
+    """
+    Renderiza una gráfica como PNG con el mismo estilo que `ChartGenerator`.
+
+    Se puede llamar desde varios hilos a la vez (ver `draw_figure`).
+
+    Returns:
+        Bytes de la imagen PNG.
+    """
+    buffer = io.BytesIO()
+    draw_figure(spec).savefig(
+        buffer, format="png", dpi=spec.dpi, bbox_inches="tight", pad_inches=0.1,
+        facecolor=spec.style.background, edgecolor="none", transparent=False,
+    )
+    return buffer.getvalue()
+
+
+def _init_worker() -> None:
+    """Importa matplotlib y calienta la caché de fuentes."""
+    render_chart(ChartSpec("bar", "warm-up", ["a"], np.array([1.0]), "x", "y", figsize=(1, 1), dpi=10))
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _render_or_error(spec: ChartSpec) -> Union[bytes, Exception]:
+    try:
+        return render_chart(spec)
+    except Exception as e:
+        return e
+
+
+class ChartRenderPool:
+    """
+    Pool de procesos precalentados para renderizar gráficas.
+
+    Example:
+        ```python
+        with ChartRenderPool(workers=4) as pool:
+            images = pool.render_many([spec_from_config(df, c) for c in charts])
+        ```
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """
+        Inicializa el pool (los procesos arrancan en `start()`).
+
+        Args:
+            workers: Procesos de trabajo. None = número de CPUs.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> "ChartRenderPool":
+        """Arranca los procesos y espera a que todos estén listos."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            # Un ping por proceso fuerza el arranque y el calentamiento de todos
+            for future in [self._executor.submit(_ping) for _ in range(self.workers)]:
+                future.result()
+        return self
+
+    def render_many(self, specs: list[ChartSpec]) -> list[Union[bytes, Exception]]:
+        """
+        Renderiza varias gráficas en paralelo.
+
+        Returns:
+            Una entrada por gráfica, en el mismo orden: los bytes PNG o la
+            excepción que produjo esa gráfica.
+        """
+        if not specs:
+            return []
+        self.start()
+        return list(self._executor.map(_render_or_error, specs))
+
+    def close(self) -> None:
+        """Detiene los procesos de trabajo."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self) -> "ChartRenderPool":
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
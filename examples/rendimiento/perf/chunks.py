@@ -0,0 +1,372 @@
+"""
+Reportes grandes armados por partes en procesos paralelos.
+
+`ReportGenerator` arma todo el reporte como una sola historia de
+ReportLab en un solo núcleo: con decenas de gráficas y un anexo de datos
+de miles de filas, la paginación y la codificación de las imágenes
+dominan el tiempo. `build_in_chunks()` reparte las secciones de la
+plantilla en partes consecutivas de costo parecido, arma cada parte como
+un PDF aparte en un pool de procesos y las une con `merge_pdfs()` sin
+volver a renderizarlas; al unir se corrigen los números de página y se
+reúne el índice (un marcador por sección).
+
+Las partes solo se cortan donde el reporte completo ya empieza una
+página nueva (antes de cada gráfica y de la tabla), y la tabla se corta
+en límites de página: el PDF unido tiene las mismas páginas que si se
+armara de una vez.
+"""
+import io
+import logging
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+import pandas as pd
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import Flowable, PageBreak, Paragraph, Spacer
+
+from qry_doc import SectionConfig, SectionType
+from qry_doc.report_generator import DEFAULT_SECTIONS
+from qry_doc.validators import OutputValidator
+
+from perf.chart_cache import ChartCache
+from perf.charts import ChartSpec
+from perf.pdf_merge import merge_pdfs, page_number_form
+from perf.report import PerfReportGenerator
+from perf.templates import CompiledTemplate
+
+if TYPE_CHECKING:
+    from qry_doc import ChartConfig
+
+logger = logging.getLogger(__name__)
+
+# Costo relativo de cada parte del reporte, para repartirlas entre procesos
+CHART_COST = 1.0
+SECTION_COST = 0.05
+ROWS_PER_CHART = 800
+
+# Parte de un reporte: ("cover",), ("break",), ("section", SectionConfig),
+# ("chart", índice de la gráfica) o ("rows", primera fila, fila final)
+Part = tuple
+
+
+@dataclass
+class ReportChunk:
+    """Secciones consecutivas de un reporte que se arman como un PDF aparte."""
+    parts: list[Part] = field(default_factory=list)
+    cost: float = 0.0
+
+
+@dataclass
+class _ChunkJob:
+    """Todo lo que necesita un proceso para armar una parte."""
+    chunk: ReportChunk
+    title: str
+    summary: str
+    custom_sections: Optional[dict[str, str]]
+    specs: dict[int, ChartSpec]
+    tables: dict[int, pd.DataFrame]
+    table_layout: Optional[tuple[list[float], int]]
+    table_rows: int
+
+
+class _Bookmark(Flowable):
+    """Entrada del índice del PDF en la página donde queda la siguiente flowable."""
+
+    def __init__(self, title: str) -> None:
+        super().__init__()
+        self.title = title
+
+    def frameAction(self, frame: Any) -> None:
+        # Como acción del marco no ocupa espacio ni cambia dónde empieza la página
+        key = f"section{id(self)}"
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(self.title, key, level=0)
+
+
+def plan_chunks(
+    sections: list[SectionConfig],
+    charts: list[int],
+    table_pieces: list[tuple[int, int]],
+    chunks: int,
+    cover: bool = False,
+) -> list[ReportChunk]:
+    """
+    Reparte las secciones de un reporte en partes de costo parecido.
+
+    Cada gráfica empieza una página nueva (las secciones de texto que la
+    preceden van en su misma página) y la tabla también; las partes solo
+    se cortan ahí y en los límites de `table_pieces`.
+
+    Args:
+        sections: Secciones de la plantilla, en orden.
+        charts: Índices de las gráficas que se pudieron preparar; las
+            secciones CHART las toman en orden y las que sobran van al final.
+        table_pieces: Rangos de filas en los que se puede cortar la tabla.
+        chunks: Partes deseadas (puede haber menos).
+        cover: Si el reporte empieza con la portada.
+    """
+    units: list[list[Part]] = [[]]
+    costs = [0.0]
+    has_page_content = False  # La última unidad ya tiene una gráfica o la tabla
+
+    def new_unit() -> None:
+        units.append([])
+        costs.append(0.0)
+
+    def add_chart(index: int) -> None:
+        nonlocal has_page_content
+        if has_page_content:
+            new_unit()
+        units[-1].append(("chart", index))
+        costs[-1] += CHART_COST
+        has_page_content = True
+
+    pending = list(charts)
+    for section in sections:
+        section_type = section.section_type
+        if section_type == SectionType.COVER:
+            continue
+        if section_type == SectionType.CHART:
+            if pending:
+                add_chart(pending.pop(0))
+        elif section_type == SectionType.DATA:
+            for start, stop in table_pieces:
+                if units[-1]:
+                    new_unit()
+                units[-1].append(("rows", start, stop))
+                costs[-1] += (stop - start) / ROWS_PER_CHART
+                has_page_content = True
+        else:
+            units[-1].append(("section", section))
+            costs[-1] += SECTION_COST
+    for index in pending:
+        add_chart(index)
+    if cover:
+        units[0].insert(0, ("cover",))
+
+    total = sum(costs)
+    planned = [ReportChunk()]
+    done = 0.0
+    for unit, cost in zip(units, costs):
+        chunk = planned[-1]
+        if chunk.parts and done >= total * len(planned) / max(chunks, 1):
+            chunk = ReportChunk()
+            planned.append(chunk)
+        if chunk.parts:
+            chunk.parts.append(("break",))
+        chunk.parts.extend(unit)
+        chunk.cost += cost
+        done += cost
+    return planned
+
+
+def _table_pieces(generator: PerfReportGenerator, df: pd.DataFrame, layout: tuple[list[float], int],
+                  chunk_rows: int) -> list[tuple[int, int]]:
+    """
+    Rangos de filas de la tabla que terminan en un cambio de página.
+
+    Todas las filas de una `StreamingTable` tienen la misma altura: basta
+    paginar la primera página (con el título "Datos") y una página
+    completa para saber dónde empieza cada página.
+    """
+    rows = len(df)
+    scratch = Canvas(io.BytesIO(), pagesize=generator.template.page_size)
+
+    frame = generator._content_frame()
+    frame.add(Paragraph("Datos", generator.styles['Heading']), scratch)
+    split = frame.split(generator._streaming_table(df, *layout), scratch)
+    first = split[1].start if len(split) == 2 else (0 if not split else rows)
+    split = generator._content_frame().split(generator._streaming_table(df, *layout), scratch)
+    per_page = split[1].start if len(split) == 2 else rows
+
+    pages = max(1, round(chunk_rows / per_page))
+    starts = [0] + list(range(first, rows, per_page)) if first else list(range(0, rows, per_page))
+    bounds = starts[::pages] + [rows]
+    return [(start, stop) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+
+def _page_number_pdf(compiled: CompiledTemplate, pages: int) -> bytes:
+    """PDF con un formulario `page_number_form(n)` por página, para `merge_pdfs`."""
+    buffer = io.BytesIO()
+    canvas = Canvas(buffer, pagesize=compiled.template.page_size)
+    for page in range(1, pages + 1):
+        name = page_number_form(page)
+        canvas.beginForm(name)
+        compiled.draw_page_number(canvas, page)
+        canvas.endForm()
+        canvas.doForm(name)
+    canvas.showPage()
+    canvas.save()
+    return buffer.getvalue()
+
+
+_worker_compiled: Optional[CompiledTemplate] = None
+_worker_options: dict[str, Any] = {}
+
+
+def _init_chunk_worker(compiled: CompiledTemplate, options: dict[str, Any], chart_cache_dir: Optional[Path]) -> None:
+    global _worker_compiled, _worker_options
+    _worker_compiled = compiled
+    _worker_options = dict(options, chart_cache=ChartCache(directory=chart_cache_dir) if chart_cache_dir else None)
+
+
+def _render_in_worker(job: _ChunkJob) -> tuple[bytes, int]:
+    return _render_chunk(job, _worker_compiled, _worker_options)
+
+
+def _render_chunk(job: _ChunkJob, compiled: CompiledTemplate, options: dict[str, Any]) -> tuple[bytes, int]:
+    """Arma una parte del reporte en memoria; retorna el PDF y sus páginas."""
+    buffer = io.BytesIO()
+    generator = PerfReportGenerator(buffer, compiled, **options)
+    generator.story = []
+    generator._header_footer_call_count = 0
+    generator._page_number_forms = True
+    story = generator.story
+    images = generator._chart_images(list(job.specs.items()))
+
+    page_break = False
+    for part in job.chunk.parts:
+        kind = part[0]
+        if kind == "break":
+            page_break = True
+            continue
+        if kind == "chart" and part[1] not in images:
+            continue  # La gráfica falló: tampoco su salto de página
+        if page_break and story:
+            story.append(PageBreak())
+        page_break = False
+        if kind == "cover":
+            generator._add_cover_page(generator.template.cover_image_path)
+        elif kind == "section":
+            if part[1].section_type == SectionType.SUMMARY:
+                story.append(_Bookmark(job.title))
+            generator._render_section(part[1], job.title, job.summary, None, None, job.custom_sections)
+        elif kind == "chart":
+            story.append(_Bookmark(job.specs[part[1]].title or f"Gráfica {part[1] + 1}"))
+            generator._add_chart(images[part[1]])
+        elif kind == "rows":
+            _, start, stop = part
+            df = job.tables[start]
+            if start == 0:
+                story.append(_Bookmark("Datos"))
+            if start == 0 and stop == job.table_rows:
+                generator._add_table(df)
+                continue
+            if start == 0:
+                story.append(Paragraph("Datos", generator.styles['Heading']))
+            story.append(generator._streaming_table(df, *job.table_layout, first_row=start))
+            if stop == job.table_rows:
+                story.append(Spacer(1, 15))
+
+    generator._build_document()
+    return buffer.getvalue(), generator.header_footer_calls
+
+
+def build_in_chunks(
+    generator: PerfReportGenerator,
+    title: str,
+    summary: str,
+    charts: Optional[list["ChartConfig"]],
+    dataframe: Optional[pd.DataFrame],
+    custom_sections: Optional[dict[str, str]],
+    chart_data: Optional[pd.DataFrame],
+    workers: Optional[int],
+    chunks: Optional[int],
+    chunk_rows: int,
+) -> bytes:
+    """
+    Arma el reporte de `generator` por partes y retorna el PDF unido.
+
+    Ver `PerfReportGenerator.build_in_chunks`.
+    """
+    if chunk_rows <= 0:
+        raise ValueError(f"chunk_rows inválido: {chunk_rows}. Use un valor mayor que 0")
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    compiled = generator.compiled
+    template = generator.template
+
+    sections = [s for s in template.sections if s.enabled] if template.sections else DEFAULT_SECTIONS
+    cover = template.cover_image_path is not None and (
+        any(s.section_type == SectionType.COVER for s in sections) or not sections
+    )
+
+    specs: dict[int, ChartSpec] = {}
+    if charts:
+        data = chart_data if chart_data is not None else dataframe
+        specs = dict(generator._prepare_specs(charts, data if data is not None else pd.DataFrame()))
+
+    table_pieces: list[tuple[int, int]] = []
+    table_layout = None
+    if dataframe is not None and OutputValidator.validate_dataframe(dataframe)[0]:
+        if len(dataframe) > generator.table_stream_rows:
+            table_layout = generator._table_layout(dataframe)
+            table_pieces = _table_pieces(generator, dataframe, table_layout, chunk_rows)
+        else:
+            table_pieces = [(0, len(dataframe))]
+
+    wanted = chunks if chunks is not None else max(workers, 1)
+    if compiled.custom_footer and wanted > 1:
+        # Un pie propio dibuja sus números de página: no se pueden corregir al unir
+        logger.warning("Template draws its own footer; building the report as a single chunk")
+        wanted = 1
+    planned = plan_chunks(sections, list(specs), table_pieces, wanted, cover)
+
+    jobs = []
+    for chunk in map(_merge_rows, planned):
+        jobs.append(_ChunkJob(
+            chunk=chunk,
+            title=title,
+            summary=summary,
+            custom_sections=custom_sections,
+            specs={part[1]: specs[part[1]] for part in chunk.parts if part[0] == "chart"},
+            tables={part[1]: dataframe.iloc[part[1]:part[2]] for part in chunk.parts if part[0] == "rows"},
+            table_layout=table_layout,
+            table_rows=len(dataframe) if dataframe is not None else 0,
+        ))
+
+    options = {
+        "chart_backend": generator.chart_backend,
+        "chart_dpi": generator.chart_dpi,
+        "chart_max_height": generator.chart_max_height,
+        "table_stream_rows": generator.table_stream_rows,
+        "column_formats": generator.column_formats,
+    }
+    if workers > 0 and len(jobs) > 1:
+        try:
+            pickle.dumps(compiled)
+        except Exception as e:
+            logger.warning(f"Template cannot be sent to worker processes ({e}); rendering locally")
+            workers = 0
+
+    cache = generator._chart_cache
+    if workers > 0 and len(jobs) > 1:
+        # Los procesos comparten la caché de gráficas solo si está en disco
+        initargs = (compiled, options, cache.directory if cache is not None else None)
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), initializer=_init_chunk_worker,
+                                 initargs=initargs) as executor:
+            results = list(executor.map(_render_in_worker, jobs))
+    else:
+        results = [_render_chunk(job, compiled, dict(options, chart_cache=cache)) for job in jobs]
+
+    generator._header_footer_call_count = sum(pages for _, pages in results)
+    if len(results) == 1:
+        return results[0][0]
+    return merge_pdfs([pdf for pdf, _ in results],
+                      page_numbers=lambda pages: _page_number_pdf(compiled, pages))
+
+
+def _merge_rows(chunk: ReportChunk) -> ReportChunk:
+    """Une las partes de tabla consecutivas de una parte en una sola tabla."""
+    parts: list[Part] = []
+    for part in chunk.parts:
+        if (part[0] == "rows" and len(parts) >= 2 and parts[-1] == ("break",)
+                and parts[-2][0] == "rows" and parts[-2][2] == part[1]):
+            parts.pop()
+            parts[-1] = ("rows", parts[-1][1], part[2])
+        else:
+            parts.append(part)
+    return ReportChunk(parts, chunk.cost)
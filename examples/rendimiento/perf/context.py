@@ -0,0 +1,381 @@
+"""
+Contexto de conversación acotado por tokens para AIBuilder.
+
+`ContextWindow` mantiene una ventana deslizante con los turnos recientes y
+compacta los turnos antiguos en un resumen, de modo que el tamaño del
+prompt se mantiene estable durante sesiones largas de análisis.
+"""
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+import pandas as pd
+
+from qry_doc import AIBuilder, QueryError
+
+from perf.validation import QueryIndex, QueryValidation
+
+if TYPE_CHECKING:
+    from perf.profile import DataProfile
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+# Firma de un resumidor: (resumen previo, mensajes desalojados, máx. tokens) -> resumen
+Summarizer = Callable[[str, list[dict[str, str]], int], str]
+
+ROLE_LABELS = {"user": "Usuario", "assistant": "AI", "system": "Sistema"}
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimación rápida de tokens (~4 caracteres por token)."""
+    return (len(text) + 3) // 4
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Recorta un texto para que no supere `max_tokens`."""
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max(0, max_chars - 3)] + "..."
+
+
+def extractive_summary(
+    previous: str,
+    evicted: list[dict[str, str]],
+    max_tokens: int,
+) -> str:
+    """
+    Resumidor local: una línea corta por mensaje desalojado.
+
+    Las líneas más antiguas se descartan primero cuando el resumen
+    supera su presupuesto. No hace llamadas al LLM.
+    """
+    lines = previous.splitlines() if previous else []
+    for message in evicted:
+        label = ROLE_LABELS.get(message["role"], message["role"])
+        first_line = message["content"].strip().splitlines()[0] if message["content"].strip() else ""
+        lines.append(f"- {label}: {truncate_to_tokens(first_line, 30)}")
+
+    while lines and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ContextWindow:
+    """
+    Ventana de contexto con presupuesto de tokens.
+
+    Features:
+    - Ventana deslizante con los turnos más recientes
+    - Resumen compacto de los turnos antiguos
+    - Presupuesto total fijo: resumen + ventana <= max_tokens
+    - Resumidor intercambiable (local por defecto, o basado en LLM)
+
+    Example:
+        ```python
+        window = ContextWindow(max_tokens=800)
+        window.append("user", "Total de ventas por región")
+        window.append("assistant", "Norte: 120, Sur: 95, Centro: 80")
+        messages = window.messages()
+        ```
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 1500,
+        summary_ratio: float = 0.25,
+        summarizer: Summarizer = extractive_summary,
+    ) -> None:
+        """
+        Inicializa la ventana.
+
+        Args:
+            max_tokens: Presupuesto total de tokens del contexto.
+            summary_ratio: Fracción del presupuesto reservada al resumen.
+            summarizer: Función que compacta los mensajes desalojados.
+        """
+        if max_tokens <= 0:
+            raise ValueError("max_tokens debe ser mayor que 0")
+        if not 0.0 <= summary_ratio < 1.0:
+            raise ValueError("summary_ratio debe estar en [0, 1)")
+        self.max_tokens = max_tokens
+        self.summary_tokens = int(max_tokens * summary_ratio)
+        self.window_tokens = max_tokens - self.summary_tokens
+        self._summarizer = summarizer
+        self._messages: list[dict[str, str]] = []
+        self._message_tokens: list[int] = []
+        self._used = 0
+        self._summary = ""
+        self.evicted = 0
+
+    def append(self, role: str, content: str) -> None:
+        """Agrega un mensaje y compacta los antiguos si se supera el presupuesto."""
+        content = truncate_to_tokens(content, self.window_tokens)
+        tokens = estimate_tokens(content)
+        self._messages.append({"role": role, "content": content})
+        self._message_tokens.append(tokens)
+        self._used += tokens
+
+        evicted = []
+        while self._used > self.window_tokens and len(self._messages) > 1:
+            evicted.append(self._messages.pop(0))
+            self._used -= self._message_tokens.pop(0)
+
+        if evicted:
+            self.evicted += len(evicted)
+            if self.summary_tokens > 0:
+                self._summary = self._summarizer(self._summary, evicted, self.summary_tokens)
+
+    def messages(self) -> list[dict[str, str]]:
+        """Mensajes a enviar: resumen (si existe) seguido de la ventana."""
+        result = []
+        if self._summary:
+            result.append({
+                "role": "system",
+                "content": f"Resumen de la conversación anterior:\n{self._summary}",
+            })
+        result.extend(dict(m) for m in self._messages)
+        return result
+
+    def render(self) -> str:
+        """Contexto como texto plano para incluir en un prompt."""
+        return "\n".join(
+            f"{ROLE_LABELS.get(m['role'], m['role'])}: {m['content']}"
+            for m in self.messages()
+        )
+
+    def clear(self) -> None:
+        """Vacía la ventana y el resumen."""
+        self._messages = []
+        self._message_tokens = []
+        self._used = 0
+        self._summary = ""
+        self.evicted = 0
+
+    @property
+    def summary(self) -> str:
+        return self._summary
+
+    @property
+    def tokens(self) -> int:
+        """Tokens estimados del contexto completo."""
+        return self._used + estimate_tokens(self._summary)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+
+def llm_summarizer(llm: Any) -> Summarizer:
+    """
+    Crea un resumidor que usa el LLM para compactar los turnos desalojados.
+
+    Si el LLM falla se usa el resumidor local, así la conversación nunca
+    se bloquea por el resumen.
+    """
+    def summarize(previous: str, evicted: list[dict[str, str]], max_tokens: int) -> str:
+        transcript = "\n".join(
+            f"{ROLE_LABELS.get(m['role'], m['role'])}: {m['content']}" for m in evicted
+        )
+        prompt = (
+            f"Resume en menos de {max_tokens * 3} palabras la conversación, "
+            "conservando columnas, filtros y cifras mencionadas.\n\n"
+            f"Resumen previo:\n{previous or '(vacío)'}\n\nNuevos mensajes:\n{transcript}"
+        )
+        try:
+            response = llm.invoke(prompt) if hasattr(llm, "invoke") else llm(prompt)
+            text = getattr(response, "content", response)
+            return truncate_to_tokens(str(text).strip(), max_tokens)
+        except Exception as e:
+            logger.warning(f"LLM summarizer failed, using extractive summary: {e}")
+            return extractive_summary(previous, evicted, max_tokens)
+
+    return summarize
+
+
+class BoundedAIBuilder(AIBuilder):
+    """
+    AIBuilder cuyo contexto de conversación respeta un presupuesto de tokens.
+
+    `get_context()` retorna el resumen compacto más los turnos recientes,
+    y `ask()` envía ese contexto acotado al LLM en lugar del historial
+    completo, así el costo por llamada no crece con la sesión.
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        llm: Any,
+        verbose: bool = False,
+        context_budget: int = 1500,
+        summarizer: Optional[Summarizer] = None,
+        profile: Optional["DataProfile"] = None,
+    ) -> None:
+        """
+        Inicializa el AIBuilder acotado.
+
+        Args:
+            df: DataFrame a analizar.
+            llm: Proveedor LLM.
+            verbose: Si se registra información detallada.
+            context_budget: Presupuesto de tokens del contexto.
+            summarizer: Resumidor opcional (por defecto, local).
+            profile: Perfil de columnas usado como contexto del prompt
+                en lugar del resumen con filas de muestra.
+        """
+        super().__init__(df=df, llm=llm, verbose=verbose)
+        self._window = ContextWindow(
+            max_tokens=context_budget,
+            summarizer=summarizer or extractive_summary,
+        )
+        self._profile = profile
+        self._index: Optional[QueryIndex] = None
+
+    def set_data(self, df: pd.DataFrame, profile: Optional["DataProfile"] = None) -> None:
+        """
+        Cambia los datos analizados conservando el contexto de la conversación.
+
+        Args:
+            df: DataFrame nuevo (p. ej. con filas agregadas).
+            profile: Perfil de columnas del DataFrame nuevo. None = se
+                conserva el actual.
+        """
+        self._df = df
+        if profile is not None:
+            self._profile = profile
+        # El índice tiene los valores de las columnas: se reconstruye en el próximo uso
+        self._index = None
+
+    def _build_chain(self) -> Any:
+        """Construye la cadena LangChain incluyendo el contexto acotado."""
+        if not self._langchain_available:
+            return None
+
+        try:
+            from langchain_core.prompts import ChatPromptTemplate
+            from langchain_core.output_parsers import StrOutputParser
+
+            prompt = ChatPromptTemplate.from_messages([
+                ("system", """You are a data analysis assistant helping prepare data for reports.
+You have access to a DataFrame with the following structure:
+{data_summary}
+
+Conversation so far:
+{history}
+
+Always respond in a structured, helpful manner."""),
+                ("human", "{query}")
+            ])
+            return prompt | self._llm | StrOutputParser()
+
+        except Exception as e:
+            logger.warning(f"Failed to build LangChain chain: {e}")
+            return None
+
+    def ask(self, query: str) -> str:
+        """Responde una pregunta enviando solo el contexto acotado."""
+        is_valid, error_msg = self.validate_query(query)
+        if not is_valid:
+            raise QueryError(
+                user_message=f"Query validation failed: {error_msg}",
+                internal_error=None
+            )
+
+        history = self._window.render()
+        self._add_to_context("user", query)
+
+        if self._langchain_available and self._chain is None:
+            self._chain = self._build_chain()
+
+        if self._chain is not None:
+            try:
+                response = self._chain.invoke({
+                    "data_summary": self._data_context(),
+                    "history": history or "(none)",
+                    "query": query,
+                })
+                self._add_to_context("assistant", response)
+                return response
+            except Exception as e:
+                logger.warning(f"LangChain query failed: {e}")
+
+        response = self._basic_analysis(query)
+        self._add_to_context("assistant", response)
+        return response
+
+    @property
+    def query_index(self) -> QueryIndex:
+        """Índice de columnas y sinónimos, construido en el primer uso."""
+        if self._index is None:
+            from perf.profile import DataProfile
+            profile = self._profile or DataProfile.from_dataframe(self._df)
+            self._index = QueryIndex.from_profile(profile)
+        return self._index
+
+    def validate_query(self, query: str, use_llm: bool = False) -> tuple[bool, Optional[str]]:
+        """
+        Valida una pregunta contra el índice local, sin LLM.
+
+        Args:
+            query: Pregunta en lenguaje natural.
+            use_llm: Si además se pide confirmación al LLM cuando la
+                validación local la acepta.
+
+        Returns:
+            Tupla (es_válido, mensaje_de_error). Las palabras desconocidas
+            que no parecen referencias a los datos no invalidan la pregunta.
+        """
+        result = self.query_index.validate(query)
+        if result.warnings:
+            logger.debug(f"Unknown words in query (left to the LLM): {', '.join(result.warnings)}")
+        is_valid, error = result.as_tuple()
+        if not is_valid or not use_llm:
+            return (is_valid, error)
+        return self._llm_validate(query)
+
+    def validate_queries(self, queries: list[str]) -> list[QueryValidation]:
+        """Valida un lote de preguntas antes de enviarlas al LLM."""
+        index = self.query_index
+        return [index.validate(query) for query in queries]
+
+    def _llm_validate(self, query: str) -> tuple[bool, Optional[str]]:
+        """Confirma con el LLM que la pregunta se puede responder con los datos."""
+        prompt = (
+            "Answer YES or NO followed by a short reason. Can this question be "
+            f"answered with the data below?\n\nData:\n{self._data_context()}\n\n"
+            f"Question: {query}"
+        )
+        try:
+            response = self._llm.invoke(prompt) if hasattr(self._llm, "invoke") else self._llm(prompt)
+            text = str(getattr(response, "content", response)).strip()
+        except Exception as e:
+            logger.warning(f"LLM validation failed, using local result: {e}")
+            return (True, None)
+        if text.upper().startswith("NO"):
+            return (False, text[2:].lstrip(" :.,-") or "El LLM indica que los datos no responden la pregunta")
+        return (True, None)
+
+    def _data_context(self) -> str:
+        """Descripción de los datos para el prompt."""
+        if self._profile is not None:
+            return self._profile.to_prompt()
+        return str(self.get_data_summary())
+
+    def _add_to_context(self, role: str, content: str) -> None:
+        self._window.append(role, content)
+
+    def get_context(self) -> list[dict[str, str]]:
+        return self._window.messages()
+
+    def clear_context(self) -> None:
+        self._window.clear()
+        logger.debug("Conversation context cleared")
+
+    @property
+    def context_tokens(self) -> int:
+        """Tokens estimados del contexto actual."""
+        return self._window.tokens
+
+    @property
+    def context_window(self) -> ContextWindow:
+        return self._window
@@ -0,0 +1,115 @@
+"""
+Imágenes de plantilla reducidas al tamaño en que se dibujan.
+
+ReportLab guarda cada imagen una sola vez por PDF y la referencia desde
+todas las páginas, pero la guarda con su resolución original: un logo
+de 1024 píxeles dibujado a 120 puntos de ancho pesa lo mismo que si
+ocupara la página, y se descomprime, comprime y codifica en ASCII85 en
+cada documento.
+
+`resample_image()` reduce la imagen a los píxeles que necesita su
+tamaño en la página al DPI indicado y guarda el resultado en disco con
+el hash del contenido y el tamaño como nombre, así que se prepara una
+vez y la reutilizan todos los reportes y ejecuciones.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from PIL import Image as PILImage
+
+logger = logging.getLogger(__name__)
+
+# Se incrementa cuando cambia la forma de reducir, para invalidar archivos viejos
+RESAMPLE_VERSION = 1
+
+# Directorio por defecto de las imágenes reducidas
+DEFAULT_IMAGE_DIR = Path(tempfile.gettempdir()) / "qry_doc_images"
+
+# Las fotos (más de 256 colores, sin transparencia) se guardan como JPEG
+JPEG_QUALITY = 90
+
+
+def fit_size(width: int, height: int, box_width: float, box_height: float) -> tuple[float, float]:
+    """Tamaño en puntos de una imagen ajustada a una caja sin deformarla."""
+    scale = min(box_width / width, box_height / height)
+    return width * scale, height * scale
+
+
+def _is_photo(img: PILImage.Image) -> bool:
+    if img.mode in ("RGBA", "LA", "P") or "transparency" in img.info:
+        return False
+    return img.convert("RGB").getcolors(maxcolors=256) is None
+
+
+def resample_image(
+    path: Union[str, Path],
+    width: float,
+    height: float,
+    dpi: int,
+    directory: Optional[Union[str, Path]] = None,
+) -> Path:
+    """
+    Retorna una copia de la imagen con los píxeles de su tamaño impreso.
+
+    Args:
+        path: Imagen original.
+        width: Ancho dibujado en puntos.
+        height: Alto dibujado en puntos.
+        dpi: Resolución impresa.
+        directory: Directorio de la caché. None = `DEFAULT_IMAGE_DIR`.
+
+    Returns:
+        Ruta de la imagen reducida, o la original si ya es más pequeña
+        (las fotos en PNG se pasan a JPEG aunque no se reduzcan).
+    """
+    path = Path(path)
+    with PILImage.open(path) as img:
+        source_size = img.size
+        source_format = img.format
+    pixels = (max(1, round(width * dpi / 72)), max(1, round(height * dpi / 72)))
+    shrink = pixels[0] < source_size[0] and pixels[1] < source_size[1]
+    if not shrink:
+        pixels = source_size  # Nunca se agranda
+        if source_format == "JPEG":
+            return path
+
+    directory = Path(directory) if directory is not None else DEFAULT_IMAGE_DIR
+    digest = hashlib.sha256(path.read_bytes())
+    digest.update(repr((RESAMPLE_VERSION, pixels, JPEG_QUALITY)).encode("utf-8"))
+    key = digest.hexdigest()
+    for suffix in (".png", ".jpg"):
+        cached = directory / f"{key}{suffix}"
+        if cached.exists():
+            return cached
+
+    with PILImage.open(path) as img:
+        photo = _is_photo(img)
+        if not shrink and not photo:
+            return path  # Tampoco conviene pasarla a JPEG
+        if img.mode == "P":
+            img = img.convert("RGBA")
+        resampled = img.resize(pixels, PILImage.LANCZOS) if shrink else img.copy()
+    if photo:
+        target = directory / f"{key}.jpg"
+        save = dict(format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        resampled = resampled.convert("RGB")
+    else:
+        target = directory / f"{key}.png"
+        save = dict(format="PNG", optimize=True)
+
+    directory.mkdir(parents=True, exist_ok=True)
+    partial = target.with_name(f"{target.name}.{os.getpid()}.{threading.get_ident()}.part")
+    try:
+        resampled.save(partial, **save)
+        os.replace(partial, target)
+    except OSError as e:
+        partial.unlink(missing_ok=True)
+        logger.warning(f"Image cache write failed: {e}")
+        return path
+    logger.info(f"Resampled {path.name} from {source_size} to {pixels}")
+    return target
@@ -0,0 +1,324 @@
+"""
+Router de LLMs con peticiones "hedged" para reducir la latencia de cola.
+
+`LLMRouter` se comporta como un LLM de PandasAI, así que se puede pasar
+directamente a `QryDoc(..., llm=router)`. Internamente envía cada prompt
+al proveedor más rápido y sano; si no responde antes de su percentil p95,
+lanza una petición duplicada a un proveedor secundario y se queda con la
+primera respuesta válida.
+"""
+import bisect
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from pandasai.llm.base import LLM
+
+
+def _default_validator(response: Any) -> bool:
+    """Una respuesta es válida si es texto no vacío."""
+    return isinstance(response, str) and response.strip() != ""
+
+
+def _geometric_bounds(start: float, stop: float, ratio: float) -> list[float]:
+    """Límites geométricos de buckets, terminando en infinito."""
+    bounds = []
+    bound = start
+    while bound < stop:
+        bounds.append(bound)
+        bound *= ratio
+    bounds.append(float("inf"))
+    return bounds
+
+
+class LatencyHistogram:
+    """
+    Histograma de latencias con buckets geométricos (1 ms a 120 s).
+
+    Usa memoria constante sin importar cuántas muestras se registren
+    y es seguro entre hilos.
+    """
+
+    # Límites superiores de cada bucket, crecimiento de 15% por bucket
+    BOUNDS = _geometric_bounds(0.001, 120.0, 1.15)
+
+    def __init__(self) -> None:
+        self._counts = [0] * len(self.BOUNDS)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        """Registra una latencia en segundos."""
+        index = bisect.bisect_left(self.BOUNDS, seconds)
+        with self._lock:
+            self._counts[index] += 1
+            self._total += 1
+
+    @property
+    def count(self) -> int:
+        """Número de muestras registradas."""
+        return self._total
+
+    def percentile(self, p: float) -> Optional[float]:
+        """
+        Estima el percentil `p` (0-1) como el límite superior del bucket.
+
+        Returns:
+            Latencia estimada en segundos, o None si no hay muestras.
+        """
+        with self._lock:
+            if self._total == 0:
+                return None
+            target = p * self._total
+            cumulative = 0
+            for bound, count in zip(self.BOUNDS, self._counts):
+                cumulative += count
+                if cumulative >= target:
+                    return bound if bound != float("inf") else self.BOUNDS[-2]
+        return self.BOUNDS[-2]
+
+
+@dataclass
+class ProviderStats:
+    """Estado de salud y latencia de un proveedor."""
+    name: str
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    successes: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+    wins: int = 0
+    hedges: int = 0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+
+class LLMRouter(LLM):
+    """
+    LLM compuesto que reparte cada llamada entre varios proveedores.
+
+    Features:
+    - Selección del proveedor sano con menor latencia mediana
+    - Petición hedged al secundario tras el p95 del primario
+    - Failover inmediato si el primario falla
+    - Histogramas de latencia por proveedor
+    - Cuarentena temporal tras fallos consecutivos
+
+    Example:
+        ```python
+        from pandasai_openai import OpenAI
+        from pandasai_litellm import LiteLLM
+
+        router = LLMRouter([
+            OpenAI(model="gpt-4.1-mini"),
+            LiteLLM(model="claude-3-haiku-20240307"),
+        ])
+        qry = QryDoc("datos.csv", llm=router)
+        ```
+    """
+
+    def __init__(
+        self,
+        providers: list[LLM],
+        hedge_percentile: float = 0.95,
+        default_hedge_delay: float = 1.0,
+        min_hedge_delay: float = 0.05,
+        min_samples: int = 10,
+        max_hedges: int = 1,
+        timeout: float = 120.0,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        validator: Callable[[Any], bool] = _default_validator,
+    ) -> None:
+        """
+        Inicializa el router.
+
+        Args:
+            providers: Proveedores LLM en orden de preferencia inicial.
+            hedge_percentile: Percentil del primario que dispara el hedge.
+            default_hedge_delay: Espera antes del hedge sin muestras suficientes.
+            min_hedge_delay: Espera mínima antes del hedge, en segundos.
+            min_samples: Muestras necesarias para confiar en el histograma.
+            max_hedges: Peticiones duplicadas máximas por llamada.
+            timeout: Tiempo máximo total por llamada, en segundos.
+            failure_threshold: Fallos consecutivos antes de la cuarentena.
+            cooldown: Duración de la cuarentena, en segundos.
+            validator: Función que decide si una respuesta es válida.
+        """
+        if not providers:
+            raise ValueError("LLMRouter necesita al menos un proveedor")
+        super().__init__()
+        self._providers = list(providers)
+        self._stats = [
+            ProviderStats(name=self._provider_name(p, i))
+            for i, p in enumerate(self._providers)
+        ]
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.max_hedges = max_hedges
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._validator = validator
+        self._lock = threading.Lock()
+        # Los perdedores del hedge siguen corriendo hasta terminar,
+        # así que el pool se dimensiona para varias llamadas concurrentes
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(4, len(self._providers) * 4),
+            thread_name_prefix="llm-router",
+        )
+
+    @staticmethod
+    def _provider_name(provider: LLM, index: int) -> str:
+        """Nombre legible de un proveedor."""
+        for attr in ("name", "model"):
+            value = getattr(provider, attr, None)
+            if isinstance(value, str) and value:
+                return value
+        return f"{type(provider).__name__}-{index}"
+
+    def hedge_delay(self, index: int) -> float:
+        """Espera antes de enviar la petición hedged si el primario es `index`."""
+        histogram = self._stats[index].histogram
+        if histogram.count < self.min_samples:
+            return self.default_hedge_delay
+        estimate = histogram.percentile(self.hedge_percentile)
+        return max(self.min_hedge_delay, estimate or self.default_hedge_delay)
+
+    def _rank(self) -> list[int]:
+        """Ordena los proveedores: sanos primero, luego por latencia mediana."""
+        def key(index: int) -> tuple[bool, float, int]:
+            stats = self._stats[index]
+            # Sin muestras suficientes se explora el proveedor primero
+            median = 0.0
+            if stats.histogram.count >= self.min_samples:
+                median = stats.histogram.percentile(0.5) or 0.0
+            return (not stats.healthy, median, index)
+
+        return sorted(range(len(self._providers)), key=key)
+
+    def _invoke(self, index: int, instruction: Any, context: Any) -> Any:
+        """Llama a un proveedor registrando su latencia y salud."""
+        stats = self._stats[index]
+        start = time.perf_counter()
+        try:
+            response = self._providers[index].call(instruction, context)
+            if not self._validator(response):
+                raise ValueError(f"{stats.name}: respuesta inválida")
+        except Exception:
+            with self._lock:
+                stats.failures += 1
+                stats.consecutive_failures += 1
+                if stats.consecutive_failures >= self.failure_threshold:
+                    stats.unhealthy_until = time.monotonic() + self.cooldown
+            raise
+        stats.histogram.record(time.perf_counter() - start)
+        with self._lock:
+            stats.successes += 1
+            stats.consecutive_failures = 0
+            stats.unhealthy_until = 0.0
+        return response
+
+    def call(self, instruction: Any, context: Any = None) -> str:
+        """
+        Ejecuta el prompt con hedging y failover entre proveedores.
+
+        Raises:
+            La última excepción de los proveedores si ninguno respondió
+            una respuesta válida, o TimeoutError si se agotó `timeout`.
+        """
+        ranked = self._rank()
+        deadline = time.monotonic() + self.timeout
+        pending: dict[Future, int] = {}
+        hedges = 0
+        last_error: Optional[BaseException] = None
+
+        def launch() -> None:
+            index = ranked.pop(0)
+            future = self._executor.submit(self._invoke, index, instruction, context)
+            pending[future] = index
+
+        launch()
+        primary = next(iter(pending.values()))
+
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+
+            can_hedge = bool(ranked) and hedges < self.max_hedges
+            wait_for = min(self.hedge_delay(primary), remaining) if can_hedge else remaining
+            done, _ = wait(list(pending), timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            if not done:
+                # El primario tarda más que su p95: duplicar la petición
+                if can_hedge:
+                    hedges += 1
+                    with self._lock:
+                        self._stats[ranked[0]].hedges += 1
+                    launch()
+                continue
+
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    response = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                with self._lock:
+                    self._stats[index].wins += 1
+                self.last_prompt = getattr(self._providers[index], "last_prompt", None)
+                return response
+
+            # Failover: todos los lanzados fallaron, probar el siguiente
+            if not pending and ranked:
+                launch()
+
+        if last_error is not None and not pending:
+            raise last_error
+        raise TimeoutError(f"Ningún proveedor respondió en {self.timeout:.1f}s")
+
+    def stats(self) -> list[dict[str, Any]]:
+        """
+        Estadísticas por proveedor.
+
+        Returns:
+            Lista de dicts con p50/p95/p99, éxitos, fallos, victorias y hedges.
+        """
+        result = []
+        for stats in self._stats:
+            histogram = stats.histogram
+            result.append({
+                "name": stats.name,
+                "samples": histogram.count,
+                "p50": histogram.percentile(0.50),
+                "p95": histogram.percentile(0.95),
+                "p99": histogram.percentile(0.99),
+                "successes": stats.successes,
+                "failures": stats.failures,
+                "wins": stats.wins,
+                "hedges": stats.hedges,
+                "healthy": stats.healthy,
+            })
+        return result
+
+    def close(self) -> None:
+        """Libera los hilos del router sin esperar a los perdedores."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "LLMRouter":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def type(self) -> str:
+        return "router"
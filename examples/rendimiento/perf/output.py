@@ -0,0 +1,72 @@
+"""
+PDFs en memoria y en objetos tipo archivo.
+
+Los generadores de reportes aceptan, además de una ruta, cualquier
+objeto con `write()` abierto en modo binario (`io.BytesIO`, un archivo
+ya abierto, la respuesta de un framework web). Así un servicio envía el
+PDF sin escribirlo en disco, leerlo de vuelta y borrar el temporal.
+
+ReportLab arma el documento completo en memoria y lo escribe al final
+con una sola llamada a `write()`: `iter_pdf()` entrega ese resultado en
+bloques para respuestas HTTP por partes.
+"""
+import io
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, Union
+
+# Destino de un PDF: ruta o flujo binario con write()
+PdfOutput = Union[str, Path, BinaryIO]
+
+# Tamaño por defecto de los bloques de iter_pdf
+CHUNK_SIZE = 64 * 1024
+
+
+def is_stream(output: Any) -> bool:
+    """True si el destino es un flujo con `write()` en lugar de una ruta."""
+    return callable(getattr(output, "write", None))
+
+
+def describe_output(output: PdfOutput) -> str:
+    """Texto del destino para los mensajes: la ruta, o 'memoria' para un flujo."""
+    return "memoria" if is_stream(output) else str(output)
+
+
+def pdf_bytes(build: Callable[[BinaryIO], Any]) -> bytes:
+    """
+    Retorna el PDF que `build` escribe en el flujo que recibe.
+
+    Example:
+        ```python
+        pdf = pdf_bytes(lambda out: qry.generate_report("ventas por región", out))
+        ```
+    """
+    buffer = io.BytesIO()
+    build(buffer)
+    return buffer.getvalue()
+
+
+def iter_pdf(build: Callable[[BinaryIO], Any], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Genera el PDF con `build` y lo entrega en bloques de `chunk_size` bytes.
+
+    El PDF se genera al pedir el primer bloque.
+
+    Example:
+        ```python
+        return Response(iter_pdf(lambda out: qry.generate_report(pregunta, out)),
+                        mimetype="application/pdf")
+        ```
+
+    Raises:
+        ValueError: Si `chunk_size` no es positivo.
+    """
+    if chunk_size <= 0:
+        raise ValueError(f"chunk_size inválido: {chunk_size}. Use un valor mayor que 0")
+    return _chunks(build, chunk_size)
+
+
+def _chunks(build: Callable[[BinaryIO], Any], chunk_size: int) -> Iterator[bytes]:
+    buffer = io.BytesIO()
+    build(buffer)
+    buffer.seek(0)
+    yield from iter(lambda: buffer.read(chunk_size), b"")
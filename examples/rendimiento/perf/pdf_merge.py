@@ -0,0 +1,329 @@
+"""
+Unión de PDFs generados por ReportLab sin volver a renderizarlos.
+
+`merge_pdfs()` copia las páginas de cada PDF, con sus contenidos,
+imágenes y fuentes, a un solo documento: solo se renumeran los objetos y
+se arma un árbol de páginas nuevo. Los flujos (contenido de las páginas,
+imágenes) se copian tal cual, sin descomprimirlos.
+
+Al unir también se corrigen:
+
+- Los números de página: cada PDF dibuja su número de página con un
+  formulario `PageNumber<n>` (ver `page_number_form`); al unir, el de la
+  página n de cada parte se reemplaza por el formulario con su número en
+  el documento completo, tomado de otro PDF (`page_numbers`).
+- Los marcadores: las entradas de primer nivel del índice de cada parte
+  pasan al índice del documento, apuntando a las páginas copiadas.
+
+`PdfAppender` hace lo mismo sobre un flujo, a medida que llegan los
+PDFs: escribe cada página al recibirla y guarda solo la posición de los
+objetos, para documentos que no caben en memoria.
+
+Solo entiende la estructura que escribe ReportLab (tabla xref clásica,
+un objeto por entrada, `/Length` directo); no es un lector de PDF
+general.
+"""
+import hashlib
+import io
+import re
+from dataclasses import dataclass, field
+from functools import partial
+from typing import BinaryIO, Callable, Optional, Sequence
+
+_REF = re.compile(rb"(\d+) 0 R\b")
+_STREAM = re.compile(rb">>\s*stream\r?\n")
+_OBJ_HEADER = re.compile(rb"\s*\d+ 0 obj\s*")
+_XREF_ENTRY = re.compile(rb"(\d{10}) (\d{5}) ([nf])")
+_PARENT = re.compile(rb"/Parent \d+ 0 R")
+_PAGE_NUMBER = re.compile(rb"/FormXob\.PageNumber(\d+) (\d+) 0 R")
+_TITLE = re.compile(rb"/Title (\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)")
+_DEST = re.compile(rb"/Dest (\[[^\]]*\])")
+
+# Prefijo del nombre de los formularios con el número de cada página
+PAGE_NUMBER_FORM = "PageNumber"
+
+
+def page_number_form(page: int) -> str:
+    """Nombre del formulario con el número de la página `page` (desde 1)."""
+    return f"{PAGE_NUMBER_FORM}{page}"
+
+
+@dataclass
+class _Pdf:
+    """Objetos de un PDF de ReportLab, por número."""
+    header: bytes
+    objects: dict[int, bytes]
+    root: int
+    info: Optional[int]
+    pages: list[int] = field(default_factory=list)
+    # Objeto de este PDF → número en el PDF donde se copió
+    copied: dict[int, int] = field(default_factory=dict)
+
+    def head(self, number: int) -> bytes:
+        """Diccionario del objeto, sin el flujo."""
+        body = self.objects[number]
+        match = _STREAM.search(body)
+        return body if match is None else body[:match.start() + 2]
+
+    def ref(self, number: int, key: bytes) -> Optional[int]:
+        match = re.search(rb"/" + key + rb" (\d+) 0 R", self.head(number))
+        return int(match.group(1)) if match else None
+
+
+def _parse(data: bytes) -> _Pdf:
+    start = data.rindex(b"startxref")
+    xref_at = int(data[start + len(b"startxref"):].split()[0])
+    xref_end = data.index(b"trailer", xref_at)
+    section = data[xref_at:xref_end].split(b"\n", 2)
+    first = int(section[1].split()[0])
+    offsets = {
+        first + i: int(offset)
+        for i, (offset, _, kind) in enumerate(_XREF_ENTRY.findall(section[2]))
+        if kind == b"n"
+    }
+    ends = sorted(offsets.values()) + [xref_at]
+    next_offset = dict(zip(ends, ends[1:]))
+    objects = {}
+    for number, offset in offsets.items():
+        body = data[offset:next_offset[offset]]
+        body = body[_OBJ_HEADER.match(body).end():body.rindex(b"endobj")].rstrip()
+        objects[number] = body
+
+    trailer = data[xref_end:start]
+    root = int(re.search(rb"/Root (\d+) 0 R", trailer).group(1))
+    info = re.search(rb"/Info (\d+) 0 R", trailer)
+    pdf = _Pdf(data[:data.index(b"\n")], objects, root, int(info.group(1)) if info else None)
+    pdf.pages = _page_list(pdf, pdf.ref(root, b"Pages"))
+    return pdf
+
+
+def _page_list(pdf: _Pdf, node: int) -> list[int]:
+    head = pdf.head(node)
+    if b"/Type /Pages" not in head:
+        return [node]
+    kids = re.search(rb"/Kids \[([^\]]*)\]", head).group(1)
+    pages = []
+    for kid in _REF.findall(kids):
+        pages.extend(_page_list(pdf, int(kid)))
+    return pages
+
+
+def _outline(pdf: _Pdf) -> list[tuple[bytes, bytes]]:
+    """Título y destino de las entradas de primer nivel del índice."""
+    outlines = pdf.ref(pdf.root, b"Outlines")
+    entries = []
+    item = pdf.ref(outlines, b"First") if outlines is not None else None
+    while item is not None:
+        head = pdf.head(item)
+        title, dest = _TITLE.search(head), _DEST.search(head)
+        if title and dest:
+            entries.append((title.group(1), dest.group(1)))
+        item = pdf.ref(item, b"Next")
+    return entries
+
+
+def _page_number_forms(pdf: _Pdf) -> dict[int, int]:
+    """Número de página → objeto de su formulario `PageNumber<n>`."""
+    forms = {}
+    for page in pdf.pages:
+        for number, ref in _PAGE_NUMBER.findall(pdf.head(page)):
+            forms[int(number)] = int(ref)
+    return forms
+
+
+class PdfAppender:
+    """
+    Escribe un PDF con las páginas de otros PDFs de ReportLab, a medida que llegan.
+
+    Cada `append()` copia las páginas de un PDF al destino; `close()`
+    escribe al final el árbol de páginas, el índice y la tabla xref. En
+    memoria solo quedan la posición de cada objeto escrito y los
+    marcadores, así que el documento puede crecer sin límite.
+
+    Example:
+        ```python
+        with open("anual.pdf", "wb") as out:
+            appender = PdfAppender(out)
+            for mes in meses:
+                appender.append(pdf_bytes(lambda buffer: reporte_del_mes(mes, buffer)))
+            appender.close()
+        ```
+    """
+
+    def __init__(self, out: BinaryIO) -> None:
+        """
+        Inicializa el PDF y escribe su encabezado.
+
+        Args:
+            out: Flujo binario donde se escribe el PDF (no se cierra).
+        """
+        self.out = out
+        self._offsets: list[Optional[int]] = []
+        self._position = 0
+        self._digest = hashlib.md5()
+        self._kids: list[int] = []
+        self._outline: list[tuple[bytes, bytes]] = []
+        self._info: Optional[bytes] = None
+        self._write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e ReportLab Generated PDF document\n")
+        self._pages_node = self._reserve()
+
+    @property
+    def pages(self) -> int:
+        """Páginas escritas hasta ahora."""
+        return len(self._kids)
+
+    def append(self, data: bytes) -> int:
+        """
+        Copia al destino todas las páginas de un PDF de ReportLab.
+
+        Returns:
+            Páginas copiadas.
+        """
+        pdf = _parse(data)
+        self._append(pdf, {})
+        return len(pdf.pages)
+
+    def close(self) -> None:
+        """Escribe el árbol de páginas, el índice, los metadatos y la tabla xref."""
+        self._set(self._pages_node, b"<<\n/Count %d /Kids [ %s ] /Type /Pages\n>>"
+                  % (len(self._kids), b" ".join(b"%d 0 R" % kid for kid in self._kids)))
+
+        catalog = b"<<\n/PageMode /UseNone /Pages %d 0 R /Type /Catalog\n>>" % self._pages_node
+        if self._outline:
+            root_outline = self._reserve()
+            items = [self._reserve() for _ in self._outline]
+            for i, ((title, dest), item) in enumerate(zip(self._outline, items)):
+                links = b"/Parent %d 0 R" % root_outline
+                if i > 0:
+                    links += b" /Prev %d 0 R" % items[i - 1]
+                if i + 1 < len(items):
+                    links += b" /Next %d 0 R" % items[i + 1]
+                self._set(item, b"<<\n/Dest %s %s /Title %s\n>>" % (dest, links, title))
+            self._set(root_outline, b"<<\n/Count %d /First %d 0 R /Last %d 0 R /Type /Outlines\n>>"
+                      % (len(items), items[0], items[-1]))
+            catalog = (b"<<\n/Outlines %d 0 R /PageMode /UseOutlines /Pages %d 0 R /Type /Catalog\n>>"
+                       % (root_outline, self._pages_node))
+
+        info = None
+        if self._info is not None:
+            info = self._reserve()
+            self._set(info, self._info)
+        root = self._reserve()
+        self._set(root, catalog)
+
+        xref_at = self._position
+        self._write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        self._write(b"".join(b"%010d 00000 n \n" % offset for offset in self._offsets))
+        digest = self._digest.hexdigest().encode("ascii")
+        info_entry = b"/Info %d 0 R\n" % info if info is not None else b""
+        self._write(
+            b"trailer\n<<\n/ID [<%s><%s>]\n%s/Root %d 0 R\n/Size %d\n>>\nstartxref\n%d\n%%%%EOF\n"
+            % (digest, digest, info_entry, root, len(self._offsets) + 1, xref_at)
+        )
+
+    def _write(self, data: bytes) -> None:
+        self.out.write(data)
+        self._digest.update(data)
+        self._position += len(data)
+
+    def _reserve(self) -> int:
+        self._offsets.append(None)
+        return len(self._offsets)
+
+    def _set(self, number: int, body: bytes) -> None:
+        self._offsets[number - 1] = self._position
+        self._write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+
+    def _append(self, pdf: _Pdf, redirect: dict[int, int]) -> None:
+        for page in pdf.pages:
+            self._kids.append(self._copy(pdf, page, redirect))
+        self._outline.extend((title, _REF.sub(partial(_renumber, pdf.copied), dest))
+                             for title, dest in _outline(pdf))
+        if self._info is None and pdf.info is not None:
+            self._info = pdf.objects[pdf.info]
+
+    def _copy(self, pdf: _Pdf, number: int, redirect: dict[int, int]) -> int:
+        """
+        Copia un objeto y todo lo que referencia, menos `/Parent`: el de
+        las páginas pasa a ser el árbol de páginas de este PDF.
+
+        Args:
+            redirect: Objetos de `pdf` que se reemplazan por objetos ya
+                copiados (número nuevo).
+        """
+        if number in redirect:
+            return redirect[number]
+        if number in pdf.copied:
+            return pdf.copied[number]
+        pending = [number]
+        pdf.copied[number] = self._reserve()
+        copied = [number]
+        while pending:
+            head = pdf.head(pending.pop())
+            for ref in map(int, _REF.findall(_PARENT.sub(b"", head))):
+                if ref in redirect or ref in pdf.copied or ref not in pdf.objects:
+                    continue
+                pdf.copied[ref] = self._reserve()
+                pending.append(ref)
+                copied.append(ref)
+
+        numbers = {**pdf.copied, **redirect}
+        parent = b"/Parent %d 0 R" % self._pages_node
+        for old in copied:
+            body = pdf.objects[old]
+            head = pdf.head(old)
+            new_head = _PARENT.sub(parent, _REF.sub(partial(_renumber, numbers), head))
+            self._set(pdf.copied[old], new_head + body[len(head):])
+        return pdf.copied[number]
+
+
+def _renumber(numbers: dict[int, int], match: re.Match) -> bytes:
+    new = numbers.get(int(match.group(1)))
+    return b"%d 0 R" % new if new is not None else b"null"
+
+
+def merge_pdfs(
+    chunks: Sequence[bytes],
+    page_numbers: Optional[Callable[[int], bytes]] = None,
+) -> bytes:
+    """
+    Une PDFs de ReportLab en uno, en orden, sin volver a renderizarlos.
+
+    Args:
+        chunks: PDFs a unir, completos (los de `PerfReportGenerator` o de
+            cualquier documento de ReportLab).
+        page_numbers: `(total_de_páginas) -> PDF` cuya primera página usa
+            un formulario `page_number_form(n)` por cada número de página
+            del documento. En las partes, el formulario de la página n se
+            reemplaza por el del número que le toca en el documento unido.
+            None = las partes se copian tal cual.
+
+    Returns:
+        El PDF unido. Toma los metadatos (`/Info`) de la primera parte y
+        reúne los marcadores de primer nivel de todas.
+
+    Raises:
+        ValueError: Si no hay partes para unir.
+    """
+    if not chunks:
+        raise ValueError("chunks inválido: []. Use al menos un PDF")
+    pdfs = [_parse(chunk) for chunk in chunks]
+    total = sum(len(pdf.pages) for pdf in pdfs)
+
+    out = io.BytesIO()
+    appender = PdfAppender(out)
+    stamp_forms: dict[int, int] = {}
+    if page_numbers is not None:
+        stamp = _parse(page_numbers(total))
+        stamp_forms = {page: appender._copy(stamp, ref, {})
+                       for page, ref in _page_number_forms(stamp).items()}
+
+    offset = 0
+    for pdf in pdfs:
+        redirect = {ref: stamp_forms[offset + page]
+                    for page, ref in _page_number_forms(pdf).items()
+                    if offset + page in stamp_forms}
+        appender._append(pdf, redirect)
+        offset += len(pdf.pages)
+    appender.close()
+    return out.getvalue()
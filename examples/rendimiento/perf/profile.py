@@ -0,0 +1,401 @@
+"""
+Perfil de columnas precalculado para QryDoc.
+
+`DataProfile` calcula una sola vez, al cargar los datos, las estadísticas
+de cada columna (conteos de distintos, valores más frecuentes, min/max,
+nulos e histogramas) y se actualiza de forma incremental con filas nuevas.
+
+El perfil responde preguntas de metadatos sin llamar al LLM y sirve como
+contexto compacto para los prompts en lugar de filas de muestra.
+"""
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# Comparaciones y filtros: la pregunta es sobre parte de las filas
+_FILTER_RE = re.compile(
+    r"\b(donde|where|cuando|when|con|with|sin|without|entre|between|solo|only|excepto|except"
+    r"|mayor(es)? (a|que)|menor(es)? (a|que)|greater|less than|more than|above|below|over|under"
+    r"|igual|equal|superior|inferior)\b|[<>=]|\d"
+)
+
+# Palabras de una pregunta de metadatos, además de la columna y las
+# stopwords; cualquier otra palabra ("ingresos", "outliers") la deja al LLM
+_METADATA_WORDS = {
+    "que", "cual", "cuales", "cuanto", "cuanta", "cuantos", "cuantas", "how", "many", "what",
+    "which", "dime", "dame", "muestra", "mostrar", "lista", "listar", "tell", "show", "give", "list",
+    "existen", "exist", "aparecen", "hay", "columna", "column", "campo", "field", "datos", "data",
+    "tabla", "table", "dataset", "valor", "valores", "value", "values", "categorias", "categories",
+    "tipos", "types", "distinto", "distintos", "distintas", "diferentes", "unicos", "unicas",
+    "distinct", "unique", "different", "numero", "number", "count", "frecuente", "frecuentes",
+    "comun", "comunes", "frequent", "common", "nulo", "nulos", "null", "nulls", "vacio", "vacios",
+    "vacias", "missing", "faltantes", "faltan", "rango", "range", "desde", "hasta", "cuando",
+    "periodo", "period", "minimo", "minima", "min", "maximo", "maxima", "max", "menor", "mayor",
+    "primer", "primera", "ultimo", "ultima", "earliest", "latest", "lowest", "highest",
+}
+
+# Ranking y exclusiones: la respuesta depende de otra medida o de parte de las filas
+_RANKING_WORDS = {
+    "mas", "menos", "most", "least", "top", "mejor", "mejores", "peor", "peores", "vende", "venden",
+    "genera", "generan", "excluyendo", "excluye", "excluding", "sin", "without",
+}
+# "más frecuentes" sí es una pregunta de metadatos
+_FREQUENT_RE = re.compile(r"\b(mas|most) (frecuent|comun|frequent|common)")
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas sin acentos, con '_' y '-' como espacios."""
+    text = unicodedata.normalize("NFKD", str(text).lower())
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    return re.sub(r"[_\-]+", " ", text)
+
+
+@dataclass
+class ColumnProfile:
+    """Estadísticas de una columna."""
+    name: str
+    kind: str  # 'numeric', 'datetime' o 'categorical'
+    dtype: str
+    count: int = 0
+    nulls: int = 0
+    min: Any = None
+    max: Any = None
+    value_counts: Counter = field(default_factory=Counter)
+    distinct_overflow: bool = False
+    total: float = 0.0
+    bin_edges: Optional[np.ndarray] = None
+    bin_counts: Optional[np.ndarray] = None
+
+    @property
+    def distinct(self) -> int:
+        """Número de valores distintos (cota inferior si hubo desbordamiento)."""
+        return len(self.value_counts)
+
+    @property
+    def approximate(self) -> bool:
+        """Si los conteos son aproximados: hubo más de `MAX_TRACKED_VALUES` distintos."""
+        return self.distinct_overflow
+
+    @property
+    def mean(self) -> Optional[float]:
+        non_null = self.count - self.nulls
+        if self.kind != "numeric" or non_null == 0:
+            return None
+        return self.total / non_null
+
+    def top(self, k: int = 5) -> list[tuple[Any, int]]:
+        """Los `k` valores más frecuentes con su conteo (aproximados si `approximate`)."""
+        return self.value_counts.most_common(k)
+
+
+class DataProfile:
+    """
+    Índice de perfiles por columna, calculado una vez y actualizable.
+
+    Features:
+    - Distintos, top-k, min/max, nulos e histogramas por columna
+    - Actualización incremental con `update(new_rows)`
+    - Respuestas locales a preguntas de metadatos con `answer()`
+    - Contexto compacto para prompts con `to_prompt()`
+
+    Example:
+        ```python
+        profile = DataProfile.from_dataframe(df)
+        profile.answer("¿Qué valores existen en region?")
+        # 'region tiene 3 valores distintos: Centro, Norte, Sur'
+        ```
+    """
+
+    # Valores distintos máximos rastreados por columna
+    MAX_TRACKED_VALUES = 10_000
+    # Bins de los histogramas numéricos
+    HISTOGRAM_BINS = 20
+
+    def __init__(self, top_k: int = 5) -> None:
+        self.top_k = top_k
+        self.columns: dict[str, ColumnProfile] = {}
+        self.rows = 0
+        self._column_index: dict[str, str] = {}
+        # Valores de las columnas categóricas como palabras y frases (ver _mentions_value)
+        self._value_words: Optional[set[str]] = None
+        self._value_phrases: list[str] = []
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame, top_k: int = 5) -> "DataProfile":
+        """Construye el perfil de un DataFrame."""
+        profile = cls(top_k=top_k)
+        profile.update(df)
+        return profile
+
+    @staticmethod
+    def _kind(series: pd.Series) -> str:
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            return "numeric"
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return "datetime"
+        # Columnas de texto con fechas ISO (p. ej. 'fecha' en ventas.csv)
+        if series.dtype == object:
+            sample = series.dropna().head(20)
+            if len(sample) and sample.astype(str).str.match(r"^\d{4}-\d{2}-\d{2}").all():
+                return "datetime"
+        return "categorical"
+
+    def update(self, df: pd.DataFrame) -> "DataProfile":
+        """
+        Incorpora filas nuevas al perfil sin recorrer las anteriores.
+
+        Args:
+            df: Filas nuevas, con las mismas columnas que las anteriores.
+
+        Returns:
+            El propio perfil, para encadenar llamadas.
+        """
+        for name in df.columns:
+            series = df[name]
+            column = self.columns.get(name)
+            if column is None:
+                column = ColumnProfile(name=name, kind=self._kind(series), dtype=str(series.dtype))
+                self.columns[name] = column
+                self._column_index[normalize_text(name)] = name
+
+            if column.kind == "datetime" and not pd.api.types.is_datetime64_any_dtype(series):
+                series = pd.to_datetime(series, errors="coerce")
+
+            nulls = int(series.isna().sum())
+            column.count += len(series)
+            column.nulls += nulls
+            non_null = series.dropna()
+            if non_null.empty:
+                continue
+
+            try:
+                low, high = non_null.min(), non_null.max()
+                column.min = low if column.min is None else min(column.min, low)
+                column.max = high if column.max is None else max(column.max, high)
+            except TypeError:
+                # Columnas con tipos mezclados no tienen orden
+                pass
+
+            if column.kind == "numeric":
+                values = non_null.to_numpy(dtype=float)
+                column.total += float(values.sum())
+                self._update_histogram(column, values)
+
+            column.value_counts.update(non_null.value_counts().to_dict())
+            if len(column.value_counts) > self.MAX_TRACKED_VALUES:
+                # Columnas casi únicas: se conservan solo los más frecuentes. Los
+                # conteos siguen sumando, pero un valor descartado vuelve desde cero
+                column.value_counts = Counter(
+                    dict(column.value_counts.most_common(self.MAX_TRACKED_VALUES))
+                )
+                column.distinct_overflow = True
+
+        self.rows += len(df)
+        self._value_words = None
+        return self
+
+    def _update_histogram(self, column: ColumnProfile, values: np.ndarray) -> None:
+        """
+        Histograma con los bordes del primer lote, que se ensanchan cuando
+        llegan valores fuera del rango.
+        """
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            return
+        low, high = float(values.min()), float(values.max())
+        if column.bin_edges is None:
+            if low == high:
+                high = low + 1.0
+            column.bin_edges = np.linspace(low, high, self.HISTOGRAM_BINS + 1)
+            column.bin_counts = np.zeros(self.HISTOGRAM_BINS, dtype=np.int64)
+        while low < column.bin_edges[0] or high > column.bin_edges[-1]:
+            self._widen_histogram(column, upward=high > column.bin_edges[-1])
+        counts, _ = np.histogram(values, bins=column.bin_edges)
+        column.bin_counts += counts
+
+    def _widen_histogram(self, column: ColumnProfile, upward: bool) -> None:
+        """
+        Duplica el ancho de los bins hacia arriba o hacia abajo.
+
+        Cada bin nuevo junta dos bins vecinos, así que los conteos
+        anteriores se conservan exactos.
+        """
+        bins = self.HISTOGRAM_BINS
+        counts = column.bin_counts
+        merged = counts[0::2] + counts[1::2]
+        width = 2 * (column.bin_edges[-1] - column.bin_edges[0]) / bins
+        widened = np.zeros(bins, dtype=np.int64)
+        if upward:
+            start = column.bin_edges[0]
+            widened[:len(merged)] = merged
+        else:
+            start = column.bin_edges[-1] - bins * width
+            widened[bins - len(merged):] = merged
+        column.bin_edges = np.linspace(start, start + bins * width, bins + 1)
+        column.bin_counts = widened
+
+    # ------------------------------------------------------------------
+    # Preguntas de metadatos
+    # ------------------------------------------------------------------
+
+    def find_column(self, question: str) -> Optional[str]:
+        """Columna mencionada en la pregunta (la de nombre más largo)."""
+        matches = self._mentioned_columns(self._padded(question))
+        return max(matches, key=len) if matches else None
+
+    @staticmethod
+    def _padded(question: str) -> str:
+        return " " + re.sub(r"[^\w\s]", " ", normalize_text(question)) + " "
+
+    def _mentioned_columns(self, text: str) -> list[str]:
+        """Columnas nombradas en el texto, también en plural ("productos")."""
+        return [
+            name for key, name in self._column_index.items()
+            if any(f" {key}{suffix} " in text for suffix in ("", "s", "es"))
+        ]
+
+    def _mentions_value(self, text: str) -> bool:
+        """Si el texto nombra un valor de una columna categórica ("Norte", "Ana Martínez")."""
+        if self._value_words is None:
+            from perf.validation import ANALYSIS_WORDS, STOPWORDS  # perf.validation importa este módulo
+
+            words: set[str] = set()
+            phrases: set[str] = set()
+            for column in self.columns.values():
+                if column.kind != "categorical":
+                    continue
+                for value in column.value_counts:
+                    normalized = " ".join(re.sub(r"[^\w\s]", " ", normalize_text(value)).split())
+                    if " " in normalized:
+                        phrases.add(normalized)
+                        # "Ana" también nombra a "Ana Martínez"
+                        words.update(w for w in normalized.split() if len(w) > 2)
+                    elif normalized:
+                        words.add(normalized)
+            # Un valor como "de" o "mas" no se distingue de las palabras de la pregunta
+            self._value_words = words - set(self._column_index) - STOPWORDS - ANALYSIS_WORDS
+            self._value_phrases = sorted(phrases)
+        return (
+            not self._value_words.isdisjoint(text.split())
+            or any(f" {phrase} " in text for phrase in self._value_phrases)
+        )
+
+    def _has_other_words(self, text: str, column_name: str) -> bool:
+        """Si el texto tiene palabras además de la columna, las de metadatos y las stopwords."""
+        from perf.validation import STOPWORDS  # perf.validation importa este módulo
+
+        for key, name in self._column_index.items():
+            if name == column_name:
+                for suffix in ("es", "s", ""):
+                    text = text.replace(f" {key}{suffix} ", " ")
+        text = _FREQUENT_RE.sub(r"\2", text)
+        words = set(text.split())
+        return not words.isdisjoint(_RANKING_WORDS) or not words <= _METADATA_WORDS | STOPWORDS
+
+    def answer(self, question: str) -> Optional[str]:
+        """
+        Responde preguntas de metadatos sin LLM.
+
+        Reconoce preguntas sobre valores existentes, distintos, rango,
+        mínimo/máximo y nulos de una columna. Solo responde si la pregunta
+        es sobre una columna completa y no tiene otras palabras: si nombra
+        otra columna, un valor, un número, un filtro ("en la región Norte",
+        "mayor a 10"), un ranking ("qué categorías generan más ingresos")
+        o cualquier otra palabra ("excluyendo outliers"), la respuesta
+        depende de las filas y queda para el LLM.
+
+        Returns:
+            La respuesta en texto, o None si la pregunta no es de metadatos.
+        """
+        padded = self._padded(question)
+        columns = self._mentioned_columns(padded)
+        if len(columns) != 1 or _FILTER_RE.search(padded) or self._mentions_value(padded):
+            return None
+        column_name = columns[0]
+        if self._has_other_words(padded, column_name):
+            return None
+        column = self.columns[column_name]
+        text = normalize_text(question)
+
+        def has(*words: str) -> bool:
+            return any(re.search(rf"\b{w}", text) for w in words)
+
+        # Valores más frecuentes: conteo por categoría ya precalculado
+        if has("frecuent", "frequent", "comun", "common"):
+            top = ", ".join(f"{self._fmt(v)} ({c:,})" for v, c in column.top(self.top_k))
+            approximate = " (aproximados)" if column.approximate else ""
+            return f"Valores más frecuentes{approximate} de {column.name}: {top}"
+
+        # Las agregaciones sobre otras columnas necesitan al LLM
+        if has("total", "suma", "sum", "promedio", "average", "media", "mean", "por ", "by ", "per "):
+            return None
+
+        if has("nul", "null", "vaci", "missing", "falt"):
+            return f"{column.name} tiene {column.nulls:,} valores nulos de {column.count:,}"
+
+        if column.kind != "categorical":
+            if has("rango", "range", "desde", "periodo", "period"):
+                return f"{column.name} va de {self._fmt(column.min)} a {self._fmt(column.max)}"
+            if has("minim", "min\\b", "menor", "primer", "earliest", "lowest"):
+                return f"Mínimo de {column.name}: {self._fmt(column.min)}"
+            if has("maxim", "max\\b", "mayor", "ultim", "latest", "highest"):
+                return f"Máximo de {column.name}: {self._fmt(column.max)}"
+
+        asks_count = has("cuant", "how many", "number of", "numero de")
+        asks_distinct = has("distint", "diferent", "unic", "distinct", "unique", "tipos", "types")
+        if asks_count and asks_distinct:
+            prefix = "al menos " if column.distinct_overflow else ""
+            return f"{column.name} tiene {prefix}{column.distinct:,} valores distintos"
+
+        if column.kind == "categorical" and (
+            asks_distinct or has("valores", "values", "existen", "exist", "categorias", "lista", "list")
+        ):
+            if column.distinct <= 20 and not column.distinct_overflow:
+                values = ", ".join(self._fmt(v) for v in sorted(column.value_counts, key=str))
+                return f"{column.name} tiene {column.distinct} valores distintos: {values}"
+            top = ", ".join(f"{self._fmt(v)} ({c:,})" for v, c in column.top(self.top_k))
+            return f"{column.name} tiene {column.distinct:,} valores distintos; los más frecuentes: {top}"
+
+        return None
+
+    @staticmethod
+    def _fmt(value: Any) -> str:
+        if isinstance(value, pd.Timestamp):
+            return value.strftime("%Y-%m-%d") if value == value.normalize() else str(value)
+        if isinstance(value, float):
+            return f"{value:,.2f}"
+        return str(value)
+
+    # ------------------------------------------------------------------
+    # Contexto para prompts
+    # ------------------------------------------------------------------
+
+    def to_prompt(self, max_values: int = 5) -> str:
+        """
+        Describe las columnas en una línea cada una, sin filas de muestra.
+
+        Example:
+            region (categorical, 3 distintos): Norte 10, Sur 10, Centro 10
+        """
+        lines = [f"{self.rows:,} filas"]
+        for column in self.columns.values():
+            header = f"{column.name} ({column.kind}"
+            if column.nulls:
+                header += f", {column.nulls:,} nulos"
+            if column.kind == "categorical":
+                top = ", ".join(f"{v} {c}" for v, c in column.top(max_values))
+                lines.append(f"{header}, {column.distinct:,} distintos): {top}")
+            elif column.kind == "numeric":
+                lines.append(
+                    f"{header}): min {self._fmt(column.min)}, max {self._fmt(column.max)}, "
+                    f"media {self._fmt(column.mean)}"
+                )
+            else:
+                lines.append(f"{header}): {self._fmt(column.min)} a {self._fmt(column.max)}")
+        return "\n".join(lines)
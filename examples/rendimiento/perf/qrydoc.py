@@ -0,0 +1,591 @@
+"""
+QryDoc con las optimizaciones de rendimiento de `perf`.
+
+`PerfQryDoc` extiende `QryDoc` sin cambiar su API: todos los métodos
+existentes siguen funcionando igual y las optimizaciones se activan con
+parámetros opcionales del constructor.
+"""
+import logging
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional, Union
+
+import pandas as pd
+
+from qry_doc import (
+    QryDoc,
+    CoverBuilder,
+    TemplateBuilder,
+    ReportTemplate,
+    QueryError,
+    ExportError,
+    ReportError,
+    DataSourceError,
+    ValidationError,
+)
+from qry_doc.csv_exporter import CSVExporter
+from qry_doc.data_source import DataSourceLoader
+from qry_doc.validators import OutputValidator
+
+from perf.aggregation import SharedAggregates
+from perf.batch import ReportBatch, ReportRenderer, ReportResult, ReportSpec, safe_name
+from perf.chart_cache import ChartCache, LLMChartStore
+from perf.charts import ChartRenderPool, render_chart, resolve_dpi
+from perf.context import BoundedAIBuilder, Summarizer
+from perf.output import PdfOutput, describe_output
+from perf.profile import DataProfile
+from perf.sections import SectionCache
+from perf.report import CHART_BACKENDS
+from perf.streaming_csv import StreamingExtractor, iter_filtered
+from perf.templates import CompiledTemplate, compile_template
+from perf.text_to_sql import TextToSQL
+
+logger = logging.getLogger(__name__)
+
+# Modos de ejecución de consultas
+EXECUTION_MODES = ("pandas", "sql")
+
+
+class PerfQryDoc(QryDoc):
+    """
+    QryDoc con optimizaciones de rendimiento opcionales.
+
+    Example:
+        ```python
+        qry = PerfQryDoc("ventas.csv", llm=llm, context_budget=800)
+        ai = qry.ai_builder  # Misma instancia en cada acceso
+        ```
+    """
+
+    def __init__(
+        self,
+        data_source: Union[str, Path, pd.DataFrame],
+        llm: Any,
+        api_key: Optional[str] = None,
+        context_budget: int = 1500,
+        context_summarizer: Optional[Summarizer] = None,
+        execution_mode: str = "pandas",
+        sql_tables: Optional[list[str]] = None,
+        sql_max_rows: int = 1000,
+        sql_sample_rows: int = 1000,
+        answer_metadata_locally: bool = True,
+        extract_chunk_size: Optional[int] = 100_000,
+        chart_workers: int = 0,
+        chart_cache: Optional[ChartCache] = None,
+        chart_backend: str = "raster",
+        chart_dpi: Union[str, int] = "print",
+        section_cache: Optional[SectionCache] = None,
+        llm_chart_store: Optional[LLMChartStore] = None,
+    ) -> None:
+        """
+        Inicializa PerfQryDoc.
+
+        Args:
+            data_source: Ruta CSV, DataFrame o cadena de conexión SQL.
+            llm: Proveedor LLM.
+            api_key: API key opcional.
+            context_budget: Presupuesto de tokens del contexto del AIBuilder.
+            context_summarizer: Resumidor opcional para los turnos antiguos.
+            execution_mode: 'pandas' (por defecto) o 'sql' para que el LLM
+                escriba SQL que se ejecuta en la base de datos.
+            sql_tables: Tablas visibles para el LLM en modo 'sql'. None = todas.
+            sql_max_rows: Filas máximas por consulta en modo 'sql'.
+            sql_sample_rows: Filas cargadas en pandas en modo 'sql'.
+            answer_metadata_locally: Si las preguntas de metadatos (valores,
+                rangos, distintos, nulos) se responden con el perfil sin LLM.
+                No aplica en modo 'sql': el perfil describe solo la muestra.
+            extract_chunk_size: Filas por bloque en `extract_to_csv`. None
+                desactiva la exportación por bloques.
+            chart_workers: Procesos para renderizar las gráficas de los
+                reportes. 0 = en el proceso actual.
+            chart_cache: Caché de gráficas por contenido, compartible entre
+                instancias. None = caché en memoria propia.
+            chart_backend: 'raster' (PNG) o 'vector' para dibujar en los
+                reportes las gráficas de barras y de pastel con ReportLab.
+            chart_dpi: Resolución impresa de las gráficas PNG de los
+                reportes: 'draft' (72), 'screen' (110), 'print' (200) o
+                un valor en DPI.
+            section_cache: Caché de las secciones ya armadas de los
+                reportes, para regenerarlos rehaciendo solo lo que cambió.
+                None = sin caché.
+            llm_chart_store: Directorio acotado donde se mueven las
+                gráficas de las respuestas de `ask()`. None =
+                `exports/charts/by_content` con el tamaño por defecto.
+
+        Raises:
+            DataSourceError: Si el modo 'sql' se usa sin cadena de conexión SQL.
+        """
+        if chart_backend not in CHART_BACKENDS:
+            raise ValueError(
+                f"chart_backend inválido: '{chart_backend}'. Use: {', '.join(CHART_BACKENDS)}"
+            )
+        if execution_mode not in EXECUTION_MODES:
+            raise ValueError(
+                f"execution_mode inválido: '{execution_mode}'. Use: {', '.join(EXECUTION_MODES)}"
+            )
+
+        self._sql: Optional[TextToSQL] = None
+        if execution_mode == "sql":
+            if not (isinstance(data_source, str) and DataSourceLoader.is_sql_connection(data_source)):
+                raise DataSourceError(
+                    user_message="El modo 'sql' requiere una cadena de conexión SQL"
+                )
+            self._sql = TextToSQL(data_source, llm=llm, tables=sql_tables, max_rows=sql_max_rows)
+            # Solo una muestra vive en pandas; las preguntas se resuelven en la base
+            data_source = self._sql.load_sample(
+                table=sql_tables[0] if sql_tables else None,
+                rows=sql_sample_rows,
+            )
+
+        super().__init__(data_source, llm=llm, api_key=api_key)
+        self._execution_mode = execution_mode
+        self._context_budget = context_budget
+        self._context_summarizer = context_summarizer
+        self._ai_builder: Optional[BoundedAIBuilder] = None
+        # En modo 'sql' el perfil sale de la muestra, no de la tabla completa
+        self._answer_metadata_locally = answer_metadata_locally and execution_mode != "sql"
+        self._extractor = (
+            StreamingExtractor(llm, chunk_size=extract_chunk_size)
+            if extract_chunk_size is not None else None
+        )
+
+        self._chart_workers = chart_workers
+        self._chart_pool: Optional[ChartRenderPool] = None
+        self._chart_cache = chart_cache if chart_cache is not None else ChartCache()
+        self._section_cache = section_cache
+        self._llm_chart_store = llm_chart_store if llm_chart_store is not None else LLMChartStore()
+        self._chart_backend = chart_backend
+        self._chart_dpi = resolve_dpi(chart_dpi)
+        self._renderer: Optional[ReportRenderer] = None
+
+        # Perfil calculado una sola vez al cargar (en modo 'sql', de la muestra)
+        self._profile = DataProfile.from_dataframe(self._df)
+        self._inject_profile()
+
+    @property
+    def ai_builder(self) -> BoundedAIBuilder:
+        """
+        AIBuilder con contexto acotado, compartido entre accesos.
+
+        A diferencia de `QryDoc.ai_builder`, retorna siempre la misma
+        instancia para que el contexto de la sesión se conserve.
+        """
+        if self._ai_builder is None:
+            self._ai_builder = BoundedAIBuilder(
+                df=self._df,
+                llm=self._llm,
+                context_budget=self._context_budget,
+                summarizer=self._context_summarizer,
+                profile=self._profile,
+            )
+        return self._ai_builder
+
+    def _inject_profile(self) -> None:
+        """Usa el perfil como descripción de la tabla en los prompts de PandasAI."""
+        try:
+            schema = self._adapter._sdf.dataframe.schema
+            schema.description = self._profile.to_prompt().replace('"', "'")
+        except AttributeError:
+            # Otras versiones de PandasAI: el perfil solo se usa localmente
+            pass
+
+    def append_data(self, new_rows: pd.DataFrame) -> None:
+        """
+        Agrega filas a los datos y actualiza el perfil de forma incremental.
+
+        El `ai_builder` pasa a usar los datos nuevos y conserva el contexto
+        de la sesión.
+
+        Args:
+            new_rows: Filas nuevas con las mismas columnas.
+        """
+        from qry_doc.ai_adapter import PandasAIAdapter
+
+        self._df = pd.concat([self._df, new_rows], ignore_index=True)
+        self._profile.update(new_rows)
+        self._adapter = PandasAIAdapter(
+            df=self._df,
+            llm=self._llm,
+            chart_save_path=self._chart_manager.path
+        )
+        self._inject_profile()
+        if self._ai_builder is not None:
+            self._ai_builder.set_data(self._df, self._profile)
+        self._renderer = None
+
+    @property
+    def profile(self) -> DataProfile:
+        """Perfil de columnas precalculado."""
+        return self._profile
+
+    def ask(self, query: str) -> str:
+        """
+        Pregunta en lenguaje natural.
+
+        Las preguntas de metadatos se responden con el perfil sin LLM
+        (salvo en modo 'sql'). En modo 'sql' el LLM escribe SQL que se ejecuta en la base de datos
+        y la respuesta es el resultado agregado en texto.
+        """
+        if self._answer_metadata_locally:
+            local_answer = self._profile.answer(query)
+            if local_answer is not None:
+                return local_answer
+        if self._sql is None:
+            answer = super().ask(query)
+            # Las gráficas del LLM no se acumulan en exports/charts
+            return self._llm_chart_store.adopt(answer)
+        df = self.ask_sql(query)
+        return TextToSQL.format_result(df, truncated=self._sql.truncated)
+
+    def ask_sql(self, query: str) -> pd.DataFrame:
+        """
+        Resuelve una pregunta con SQL generado por el LLM (modo 'sql').
+
+        Returns:
+            DataFrame con el resultado agregado.
+
+        Raises:
+            QueryError: Si no está en modo 'sql' o la consulta falla.
+            ValidationError: Si el SQL generado no es de solo lectura.
+        """
+        if self._sql is None:
+            raise QueryError(user_message="ask_sql() requiere execution_mode='sql'")
+        return self._sql.query(query)
+
+    def extract_to_csv(
+        self,
+        query: str,
+        output_path: Union[str, Path],
+        include_index: bool = False
+    ) -> str:
+        """
+        Exporta el resultado de una consulta a CSV por bloques.
+
+        En modo 'pandas' el LLM describe un filtro de filas que se aplica
+        bloque a bloque sobre los datos; las preguntas con agregaciones
+        usan la exportación normal. En modo 'sql' el LLM escribe un SELECT
+        de filas (no el resumen agregado de `ask`) y el resultado se lee de
+        la base con un cursor por bloques. En ambos casos el CSV conserva
+        el BOM UTF-8 para Excel.
+
+        Raises:
+            QueryError: Si la consulta no se puede procesar.
+            ExportError: Si el filtro o la consulta fallan al aplicarse, o
+                si no se puede escribir el archivo.
+        """
+        try:
+            if self._extractor is None:
+                if self._sql is None:
+                    return super().extract_to_csv(query, output_path, include_index=include_index)
+                df = self._sql.execute(self._sql.generate_extract_sql(query))
+                if df.empty:
+                    raise ExportError(user_message="La consulta no retornó datos para exportar")
+                return CSVExporter.export(df=df, path=output_path, include_index=include_index)
+
+            if self._sql is not None:
+                chunks = self._sql.iter_execute(
+                    self._sql.generate_extract_sql(query), chunk_size=self._extractor.chunk_size
+                )
+            else:
+                try:
+                    row_filter = self._extractor.plan(query, self._df.columns)
+                except ValidationError as e:
+                    logger.warning(f"Streaming extract rejected, using full export: {e.user_message}")
+                    row_filter = None
+                if row_filter is None:
+                    return super().extract_to_csv(query, output_path, include_index=include_index)
+                chunks = iter_filtered(self._df, row_filter, chunk_size=self._extractor.chunk_size)
+
+            self._extractor.export(chunks, output_path, include_index=include_index)
+            return f"Datos exportados exitosamente a {Path(output_path)}"
+        except (QueryError, ExportError):
+            raise
+        except Exception as e:
+            sanitized = OutputValidator.sanitize_error_message(e)
+            raise ExportError(
+                user_message=f"Error al exportar datos: {sanitized}",
+                internal_error=e
+            )
+
+    @property
+    def chart_pool(self) -> Optional[ChartRenderPool]:
+        """Pool de procesos de gráficas, arrancado en el primer uso."""
+        if self._chart_pool is None and self._chart_workers > 0:
+            self._chart_pool = ChartRenderPool(workers=self._chart_workers).start()
+        return self._chart_pool
+
+    @property
+    def chart_cache(self) -> ChartCache:
+        """Caché de imágenes de gráficas."""
+        return self._chart_cache
+
+    @property
+    def renderer(self) -> ReportRenderer:
+        """Arma los PDFs de los reportes a partir de los datos (sin LLM)."""
+        if self._renderer is None:
+            self._renderer = ReportRenderer(
+                self._df,
+                chart_cache=self._chart_cache,
+                chart_backend=self._chart_backend,
+                chart_dpi=self._chart_dpi,
+                section_cache=self._section_cache,
+            )
+        return self._renderer
+
+    @property
+    def aggregates(self) -> SharedAggregates:
+        """Agregaciones por grupo de los datos, compartidas entre reportes."""
+        return self.renderer.aggregates
+
+    def _summary_prompt(self, prompt: str) -> str:
+        """Agrega al prompt del resumen las agregaciones ya calculadas."""
+        computed = self.aggregates.to_prompt()
+        if not computed:
+            return prompt
+        return f"{prompt}\n\nPrecomputed aggregates (use them instead of recomputing):\n{computed}"
+
+    def _report_summary(self, spec: ReportSpec, compiled: CompiledTemplate) -> str:
+        """Resumen del reporte: el de la especificación o uno del LLM."""
+        if spec.summary is not None:
+            return spec.summary
+        self.renderer.prepare(spec, compiled)
+        if spec.query:
+            prompt = f"Analyze the data regarding: {spec.query}. Provide a comprehensive summary."
+        else:
+            prompt = "Provide a comprehensive summary of the data."
+        return self._adapter.query_as_text(self._summary_prompt(prompt))
+
+    def chart_image(
+        self,
+        chart_type: str = 'auto',
+        group_by: Optional[str] = None,
+        value_column: Optional[str] = None,
+        title: Optional[str] = None,
+        top_n: int = 10
+    ) -> bytes:
+        """
+        Renderiza una gráfica como `generate_chart`, pero en memoria.
+
+        Si la misma gráfica (tipo, título, serie, colores y tamaño) ya se
+        generó, la imagen se toma de la caché sin volver a renderizarla.
+
+        Returns:
+            Bytes PNG de la gráfica.
+        """
+        spec = self.renderer.chart_spec(chart_type, group_by, value_column, title, top_n)
+        return self._chart_cache.get_or_render(spec, render_chart)
+
+    def generate_chart(
+        self,
+        output_path: Union[str, Path],
+        chart_type: str = 'auto',
+        group_by: Optional[str] = None,
+        value_column: Optional[str] = None,
+        title: Optional[str] = None,
+        top_n: int = 10
+    ) -> Path:
+        """Igual que `QryDoc.generate_chart`; la imagen sale de `chart_image()`."""
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(
+            self.chart_image(chart_type, group_by, value_column, title=title, top_n=top_n)
+        )
+        return output_path
+
+    def generate_report(
+        self,
+        query: str,
+        output_path: PdfOutput,
+        title: str = "Reporte Automático",
+        template: Optional[Union[ReportTemplate, CompiledTemplate]] = None,
+        include_chart: bool = True,
+        include_table: bool = True,
+        chart_type: str = 'auto',
+        group_by: Optional[str] = None,
+        value_column: Optional[str] = None
+    ) -> str:
+        """
+        Genera un reporte igual que `QryDoc.generate_report`.
+
+        La gráfica se renderiza en memoria (con caché) y se entrega a
+        ReportLab sin escribir archivos temporales. Con el backend
+        'vector', las barras y los pasteles se dibujan con ReportLab. La
+        gráfica, la tabla y el resumen comparten las mismas agregaciones.
+        `template` puede ser una `CompiledTemplate` para no volver a
+        preparar estilos, fuentes e imágenes en cada reporte.
+        `output_path` también puede ser un flujo binario (`io.BytesIO`,
+        una respuesta HTTP): el PDF se escribe ahí sin pasar por disco.
+        """
+        try:
+            spec = ReportSpec(
+                output_path, query=query, title=title, include_chart=include_chart,
+                include_table=include_table, chart_type=chart_type, group_by=group_by,
+                value_column=value_column,
+            )
+            compiled = compile_template(template)
+            self.renderer.render(spec, compiled, self._report_summary(spec, compiled))
+            return f"Reporte generado exitosamente en {describe_output(output_path)}"
+
+        except (QueryError, ReportError):
+            raise
+        except Exception as e:
+            sanitized = OutputValidator.sanitize_error_message(e)
+            raise ReportError(
+                user_message=f"Error al generar el reporte: {sanitized}",
+                internal_error=e
+            )
+
+    def generate_report_with_builder(
+        self,
+        output_path: PdfOutput,
+        cover: Optional[CoverBuilder] = None,
+        template: Optional[Union[TemplateBuilder, CompiledTemplate]] = None,
+        title: str = "Reporte Automático",
+        summary: Optional[str] = None,
+        include_table: bool = True,
+    ) -> str:
+        """
+        Genera un reporte con CoverBuilder y TemplateBuilder.
+
+        Las gráficas se agregan sobre todos los datos y se renderizan en
+        lote (en el pool de procesos si `chart_workers > 0`); la tabla
+        muestra las primeras 20 filas. Las agregaciones de las gráficas se
+        calculan una vez, se comparten entre reportes y se incluyen en el
+        prompt del resumen. `template` también puede ser una
+        `CompiledTemplate` compilada desde un TemplateBuilder (conserva sus
+        gráficas); la portada se aplica sin volver a compilar el resto.
+        `output_path` también puede ser un flujo binario.
+        """
+        try:
+            spec = ReportSpec(output_path, title=title, summary=summary, include_table=include_table)
+            compiled = compile_template(template, cover)
+            self.renderer.chart_pool = self.chart_pool
+            self.renderer.render(spec, compiled, self._report_summary(spec, compiled))
+            return f"Reporte generado exitosamente en {describe_output(output_path)}"
+
+        except Exception as e:
+            sanitized = OutputValidator.sanitize_error_message(e)
+            raise ReportError(
+                user_message=f"Error al generar el reporte: {sanitized}",
+                internal_error=e
+            )
+
+    def generate_reports(
+        self,
+        specs: Iterable[ReportSpec],
+        workers: Optional[int] = None,
+    ) -> list[ReportResult]:
+        """
+        Genera varios reportes renderizando los PDFs en paralelo.
+
+        Los resúmenes se piden al LLM en este proceso, en orden, mientras
+        los procesos del pool arman los PDFs ya resumidos. Los datos se
+        comparten con los procesos como un archivo Arrow mapeado en
+        memoria; cada proceso convierte a DataFrame solo las filas y
+        columnas de cada reporte. Un reporte que falla no
+        detiene el lote: su error queda en el `ReportResult`.
+
+        Args:
+            specs: Especificaciones de los reportes.
+            workers: Procesos del pool. None = uno por CPU, 0 = en este
+                proceso.
+
+        Returns:
+            Un `ReportResult` por especificación, en el mismo orden.
+        """
+        self.renderer.chart_pool = self.chart_pool
+        return ReportBatch(self.renderer, self._report_summary, workers).run(list(specs))
+
+    def burst_reports(
+        self,
+        by: str,
+        output_dir: Union[str, Path] = ".",
+        name: str = "{by}_{value}.pdf",
+        cover: Optional[CoverBuilder] = None,
+        template: Optional[Union[TemplateBuilder, CompiledTemplate]] = None,
+        title: str = "{value}",
+        summary: Union[str, Callable[[Any, pd.DataFrame], str]] = "{rows:,} registros de {by} {value}.",
+        include_table: bool = True,
+        workers: Optional[int] = None,
+    ) -> dict[Any, ReportResult]:
+        """
+        Genera un reporte por cada valor de una columna (p. ej. por vendedor).
+
+        Los datos se separan una sola vez: se agrupa `by` (reutilizando
+        los códigos de las agregaciones) y se ordenan las filas para que
+        cada valor ocupe un rango contiguo. La plantilla se compila una vez
+        y los PDFs se arman en paralelo como en `generate_reports`; cada
+        reporte es el de `generate_report_with_builder` sobre las filas de
+        su valor. Las filas con `by` nulo no generan reporte.
+
+        Args:
+            by: Columna que separa los reportes.
+            output_dir: Directorio de los PDFs.
+            name: Nombre de cada PDF; admite `{by}` y `{value}` (el valor
+                sin caracteres inválidos en un nombre de archivo).
+            cover: Portada de todos los reportes.
+            template: Plantilla de todos los reportes.
+            title: Título de cada reporte; admite `{by}`, `{value}` y `{rows}`.
+            summary: Resumen de cada reporte: texto con los mismos campos
+                que `title` o una función `(valor, filas) -> str`, que se
+                llama en este proceso mientras el pool arma los PDFs.
+            include_table: Incluir las primeras 20 filas de cada valor.
+            workers: Procesos del pool. None = uno por CPU, 0 = en este
+                proceso.
+
+        Returns:
+            El `ReportResult` de cada valor de `by`, en orden.
+
+        Raises:
+            ValueError: Si `by` no es una columna o `name` repite rutas.
+        """
+        if by not in self._df.columns:
+            raise ValueError(
+                f"Columna inválida: '{by}'. Use: {', '.join(map(str, self._df.columns))}"
+            )
+        renderer, slices = self.renderer.split(by)
+        renderer.chart_pool = self.chart_pool
+        compiled = compile_template(template, cover)
+
+        specs: dict[Any, ReportSpec] = {}
+        values: dict[Path, Any] = {}
+        for value, rows in slices.items():
+            path = Path(output_dir) / name.format(by=by, value=safe_name(value))
+            if path in values:
+                raise ValueError(
+                    f"Nombre inválido: '{name}'. '{value}' y '{values[path]}' generan la ruta {path}"
+                )
+            values[path] = value
+            fields = dict(by=by, value=value, rows=rows.stop - rows.start)
+            specs[value] = ReportSpec(
+                path, title=title.format(**fields), template=compiled,
+                include_table=include_table, rows=rows,
+            )
+
+        def summarize(spec: ReportSpec, compiled: CompiledTemplate) -> str:
+            value = values[Path(spec.output_path)]
+            if callable(summary):
+                return summary(value, renderer.df.iloc[spec.rows])
+            return summary.format(by=by, value=value, rows=spec.rows.stop - spec.rows.start)
+
+        Path(output_dir).mkdir(parents=True, exist_ok=True)
+        results = ReportBatch(renderer, summarize, workers).run(list(specs.values()))
+        return dict(zip(specs, results))
+
+    def close(self) -> None:
+        """Detiene el pool de gráficas y limpia los temporales."""
+        if self._chart_pool is not None:
+            self._chart_pool.close()
+            self._chart_pool = None
+        self._chart_manager.cleanup()
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    @property
+    def execution_mode(self) -> str:
+        return self._execution_mode
+
+    @property
+    def last_sql(self) -> Optional[str]:
+        """Último SQL ejecutado en modo 'sql'."""
+        return self._sql.last_sql if self._sql is not None else None
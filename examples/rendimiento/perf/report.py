@@ -0,0 +1,731 @@
+"""
+ReportGenerator con renderizado de gráficas optimizado.
+
+`PerfReportGenerator` conserva la API de `ReportGenerator` y reemplaza
+solo la etapa de gráficas: todas las series se agregan primero y las
+imágenes se renderizan juntas, en un pool de procesos si se configura.
+Las imágenes pasan a ReportLab en memoria, sin archivos temporales, y se
+renderizan con los píxeles que necesita su tamaño en la página. Con el
+backend 'vector', las barras y los pasteles se dibujan con ReportLab.
+Las tablas se formatean por columnas y las grandes, página por página
+(`StreamingTable`). Estilos, fuentes e imágenes de la plantilla salen de
+una `CompiledTemplate` que se puede compartir entre reportes. Con una
+`SectionCache`, las secciones que no cambiaron entre dos generaciones
+se reutilizan ya armadas. El PDF se escribe en una ruta o en un flujo
+binario (`io.BytesIO`, una respuesta HTTP). `build_stream()` arma
+documentos de miles de páginas desde un generador de flowables, con
+memoria acotada.
+"""
+import io
+import logging
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Iterable, Optional, Union
+
+import pandas as pd
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.platypus import BaseDocTemplate, Flowable, Frame, Image, PageBreak, PageTemplate, Paragraph, Spacer, Table, TableStyle
+
+from qry_doc import ReportTemplate, ReportError, SectionConfig, SectionType, ValidationError
+from qry_doc.report_generator import ReportGenerator
+from qry_doc.validators import OutputValidator
+
+from perf.aggregation import SharedAggregates, aggregation_key
+from perf.chart_cache import ChartCache, chart_key
+from perf.chart_types import spec_for_chart
+from perf.charts import MAX_CHART_HEIGHT, ChartRenderPool, ChartSpec, fit_to_frame, render_chart, resolve_dpi
+from perf.output import PdfOutput, is_stream
+from perf.sections import SectionCache, frame_fingerprint, section_key, template_fingerprint
+from perf.streaming_doc import FLUSH_PAGES, StreamingDocTemplate
+from perf.tables import StreamingTable, build_table, sample_widths, table_style
+from perf.templates import CompiledTemplate, compile_template
+from perf.vector_charts import VECTOR_CHART_TYPES, draw_chart
+
+if TYPE_CHECKING:
+    from qry_doc import ChartConfig
+
+logger = logging.getLogger(__name__)
+
+# Gráfica ya lista: bytes PNG en memoria, ruta a un archivo o dibujo vectorial
+ChartImage = Union[bytes, Path, Drawing]
+
+# 'raster' = PNG con matplotlib; 'vector' = Drawing de ReportLab cuando el tipo lo permite
+CHART_BACKENDS = ("raster", "vector")
+
+
+class PerfReportGenerator(ReportGenerator):
+    """
+    ReportGenerator que renderiza las gráficas de un reporte en lote.
+
+    Las imágenes que ya están en la caché no se vuelven a renderizar; el
+    resto se renderiza en el pool de procesos o en el proceso actual.
+
+    Example:
+        ```python
+        with ChartRenderPool(workers=4) as pool:
+            generator = PerfReportGenerator("reporte.pdf", template, chart_pool=pool)
+            generator.build_with_charts("Ventas", resumen, charts, df.head(20), chart_data=df)
+        ```
+    """
+
+    def __init__(
+        self,
+        output_path: PdfOutput,
+        template: Optional[Union[ReportTemplate, CompiledTemplate]] = None,
+        chart_pool: Optional[ChartRenderPool] = None,
+        chart_cache: Optional[ChartCache] = None,
+        chart_backend: str = "raster",
+        chart_dpi: Union[str, int] = "print",
+        chart_max_height: float = MAX_CHART_HEIGHT,
+        table_stream_rows: int = 1000,
+        column_formats: Optional[dict[str, str]] = None,
+        section_cache: Optional[SectionCache] = None,
+    ) -> None:
+        """
+        Inicializa el generador.
+
+        Args:
+            output_path: Ruta del PDF, o flujo binario con `write()` donde
+                escribirlo (no se cierra).
+            template: Plantilla opcional, o una `CompiledTemplate` para
+                compartir estilos, fuentes e imágenes entre reportes.
+            chart_pool: Pool de procesos para las gráficas. None = en el
+                proceso actual, una tras otra.
+            chart_cache: Caché de imágenes por contenido. None = sin caché.
+            chart_backend: 'raster' (PNG) o 'vector' para dibujar las
+                gráficas de barras y de pastel con ReportLab; los demás
+                tipos siguen como PNG.
+            chart_dpi: Resolución impresa de las gráficas PNG: perfil
+                ('draft', 'screen', 'print') o valor en DPI.
+            chart_max_height: Alto máximo de cada gráfica en puntos.
+            table_stream_rows: Las tablas con más filas se dibujan con
+                `StreamingTable`: celdas de una línea, formateadas página
+                por página.
+            column_formats: Formato de las celdas por nombre de columna:
+                'number', 'integer', 'currency', 'percent', 'date',
+                'datetime' o un formato propio ("{:,.3f}", "%d/%m/%Y").
+            section_cache: Caché de secciones ya armadas (resumen, cada
+                gráfica, tabla y secciones propias). None = sin caché.
+        """
+        if chart_backend not in CHART_BACKENDS:
+            raise ValueError(
+                f"chart_backend inválido: '{chart_backend}'. Use: {', '.join(CHART_BACKENDS)}"
+            )
+        # Antes de super().__init__, que llama a _create_styles
+        self.compiled = compile_template(template)
+        stream = output_path if is_stream(output_path) else None
+        super().__init__(output_path="reporte.pdf" if stream is not None else output_path,
+                         template=self.compiled.template)
+        self.output_stream: Optional[BinaryIO] = stream
+        if stream is not None:
+            self.output_path = None
+        self.chart_backend = chart_backend
+        self.chart_dpi = resolve_dpi(chart_dpi)
+        self.chart_max_height = chart_max_height
+        self.table_stream_rows = table_stream_rows
+        self.column_formats = dict(column_formats or {})
+        self._chart_pool = chart_pool
+        self._chart_cache = chart_cache
+        self._section_cache = section_cache
+        self._template_key: Optional[str] = None
+        # Números de página como formularios, para unir el PDF con otros (build_in_chunks)
+        self._page_number_forms = False
+
+    def build_with_charts(
+        self,
+        title: str,
+        summary: str,
+        charts: list["ChartConfig"],
+        dataframe: pd.DataFrame,
+        temp_dir: Optional[Path] = None,
+        chart_data: Optional[pd.DataFrame] = None,
+        aggregates: Optional[SharedAggregates] = None,
+    ) -> None:
+        """
+        Igual que `ReportGenerator.build_with_charts`, sin archivos temporales.
+
+        Args:
+            title: Título del reporte.
+            summary: Resumen ejecutivo.
+            charts: Gráficas a incluir.
+            dataframe: Datos de la tabla (y de las gráficas si no se
+                indica `chart_data`).
+            temp_dir: Directorio opcional donde guardar también los PNG
+                (las gráficas vectoriales no se guardan). None = las
+                imágenes solo existen en memoria.
+            chart_data: Datos para las gráficas cuando difieren de la tabla
+                (p. ej. todos los datos para las gráficas y 20 filas para
+                la tabla).
+            aggregates: Agregaciones ya calculadas sobre los datos de las
+                gráficas, para reutilizarlas entre reportes. None = se
+                calculan para este reporte.
+
+        Raises:
+            ReportError: Si falla la generación del reporte.
+            ValidationError: Si la configuración es inválida.
+        """
+        try:
+            self.story = []
+            self._header_footer_call_count = 0
+            self._cover_image_path = None
+            self._is_cover_page = False
+
+            if self.template.cover_image_path is not None:
+                self._add_cover_page(self.template.cover_image_path)
+
+            self._render_section(SectionConfig(SectionType.SUMMARY), title, summary, None, None, None)
+
+            if charts:
+                self._add_chart_sections(
+                    charts, chart_data if chart_data is not None else dataframe, temp_dir, aggregates
+                )
+
+            if dataframe is not None and not dataframe.empty:
+                self.story.append(PageBreak())
+                self._render_section(SectionConfig(SectionType.DATA), title, summary, None, dataframe, None)
+
+            self._build_document()
+
+        except ValidationError:
+            raise
+        except Exception as e:
+            sanitized = OutputValidator.sanitize_error_message(e)
+            raise ReportError(
+                user_message=f"Error al generar el reporte: {sanitized}",
+                internal_error=e
+            )
+
+    def build_in_chunks(
+        self,
+        title: str,
+        summary: str,
+        charts: Optional[list["ChartConfig"]] = None,
+        dataframe: Optional[pd.DataFrame] = None,
+        custom_sections: Optional[dict[str, str]] = None,
+        chart_data: Optional[pd.DataFrame] = None,
+        workers: Optional[int] = None,
+        chunks: Optional[int] = None,
+        chunk_rows: int = 20_000,
+    ) -> None:
+        """
+        Arma el reporte por partes en procesos paralelos y las une en un PDF.
+
+        Sigue las secciones de la plantilla como `build_with_sections_and_charts`;
+        cada gráfica y la tabla empiezan en una página nueva, como en
+        `build_with_charts`. Las partes se reparten por costo (gráficas y
+        filas de la tabla), se arman en un pool de procesos y se unen sin
+        volver a renderizarlas, con los números de página corregidos y un
+        marcador por sección en el índice del PDF.
+
+        Args:
+            title: Título del reporte.
+            summary: Resumen ejecutivo.
+            charts: Gráficas a incluir.
+            dataframe: Datos de la tabla (y de las gráficas si no se
+                indica `chart_data`).
+            custom_sections: Contenido de las secciones propias por nombre.
+            chart_data: Datos para las gráficas cuando difieren de la tabla.
+            workers: Procesos. None = número de CPUs; 0 = las partes se
+                arman en el proceso actual.
+            chunks: Partes en que se divide el reporte. None = una por
+                proceso.
+            chunk_rows: Filas de la tabla por parte como máximo
+                (redondeado a páginas completas).
+
+        Raises:
+            ReportError: Si falla la generación del reporte.
+            ValidationError: Si la configuración es inválida.
+        """
+        from perf.chunks import build_in_chunks  # perf.chunks importa este módulo
+
+        try:
+            self._header_footer_call_count = 0
+            pdf = build_in_chunks(self, title, summary, charts, dataframe, custom_sections,
+                                  chart_data, workers, chunks, chunk_rows)
+            if self.output_stream is not None:
+                self.output_stream.write(pdf)
+            else:
+                self.output_path.parent.mkdir(parents=True, exist_ok=True)
+                self.output_path.write_bytes(pdf)
+
+        except (ValidationError, ValueError):
+            raise
+        except Exception as e:
+            sanitized = OutputValidator.sanitize_error_message(e)
+            raise ReportError(
+                user_message=f"Error al generar el reporte: {sanitized}",
+                internal_error=e
+            )
+
+    def build_stream(
+        self,
+        flowables: Iterable[Flowable],
+        flush_pages: int = FLUSH_PAGES,
+        cover: bool = True,
+    ) -> None:
+        """
+        Arma el documento desde un iterador de flowables, con memoria acotada.
+
+        Los flowables se piden al iterador (p. ej. un generador) a medida
+        que se dibujan y cada `flush_pages` páginas se escriben en el
+        destino (ver `StreamingDocTemplate`): un documento de miles de
+        páginas no se arma completo en memoria. Usa los estilos de
+        `self.styles`, el encabezado y el pie de la plantilla;
+        `table_flowables()` y `chart_flowables()` dan las tablas y las
+        gráficas como en los demás reportes.
+
+        Args:
+            flowables: Flowables del documento, en orden.
+            flush_pages: Páginas que se guardan en memoria antes de
+                escribirlas en el destino.
+            cover: Agregar la portada de la plantilla, si tiene.
+
+        Raises:
+            ReportError: Si falla la generación del reporte.
+            ValidationError: Si la configuración es inválida.
+            ValueError: Si `flush_pages` no es positivo.
+        """
+        try:
+            self._header_footer_call_count = 0
+            self._cover_image_path = None
+            self._is_cover_page = False
+            self.story = []
+            if cover and self.template.cover_image_path is not None:
+                self._add_cover_page(self.template.cover_image_path)
+            story = chain(self.story, flowables)
+            self.story = []
+
+            doc = StreamingDocTemplate(
+                self.output_stream if self.output_stream is not None else self.output_path,
+                flush_pages=flush_pages,
+                **self._doc_options(),
+            )
+            doc.addPageTemplates([self._page_template()])
+            doc.build(story)
+
+        except (ValidationError, ValueError):
+            raise
+        except Exception as e:
+            sanitized = OutputValidator.sanitize_error_message(e)
+            raise ReportError(
+                user_message=f"Error al generar el reporte: {sanitized}",
+                internal_error=e
+            )
+
+    def table_flowables(self, df: pd.DataFrame) -> list[Flowable]:
+        """
+        Flowables de una tabla de datos, como la agrega `build_with_charts`.
+
+        Las de más de `table_stream_rows` filas son una `StreamingTable`,
+        que se formatea página por página.
+        """
+        return self._collect(self._add_table, df)
+
+    def chart_flowables(self, chart: ChartImage) -> list[Flowable]:
+        """
+        Flowables de una gráfica: PNG en bytes, dibujo vectorial o ruta.
+
+        Retorna una lista vacía si la imagen no se puede insertar.
+        """
+        return self._collect(self._add_chart, chart)
+
+    def _collect(self, add: Callable[..., Any], *args: Any) -> list[Flowable]:
+        """Flowables que `add` agrega a la historia, sin tocar `self.story`."""
+        story = self.story
+        self.story = []
+        try:
+            add(*args)
+            return self.story
+        finally:
+            self.story = story
+
+    def _cached_section(self, parts: Optional[tuple], add: Callable[[], Any]) -> list[Flowable]:
+        """
+        Agrega una sección a la historia, desde la caché si ya se armó.
+
+        Args:
+            parts: Todo lo que define la sección (sin la plantilla). None =
+                la sección no se puede guardar en la caché.
+            add: Agrega la sección a `self.story`.
+
+        Returns:
+            Las flowables de la sección.
+        """
+        if self._section_cache is None or parts is None:
+            start = len(self.story)
+            add()
+            return self.story[start:]
+        key = self._section_key(parts)
+        flowables = self._section_cache.get(key)
+        if flowables is None:
+            start = len(self.story)
+            add()
+            flowables = self.story[start:]
+            self._section_cache.put(key, flowables)
+        else:
+            self.story.extend(flowables)
+        return list(flowables)
+
+    def _section_key(self, parts: tuple) -> str:
+        if self._template_key is None:
+            self._template_key = template_fingerprint(self.compiled)
+        return section_key(self._template_key, *parts)
+
+    def _section_parts(self, section: SectionConfig, title: str, summary: str, dataframe: Any) -> Optional[tuple]:
+        """Lo que define una sección de `_render_section`, o None si no se guarda."""
+        section_type = section.section_type
+        if section_type == SectionType.SUMMARY:
+            return (section_type.name, title, summary)
+        if section_type == SectionType.CUSTOM:
+            return (section_type.name, section.custom_content)
+        if section_type == SectionType.DATA and dataframe is not None:
+            try:
+                fingerprint = frame_fingerprint(dataframe)
+            except TypeError:
+                return None  # Celdas que pandas no sabe hashear
+            return (section_type.name, fingerprint, sorted(self.column_formats.items()),
+                    self.table_stream_rows)
+        return None  # Portada y gráficas por ruta: no vale la pena guardarlas
+
+    def _render_section(
+        self,
+        section: SectionConfig,
+        title: str,
+        summary: str,
+        chart_path: Optional[Path],
+        dataframe: Optional[pd.DataFrame],
+        custom_sections: Optional[dict[str, str]],
+    ) -> bool:
+        """Igual que `ReportGenerator._render_section`, con las secciones en la caché."""
+        render = partial(super()._render_section, section, title, summary, chart_path,
+                         dataframe, custom_sections)
+        if self._section_cache is None:
+            return render()
+        return bool(self._cached_section(self._section_parts(section, title, summary, dataframe), render))
+
+    def _add_chart_sections(
+        self,
+        charts: list["ChartConfig"],
+        df: pd.DataFrame,
+        temp_dir: Optional[Path] = None,
+        aggregates: Optional[SharedAggregates] = None,
+    ) -> None:
+        """
+        Agrega las gráficas con un salto de página entre ellas.
+
+        Con caché de secciones, cada gráfica tiene su clave (configuración
+        y huella de las columnas que usa) y solo se agregan y renderizan
+        las que no están guardadas. Con `temp_dir` se renderizan todas,
+        para guardar sus PNG.
+        """
+        keys: list[Optional[str]] = [None] * len(charts)
+        if self._section_cache is not None and temp_dir is None:
+            fingerprints: dict[str, str] = {}  # Cada columna se recorre una vez
+            for i, chart_config in enumerate(charts):
+                columns = [value for value in vars(chart_config).values()
+                           if isinstance(value, str) and value in df.columns]
+                try:
+                    fingerprint = frame_fingerprint(df[list(dict.fromkeys(columns))], fingerprints)
+                except TypeError:
+                    continue
+                keys[i] = self._section_key(("CHART", repr(chart_config), fingerprint,
+                                             self.chart_backend, self.chart_dpi, self.chart_max_height))
+
+        cached = {i: self._section_cache.get(key) for i, key in enumerate(keys) if key is not None}
+        missing = [i for i in range(len(charts)) if cached.get(i) is None]
+        results = self._chart_results([charts[i] for i in missing], df, temp_dir, aggregates)
+        images = {missing[j]: image for j, image in results.items()}
+
+        added = 0
+        for i, key in enumerate(keys):
+            flowables = cached.get(i)
+            if flowables is None and i not in images:
+                continue  # La gráfica falló
+            if added:
+                self.story.append(PageBreak())
+            if flowables is not None:
+                self.story.extend(flowables)
+            else:
+                start = len(self.story)
+                self._add_chart(images[i])
+                if key is not None and len(self.story) > start:
+                    self._section_cache.put(key, self.story[start:])
+            added += 1
+
+    def _add_chart(self, chart: ChartImage) -> None:
+        """Agrega una gráfica desde bytes en memoria, un dibujo o un archivo."""
+        if isinstance(chart, Drawing):
+            self.story.append(Paragraph("Visualización", self.styles['Heading']))
+            self.story.append(chart)
+            self.story.append(Spacer(1, 15))
+            return
+        if not isinstance(chart, (bytes, bytearray)):
+            super()._add_chart(chart)
+            return
+
+        try:
+            img = Image(io.BytesIO(chart))
+            # Las imágenes se renderizan para este espacio: siempre lo ocupan completo
+            scale = min(self.template.content_width / img.imageWidth,
+                        self.chart_max_height / img.imageHeight)
+            img.drawWidth = img.imageWidth * scale
+            img.drawHeight = img.imageHeight * scale
+
+            self.story.append(Paragraph("Visualización", self.styles['Heading']))
+            self.story.append(img)
+            self.story.append(Spacer(1, 15))
+        except Exception as e:
+            logger.warning(f"Failed to embed chart: {e}")
+
+    def _add_table(self, df: pd.DataFrame) -> None:
+        """Agrega una tabla; las de más de `table_stream_rows` filas, paginadas."""
+        if len(df) <= self.table_stream_rows:
+            super()._add_table(df)
+            return
+        is_valid, _ = OutputValidator.validate_dataframe(df)
+        if not is_valid:
+            return
+
+        self.story.append(Paragraph("Datos", self.styles['Heading']))
+        self.story.append(self._streaming_table(df, *self._table_layout(df)))
+        self.story.append(Spacer(1, 15))
+
+    def _table_layout(self, df: pd.DataFrame) -> tuple[list[float], int]:
+        """Ancho de cada columna y tamaño de letra de una `StreamingTable`."""
+        col_widths = sample_widths(df, self.template.content_width, self.MIN_COL_WIDTH,
+                                   self.MAX_CELL_CHARS, self.column_formats)
+        return col_widths, self._determine_font_size(col_widths, self.template.content_width)
+
+    def _streaming_table(
+        self,
+        df: pd.DataFrame,
+        col_widths: list[float],
+        font_size: int,
+        first_row: int = 0,
+    ) -> StreamingTable:
+        """
+        `StreamingTable` de los datos.
+
+        Args:
+            first_row: Posición de la primera fila de `df` en la tabla
+                completa, para seguir los colores alternos de otra parte.
+        """
+        styles = (self._table_style(font_size), self._table_style(font_size, odd_start=True))
+        if first_row % 2:
+            styles = styles[::-1]
+        return StreamingTable(df, col_widths, styles, max_chars=self.MAX_CELL_CHARS,
+                              formats=self.column_formats)
+
+    def _create_styles(self) -> dict[str, ParagraphStyle]:
+        """Estilos de la plantilla compilada, sin volver a registrar fuentes."""
+        self._title_font = self.compiled.title_font
+        self._body_font = self.compiled.body_font
+        return dict(self.compiled.styles)
+
+    def _draw_cover_on_canvas(self, canvas: Any) -> None:
+        """Dibuja la portada con el tamaño calculado al compilar la plantilla."""
+        cover = self.compiled.cover
+        if cover is not None and self._cover_image_path == cover.source:
+            self.compiled.draw_cover(canvas)
+        else:
+            super()._draw_cover_on_canvas(canvas)
+
+    def _build_document(self) -> None:
+        """Igual que `ReportGenerator._build_document`, con la plantilla compilada."""
+        if self.output_stream is None:
+            self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        doc = BaseDocTemplate(
+            self.output_stream if self.output_stream is not None else str(self.output_path),
+            **self._doc_options(),
+        )
+        doc.addPageTemplates([self._page_template()])
+        doc.build(self.story)
+
+    def _doc_options(self) -> dict[str, Any]:
+        """Tamaño de página y márgenes del documento según la plantilla."""
+        template = self.template
+        return dict(
+            pagesize=template.page_size,
+            leftMargin=template.margin_left,
+            rightMargin=template.margin_right,
+            topMargin=template.margin_top + template.header_height,
+            bottomMargin=template.margin_bottom + template.footer_height,
+        )
+
+    def _page_template(self) -> PageTemplate:
+        """Plantilla de página: portada, o encabezado y pie de la plantilla."""
+
+        def on_page(canvas, doc):
+            self._header_footer_call_count += 1
+            if doc.page == 1 and self._is_cover_page:
+                self._draw_cover_on_canvas(canvas)
+                return
+            self.compiled.draw_header(canvas, doc)
+            self.compiled.draw_footer(canvas, doc, page_number_forms=self._page_number_forms)
+
+        return PageTemplate(id='main', frames=[self._content_frame()], onPage=on_page)
+
+    def _content_frame(self) -> Frame:
+        """Marco del contenido de cada página."""
+        template = self.template
+        return Frame(
+            template.margin_left,
+            template.margin_bottom + template.footer_height,
+            template.content_width,
+            template.content_height,
+            id='normal',
+            leftPadding=0,
+            rightPadding=0,
+            topPadding=0,
+            bottomPadding=0,
+        )
+
+    def _auto_adjust_table(self, df: pd.DataFrame) -> Table:
+        """
+        Igual que `ReportGenerator._auto_adjust_table`, formateando por columnas.
+
+        Todas las celdas son texto simple (los textos largos se parten en
+        líneas sin `Paragraph`), los altos de fila se calculan sin medir
+        cada celda y el `TableStyle` se comparte entre tablas.
+        """
+        return build_table(
+            df,
+            self.template.content_width,
+            style_for=self._table_style,
+            min_width=self.MIN_COL_WIDTH,
+            max_chars=self.MAX_CELL_CHARS,
+            font_name=self._body_font,
+            formats=self.column_formats,
+            font_size_for=lambda widths: self._determine_font_size(widths, self.template.content_width),
+        )
+
+    def _table_style(self, font_size: int, odd_start: bool = False) -> TableStyle:
+        """Estilo de tabla de ReportGenerator para esta plantilla (compartido)."""
+        return table_style(self.template.primary_color, self._title_font, self._body_font,
+                           font_size, odd_start)
+
+    def fit_chart(self, spec: ChartSpec) -> ChartSpec:
+        """Ajusta el DPI de una gráfica al espacio que ocupa en este reporte."""
+        return fit_to_frame(spec, self.template.content_width, self.chart_max_height, self.chart_dpi)
+
+    def _prepare_specs(
+        self,
+        charts: list["ChartConfig"],
+        df: pd.DataFrame,
+        aggregates: Optional[SharedAggregates] = None,
+    ) -> list[tuple[int, ChartSpec]]:
+        """
+        Agrega la serie de cada gráfica; las que fallan se omiten.
+
+        Todas las agregaciones se planifican juntas: las repetidas se
+        calculan una vez y cada columna de agrupación se recorre una vez.
+        """
+        if aggregates is None:
+            aggregates = SharedAggregates(df)
+        keys = {key for key in map(aggregation_key, charts) if key is not None}
+        aggregates.plan(
+            (group_by, value_column, agg) for group_by, value_column, agg in keys
+            if group_by in df.columns and value_column in df.columns
+        )
+        try:
+            aggregates.compute()
+        except Exception as e:
+            # Cada gráfica vuelve a intentar su agregación y registra su error
+            logger.warning(f"Shared chart aggregation failed: {e}")
+
+        specs = []
+        for i, chart_config in enumerate(charts):
+            try:
+                specs.append((i, spec_for_chart(df, chart_config, aggregates)))
+            except Exception as e:
+                logger.warning(f"Failed to prepare chart {i + 1} ({chart_config.title}): {e}")
+        return specs
+
+    def _render_images(self, specs: list[ChartSpec]) -> list[Union[bytes, Exception]]:
+        """Toma de la caché las imágenes conocidas y renderiza solo las nuevas."""
+        images: list[Union[bytes, Exception, None]]
+        if self._chart_cache is not None:
+            keys = [chart_key(spec) for spec in specs]
+            images = [self._chart_cache.get(key) for key in keys]
+        else:
+            keys, images = [], [None] * len(specs)
+
+        missing = [i for i, image in enumerate(images) if image is None]
+        if self._chart_pool is not None:
+            rendered = self._chart_pool.render_many([specs[i] for i in missing])
+        else:
+            rendered = []
+            for i in missing:
+                try:
+                    rendered.append(render_chart(specs[i]))
+                except Exception as e:
+                    rendered.append(e)
+
+        for i, image in zip(missing, rendered):
+            images[i] = image
+            if keys and not isinstance(image, Exception):
+                self._chart_cache.put(keys[i], image)
+        return images
+
+    def _render_charts(
+        self,
+        charts: list["ChartConfig"],
+        df: pd.DataFrame,
+        temp_dir: Optional[Path] = None,
+        aggregates: Optional[SharedAggregates] = None,
+    ) -> list[ChartImage]:
+        """
+        Renderiza todas las gráficas juntas.
+
+        Con el backend 'vector', las barras y los pasteles se dibujan con
+        ReportLab y solo el resto pasa por el renderizado PNG.
+
+        Returns:
+            Las gráficas en el orden de `charts` (sin las que fallaron):
+            PNG en memoria o `Drawing`. Si se indica `temp_dir`, los PNG
+            también se guardan ahí.
+        """
+        return list(self._chart_results(charts, df, temp_dir, aggregates).values())
+
+    def _chart_results(
+        self,
+        charts: list["ChartConfig"],
+        df: pd.DataFrame,
+        temp_dir: Optional[Path] = None,
+        aggregates: Optional[SharedAggregates] = None,
+    ) -> dict[int, ChartImage]:
+        """Como `_render_charts`, con el índice en `charts` de cada gráfica."""
+        return self._chart_images(self._prepare_specs(charts, df, aggregates), temp_dir)
+
+    def _chart_images(
+        self,
+        indexed_specs: list[tuple[int, ChartSpec]],
+        temp_dir: Optional[Path] = None,
+    ) -> dict[int, ChartImage]:
+        """Renderiza series ya agregadas (de `_prepare_specs`); las que fallan se omiten."""
+        results: dict[int, Union[ChartImage, Exception]] = {}
+
+        raster = []
+        for i, spec in indexed_specs:
+            if self.chart_backend == "vector" and spec.chart_type in VECTOR_CHART_TYPES:
+                try:
+                    results[i] = draw_chart(spec, self.template.content_width, self.chart_max_height)
+                except Exception as e:
+                    results[i] = e
+            else:
+                raster.append((i, self.fit_chart(spec)))
+        images = self._render_images([spec for _, spec in raster])
+        results.update((i, image) for (i, _), image in zip(raster, images))
+
+        chart_images: dict[int, ChartImage] = {}
+        for i, spec in indexed_specs:
+            image = results[i]
+            if isinstance(image, Exception):
+                logger.warning(f"Failed to generate chart {i + 1} ({spec.title}): {image}")
+                continue
+            if temp_dir is not None and isinstance(image, bytes):
+                (temp_dir / f"chart_{i}_{spec.chart_type}.png").write_bytes(image)
+            chart_images[i] = image
+        return chart_images
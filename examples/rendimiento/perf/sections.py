@@ -0,0 +1,126 @@
+"""
+Caché de las secciones ya armadas de un reporte.
+
+Al regenerar un reporte en el que solo cambió el resumen o una gráfica,
+`ReportGenerator` vuelve a armar todas las secciones: agrega y renderiza
+cada gráfica y formatea cada celda de cada tabla. `SectionCache` guarda
+las flowables de cada sección con una clave que resume todo lo que la
+define: el tipo de sección y su configuración, la plantilla y una huella
+de los datos que usa. En la siguiente generación, las secciones sin
+cambios se toman de la caché y solo se vuelve a paginar el documento.
+
+ReportLab no modifica las flowables al paginarlas (las tablas y párrafos
+que no caben en una página se parten en flowables nuevas), así que el
+PDF es el mismo que sin caché.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+import pandas as pd
+from reportlab.platypus import Flowable
+
+from perf.templates import CompiledTemplate
+
+# Se incrementa cuando cambia cómo se arma una sección, para invalidar claves viejas
+SECTION_VERSION = 1
+
+
+def column_fingerprint(column: pd.Series) -> str:
+    """Hash SHA-256 del nombre, el tipo y los valores de una columna (sin el índice)."""
+    digest = hashlib.sha256(repr((column.name, str(column.dtype))).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(column, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def frame_fingerprint(df: pd.DataFrame, columns: Optional[dict[str, str]] = None) -> str:
+    """
+    Hash SHA-256 de los valores, el índice, las columnas y los tipos de un DataFrame.
+
+    Args:
+        df: Datos.
+        columns: Huellas de columnas ya calculadas; se completa con las
+            nuevas para reutilizarlas en otras huellas de los mismos datos.
+    """
+    columns = columns if columns is not None else {}
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df.index).to_numpy().tobytes())
+    for name in df.columns:
+        if name not in columns:
+            columns[name] = column_fingerprint(df[name])
+        digest.update(columns[name].encode("utf-8"))
+    return digest.hexdigest()
+
+
+def template_fingerprint(compiled: CompiledTemplate) -> str:
+    """Hash SHA-256 de la plantilla y de cómo se compilaron sus imágenes."""
+    header = (compiled.template, compiled.image_dpi, str(compiled.image_dir))
+    return hashlib.sha256(repr(header).encode("utf-8")).hexdigest()
+
+
+def section_key(*parts: Any) -> str:
+    """Clave de una sección a partir de su tipo, configuración y huellas."""
+    return hashlib.sha256(repr((SECTION_VERSION,) + parts).encode("utf-8")).hexdigest()
+
+
+class SectionCache:
+    """
+    Caché LRU de las flowables de cada sección de un reporte.
+
+    Features:
+    - Claves por contenido (`section_key`): la misma sección en otra
+      generación del reporte, o en otro reporte, se reutiliza
+    - Cantidad de secciones acotada por `max_sections` con desalojo LRU
+    - La estructura es segura entre hilos, pero las flowables no: dos
+      documentos que se paginan a la vez no deben compartir una caché
+
+    Example:
+        ```python
+        cache = SectionCache()
+        PerfReportGenerator("ventas.pdf", compiled, section_cache=cache).build_with_charts(...)
+        # Solo cambió el resumen: gráficas y tabla salen de la caché
+        PerfReportGenerator("ventas.pdf", compiled, section_cache=cache).build_with_charts(...)
+        ```
+    """
+
+    def __init__(self, max_sections: int = 256) -> None:
+        """
+        Inicializa la caché.
+
+        Args:
+            max_sections: Secciones máximas guardadas.
+        """
+        self.max_sections = max_sections
+        self._entries: OrderedDict[str, tuple[Flowable, ...]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[tuple[Flowable, ...]]:
+        """Flowables de una sección, o None si no está en la caché."""
+        with self._lock:
+            flowables = self._entries.get(key)
+            if flowables is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return flowables
+
+    def put(self, key: str, flowables: list[Flowable]) -> None:
+        """Guarda las flowables de una sección."""
+        with self._lock:
+            self._entries[key] = tuple(flowables)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_sections:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
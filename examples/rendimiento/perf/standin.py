@@ -0,0 +1,112 @@
+"""
+LLM locales de reemplazo (stand-in) para pruebas de rendimiento.
+
+Permiten ejecutar los ejemplos de rendimiento sin API keys ni red,
+inyectando latencia y fallos controlados para simular proveedores reales.
+"""
+import random
+import re
+import threading
+import time
+from typing import Any, Callable, Optional, Union
+
+from pandasai.llm.base import LLM
+
+
+# Nombre de la tabla que PandasAI incluye en el prompt
+TABLE_NAME_RE = re.compile(r'table_name="([^"]+)"')
+
+
+class StandInLLM(LLM):
+    """
+    LLM local que responde código PandasAI válido con latencia inyectada.
+
+    La latencia sigue una distribución log-normal alrededor de `latency`,
+    con picos ocasionales (`spike_rate`) para reproducir la cola larga
+    de los proveedores remotos.
+
+    Example:
+        ```python
+        llm = StandInLLM("lento", latency=0.4, spike_rate=0.1)
+        qry = QryDoc("examples/data/ventas.csv", llm=llm)
+        print(qry.ask("¿Cuántas ventas hay?"))
+        ```
+    """
+
+    def __init__(
+        self,
+        name: str,
+        latency: float = 0.2,
+        jitter: float = 0.3,
+        spike_rate: float = 0.0,
+        spike_latency: float = 2.0,
+        failure_rate: float = 0.0,
+        answer: Optional[Union[str, Callable[[str], str]]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        """
+        Inicializa el LLM de reemplazo.
+
+        Args:
+            name: Nombre del proveedor mostrado en las estadísticas.
+            latency: Latencia mediana en segundos.
+            jitter: Sigma log-normal aplicada a la latencia.
+            spike_rate: Probabilidad de un pico de latencia por llamada.
+            spike_latency: Latencia de un pico en segundos.
+            failure_rate: Probabilidad de lanzar ConnectionError por llamada.
+            answer: Respuesta fija o función que recibe el texto del prompt.
+            seed: Semilla opcional para ejecuciones reproducibles.
+        """
+        super().__init__()
+        self.name = name
+        self.latency = latency
+        self.jitter = jitter
+        self.spike_rate = spike_rate
+        self.spike_latency = spike_latency
+        self.failure_rate = failure_rate
+        self._answer = answer
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _sample_latency(self) -> float:
+        """Muestrea la latencia de una llamada."""
+        with self._lock:
+            self.calls += 1
+            if self._random.random() < self.spike_rate:
+                return self.spike_latency
+            return self.latency * self._random.lognormvariate(0.0, self.jitter)
+
+    def _should_fail(self) -> bool:
+        """Decide si esta llamada falla."""
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def call(self, instruction: Any, context: Any = None) -> str:
+        """Responde el prompt tras esperar la latencia inyectada."""
+        prompt = instruction.to_string() if hasattr(instruction, "to_string") else str(instruction)
+        self.last_prompt = prompt
+
+        time.sleep(self._sample_latency())
+        if self._should_fail():
+            raise ConnectionError(f"{self.name}: conexión rechazada")
+
+        if callable(self._answer):
+            return self._answer(prompt)
+        if self._answer is not None:
+            return self._answer
+        return self.default_answer(prompt)
+
+    @staticmethod
+    def default_answer(prompt: str) -> str:
+        """Retorna código PandasAI que cuenta las filas de la tabla del prompt."""
+        match = TABLE_NAME_RE.search(prompt)
+        table = match.group(1) if match else "df"
+        return (
+            f'df = execute_sql_query("SELECT COUNT(*) AS total FROM {table}")\n'
+            'result = {"type": "number", "value": int(df.iloc[0, 0])}'
+        )
+
+    @property
+    def type(self) -> str:
+        return f"standin-{self.name}"
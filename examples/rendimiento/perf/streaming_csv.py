@@ -0,0 +1,262 @@
+"""
+Exportación a CSV por bloques para extracciones grandes.
+
+`QryDoc.extract_to_csv` materializa el DataFrame completo del resultado
+antes de escribirlo. Para extracciones de filas ("todas las filas donde
+cantidad > 2") el LLM solo necesita describir el filtro: `RowFilter` lo
+valida y `StreamingExtractor` lo aplica bloque a bloque, escribiendo cada
+bloque al CSV en cuanto está listo. La memoria extra es la de un bloque.
+"""
+import ast
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional, Union
+
+import pandas as pd
+
+from qry_doc import ExportError, ValidationError
+from qry_doc.csv_exporter import CSVExporter
+
+from perf.text_to_sql import _TextPrompt
+
+
+# Nodos permitidos en una expresión de filtro: comparaciones, lógica y aritmética
+_ALLOWED_NODES = (
+    ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.UnaryOp, ast.Not, ast.USub, ast.UAdd,
+    ast.Compare, ast.Eq, ast.NotEq, ast.Lt, ast.LtE, ast.Gt, ast.GtE, ast.In, ast.NotIn,
+    ast.BinOp, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Mod, ast.BitAnd, ast.BitOr, ast.Invert,
+    ast.Name, ast.Load, ast.Constant, ast.List, ast.Tuple,
+)
+_BACKTICK_RE = re.compile(r"`([^`]+)`")
+_JSON_BLOCK_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+
+
+class RowFilter:
+    """
+    Filtro de filas y columnas que se aplica bloque a bloque.
+
+    La expresión usa la sintaxis de `DataFrame.query()` y solo puede
+    contener columnas, literales, comparaciones y operadores lógicos o
+    aritméticos: sin llamadas a funciones ni acceso a atributos.
+
+    Example:
+        ```python
+        row_filter = RowFilter("cantidad > 2 and region == 'Norte'",
+                               columns=["fecha", "producto", "cantidad"])
+        row_filter.validate(df.columns)
+        chunk = row_filter.apply(df.iloc[:100_000])
+        ```
+    """
+
+    def __init__(self, expression: Optional[str] = None, columns: Optional[list[str]] = None) -> None:
+        self.expression = (expression or "").strip() or None
+        self.columns = list(columns) if columns else None
+
+    def validate(self, available: Iterable[str]) -> None:
+        """
+        Verifica la expresión y las columnas contra las columnas disponibles.
+
+        Raises:
+            ValidationError: Si el filtro usa columnas inexistentes o
+                construcciones no permitidas.
+        """
+        available = set(available)
+        if self.columns:
+            unknown = [c for c in self.columns if c not in available]
+            if unknown:
+                raise ValidationError(user_message=f"Columnas no encontradas: {', '.join(unknown)}")
+
+        if self.expression is None:
+            return
+
+        # Las columnas entre backticks no son nombres de Python: cada una se
+        # reemplaza por un marcador y se valida con su nombre real
+        placeholders: dict[str, str] = {}
+        names = set()
+        prefix = "_col"
+        while prefix in self.expression:
+            prefix = "_" + prefix
+
+        def placeholder(match: re.Match) -> str:
+            marker = f"{prefix}{len(placeholders) + 1}"
+            placeholders[marker] = match.group(1)
+            return marker
+
+        try:
+            tree = ast.parse(_BACKTICK_RE.sub(placeholder, self.expression), mode="eval")
+        except SyntaxError:
+            raise ValidationError(user_message=f"Filtro inválido: {self.expression}")
+
+        for node in ast.walk(tree):
+            if not isinstance(node, _ALLOWED_NODES):
+                raise ValidationError(
+                    user_message=f"Filtro no permitido ({type(node).__name__}): {self.expression}"
+                )
+            if isinstance(node, ast.Name):
+                names.add(placeholders.get(node.id, node.id))
+
+        unknown = sorted(n for n in names if n not in available and n not in ("True", "False"))
+        if unknown:
+            raise ValidationError(user_message=f"Columnas no encontradas: {', '.join(unknown)}")
+
+    def apply(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """Aplica el filtro a un bloque."""
+        if self.expression is not None:
+            chunk = chunk.query(self.expression)
+        if self.columns:
+            chunk = chunk[self.columns]
+        return chunk
+
+    def __repr__(self) -> str:
+        return f"RowFilter({self.expression!r}, columns={self.columns!r})"
+
+
+def write_csv_chunks(
+    chunks: Iterable[pd.DataFrame],
+    path: Union[str, Path],
+    include_index: bool = False,
+    encoding: str = CSVExporter.DEFAULT_ENCODING,
+) -> int:
+    """
+    Escribe bloques de un DataFrame en un único CSV.
+
+    El BOM y el encabezado se escriben una sola vez, igual que
+    `CSVExporter.export`. El archivo se escribe en un temporal y se
+    renombra al final, así una extracción fallida no deja un CSV a medias.
+
+    Args:
+        chunks: Bloques con las mismas columnas.
+        path: Ruta del CSV.
+        include_index: Si se incluye el índice.
+        encoding: Encoding del archivo ('utf-8-sig' para Excel).
+
+    Returns:
+        Número de filas escritas.
+
+    Raises:
+        ExportError: Si no se puede escribir el archivo.
+    """
+    output_path = Path(path)
+    partial_path = output_path.with_name(output_path.name + ".part")
+    rows = 0
+    try:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(partial_path, "w", encoding=encoding, newline="") as f:
+            header = True
+            for chunk in chunks:
+                if chunk.empty and not header:
+                    continue
+                chunk.to_csv(f, index=include_index, header=header)
+                header = False
+                rows += len(chunk)
+        os.replace(partial_path, output_path)
+    except PermissionError:
+        partial_path.unlink(missing_ok=True)
+        raise ExportError(user_message=f"Sin permisos para escribir el archivo: {output_path.name}")
+    except OSError as e:
+        partial_path.unlink(missing_ok=True)
+        raise ExportError(
+            user_message=f"Error al escribir el archivo: {output_path.name}",
+            internal_error=e
+        )
+    except BaseException:
+        partial_path.unlink(missing_ok=True)
+        raise
+    return rows
+
+
+def iter_filtered(
+    df: pd.DataFrame,
+    row_filter: RowFilter,
+    chunk_size: int = 100_000,
+) -> Iterator[pd.DataFrame]:
+    """Aplica el filtro sobre vistas de `chunk_size` filas del DataFrame."""
+    for start in range(0, len(df), chunk_size):
+        yield row_filter.apply(df.iloc[start:start + chunk_size])
+
+
+class StreamingExtractor:
+    """
+    Traduce una pregunta a un `RowFilter` y lo exporta por bloques.
+
+    Las preguntas que piden agregaciones no son extracciones de filas;
+    en ese caso `plan()` retorna None y se usa la exportación normal.
+
+    Example:
+        ```python
+        extractor = StreamingExtractor(llm, chunk_size=50_000)
+        row_filter = extractor.plan("Filas con cantidad > 2", df.columns)
+        rows = extractor.export(iter_filtered(df, row_filter), "extracto.csv")
+        ```
+    """
+
+    PROMPT_TEMPLATE = (
+        "Translate the request into a row filter for pandas DataFrame.query(). "
+        "Use only these columns: {columns}. Quote column names with spaces in "
+        "backticks and do not call functions. Return a ```json block with "
+        '{{"filter": "<expression or empty for all rows>", "columns": [<columns to '
+        'keep, empty for all>]}}. If the request needs aggregation, sorting or new '
+        'columns, return {{"aggregate": true}}.\n\nRequest: {question}'
+    )
+
+    def __init__(self, llm: Any, chunk_size: int = 100_000) -> None:
+        """
+        Inicializa el extractor.
+
+        Args:
+            llm: Proveedor LLM (interfaz `call()` de PandasAI).
+            chunk_size: Filas por bloque.
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size debe ser mayor que 0")
+        self._llm = llm
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def parse_plan(response: str) -> Optional[RowFilter]:
+        """Convierte la respuesta del LLM en un filtro, o None si no es una extracción."""
+        match = _JSON_BLOCK_RE.search(response)
+        try:
+            plan = json.loads(match.group(1) if match else response)
+        except json.JSONDecodeError:
+            return None
+        if not isinstance(plan, dict) or plan.get("aggregate"):
+            return None
+        return RowFilter(plan.get("filter"), columns=plan.get("columns"))
+
+    def plan(self, question: str, columns: Iterable[str]) -> Optional[RowFilter]:
+        """
+        Pide al LLM el filtro de una pregunta y lo valida.
+
+        Returns:
+            El filtro validado, o None si la pregunta no es una extracción
+            de filas.
+        """
+        columns = list(columns)
+        prompt = self.PROMPT_TEMPLATE.format(columns=", ".join(columns), question=question)
+        row_filter = self.parse_plan(self._llm.call(_TextPrompt(prompt)))
+        if row_filter is not None:
+            row_filter.validate(columns)
+        return row_filter
+
+    def export(
+        self,
+        chunks: Iterable[pd.DataFrame],
+        path: Union[str, Path],
+        include_index: bool = False,
+    ) -> int:
+        """
+        Escribe los bloques y verifica que haya datos.
+
+        Raises:
+            ExportError: Si la extracción no retornó filas.
+        """
+        rows = write_csv_chunks(chunks, path, include_index=include_index)
+        if rows == 0:
+            Path(path).unlink(missing_ok=True)
+            raise ExportError(
+                user_message="El DataFrame está vacío. La consulta no encontró datos que coincidan."
+            )
+        return rows
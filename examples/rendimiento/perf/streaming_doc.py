@@ -0,0 +1,173 @@
+"""
+Documentos de ReportLab armados desde un iterador, con memoria acotada.
+
+`BaseDocTemplate.build()` recibe la historia completa como lista y el
+canvas guarda todas las páginas hasta `save()`: un documento de miles de
+páginas ocupa en memoria todos sus flowables y todas sus páginas a la
+vez. `StreamingDocTemplate` pide los flowables a un iterador a medida que
+los necesita (`LazyStory`) y cada `flush_pages` páginas guarda el canvas
+como un PDF parcial, lo copia al destino con `PdfAppender` y sigue en un
+canvas nuevo. En memoria quedan solo los flowables de la página en curso
+y las páginas del segmento.
+
+Limitaciones: cada segmento incluye de nuevo sus fuentes e imágenes, los
+enlaces internos solo funcionan dentro de un segmento y no hay
+`multiBuild` (índices con números de página).
+"""
+import io
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from reportlab.pdfgen import canvas as pdfcanvas
+from reportlab.platypus import BaseDocTemplate, Flowable
+
+from perf.output import PdfOutput, is_stream
+from perf.pdf_merge import PdfAppender
+
+# Páginas por segmento por defecto
+FLUSH_PAGES = 100
+
+
+class LazyStory(list):
+    """
+    Historia que se llena desde un iterador a medida que ReportLab la consume.
+
+    `build()` solo mira el inicio de la lista (el siguiente flowable y los
+    que van pegados con `keepWithNext`) y borra cada flowable al dibujarlo,
+    así que la lista se mantiene corta aunque el iterador genere miles de
+    páginas.
+    """
+
+    def __init__(self, flowables: Iterable[Optional[Flowable]]) -> None:
+        super().__init__()
+        self._source: Optional[Iterator[Optional[Flowable]]] = iter(flowables)
+
+    def __len__(self) -> int:
+        self._fill(1)
+        return super().__len__()
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, int) and index >= 0:
+            self._fill(index + 1)
+        return super().__getitem__(index)
+
+    def _fill(self, size: int) -> None:
+        """Toma flowables hasta tener `size` y que el último no vaya pegado al siguiente."""
+        while self._source is not None and (list.__len__(self) < size or _keeps_with_next(self[-1])):
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+
+
+def _keeps_with_next(flowable: Optional[Flowable]) -> bool:
+    keep = getattr(flowable, "getKeepWithNext", None)
+    return bool(keep and keep())
+
+
+class StreamingDocTemplate(BaseDocTemplate):
+    """
+    `BaseDocTemplate` que escribe el PDF cada `flush_pages` páginas.
+
+    `build()` acepta cualquier iterable de flowables, incluido un
+    generador. Los números de página (`doc.page`) siguen de un segmento
+    al siguiente, así que encabezados y pies se dibujan igual que con
+    `BaseDocTemplate`.
+
+    Example:
+        ```python
+        def historia():
+            for mes, ventas in df.groupby("mes"):
+                yield Paragraph(f"Ventas de {mes}", styles["Heading"])
+                yield from generator.table_flowables(ventas)
+
+        doc = StreamingDocTemplate("anual.pdf", pagesize=A4, flush_pages=200)
+        doc.addPageTemplates([PageTemplate(frames=[frame], onPage=pie)])
+        doc.build(historia())
+        ```
+    """
+
+    def __init__(self, filename: PdfOutput, flush_pages: int = FLUSH_PAGES, **kw: Any) -> None:
+        """
+        Inicializa el documento.
+
+        Args:
+            filename: Ruta del PDF, o flujo binario con `write()` donde
+                escribirlo (no se cierra).
+            flush_pages: Páginas que se guardan en memoria antes de
+                escribirlas en el destino.
+            **kw: Opciones de `BaseDocTemplate` (`pagesize`, márgenes...).
+
+        Raises:
+            ValueError: Si `flush_pages` no es positivo.
+        """
+        if flush_pages <= 0:
+            raise ValueError(f"flush_pages inválido: {flush_pages}. Use un valor mayor que 0")
+        super().__init__(filename if is_stream(filename) else str(filename), **kw)
+        self.flush_pages = flush_pages
+        self._appender: Optional[PdfAppender] = None
+        self._segment = io.BytesIO()
+        self._segment_pages = 0
+        self._canvasmaker = pdfcanvas.Canvas
+
+    def build(
+        self,
+        flowables: Iterable[Optional[Flowable]],
+        filename: Optional[PdfOutput] = None,
+        canvasmaker: Any = pdfcanvas.Canvas,
+    ) -> None:
+        """
+        Arma el documento tomando los flowables del iterable a medida que se dibujan.
+
+        Args:
+            flowables: Flowables del documento (lista, generador...).
+            filename: Destino en lugar del indicado al crear el documento.
+            canvasmaker: Clase del canvas, como en `BaseDocTemplate.build`.
+        """
+        output = filename if filename is not None else self.filename
+        if is_stream(output):
+            self._build_into(output, flowables, canvasmaker)
+            return
+        Path(output).parent.mkdir(parents=True, exist_ok=True)
+        with open(output, "wb") as out:
+            self._build_into(out, flowables, canvasmaker)
+
+    def _build_into(self, out: Any, flowables: Iterable[Optional[Flowable]], canvasmaker: Any) -> None:
+        self._appender = PdfAppender(out)
+        self._segment = io.BytesIO()
+        self._segment_pages = 0
+        self._canvasmaker = canvasmaker
+        try:
+            super().build(LazyStory(flowables), filename=self._segment, canvasmaker=canvasmaker)
+            self._appender.append(self._segment.getvalue())
+            self._appender.close()
+        finally:
+            self._appender = None
+            self._segment = io.BytesIO()
+
+    def handle_pageEnd(self) -> None:
+        """Termina la página y, cada `flush_pages`, escribe el segmento."""
+        super().handle_pageEnd()
+        self._segment_pages += 1
+        if self._appender is not None and self._segment_pages >= self.flush_pages:
+            self._flush()
+
+    def _flush(self) -> None:
+        """Guarda el canvas en el destino y sigue en uno nuevo."""
+        previous = self.canv
+        previous.save()
+        self._appender.append(self._segment.getvalue())
+
+        self._segment = io.BytesIO()
+        self._segment_pages = 0
+        # _makeCanvas reinicia los contadores (self.seq) de todo el documento
+        seq = self.seq
+        self.canv = self._makeCanvas(filename=self._segment, canvasmaker=self._canvasmaker)
+        self.seq = seq
+        self.canv._doctemplate = self
+        self.canv._pageNumber = previous._pageNumber
+        self.canv.setPageRotation(getattr(self.pageTemplate, "rotation", self.rotation))
+        # build() conserva el primer canvas hasta el final y le vuelve a
+        # asignar _savedInfo: que apunte al documento del canvas nuevo
+        previous._doc = self.canv._doc
+        self._savedInfo = self.canv._doc.info
@@ -0,0 +1,403 @@
+"""
+Tablas de reporte: formato por columnas y paginación con memoria acotada.
+
+`ReportGenerator._auto_adjust_table` recorre el DataFrame celda por
+celda, crea una `Paragraph` por cada texto largo y un `TableStyle` nuevo
+por tabla; ReportLab después mide cada celda y, al paginar, vuelve a
+medir la tabla restante en cada página.
+
+Aquí las celdas se formatean columna por columna (números, fechas y
+moneda incluidos): cada valor distinto se formatea una vez y el texto
+largo se parte en líneas con `simpleSplit`, así que todas las celdas
+son cadenas simples y el alto de cada fila se calcula sin ReportLab. El
+`TableStyle` se construye una vez por combinación de colores, fuentes y
+tamaño.
+
+Para tablas grandes, `StreamingTable` es un flowable que guarda solo el
+DataFrame y la fila donde empieza. En cada página calcula cuántas filas
+caben y retorna una `Table` pequeña más el resto de la tabla sin
+formatear. La fila de encabezado se repite en cada página.
+"""
+import logging
+from functools import lru_cache
+from typing import Callable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from reportlab.lib.colors import HexColor, white
+from reportlab.lib.utils import simpleSplit
+from reportlab.platypus import Flowable, Table, TableStyle
+
+logger = logging.getLogger(__name__)
+
+# Filas que se examinan para estimar el ancho de las columnas
+WIDTH_SAMPLE_ROWS = 2000
+
+# Caracteres por punto de ancho, igual que ReportGenerator._calculate_column_widths
+POINTS_PER_CHAR = 7
+
+# Filas que se formatean juntas: reparte el costo fijo de pandas entre
+# varias páginas y acota la memoria a un bloque de texto
+FORMAT_BLOCK_ROWS = 1024
+
+# Formatos con nombre; también se acepta un formato de `str.format`
+# ("{:,.3f}") o de `strftime` ("%d/%m/%Y")
+CELL_FORMATS = {
+    "number": "{:,.2f}",
+    "integer": "{:,.0f}",
+    "currency": "${:,.2f}",
+    "percent": "{:.1%}",
+    "date": "%Y-%m-%d",
+    "datetime": "%Y-%m-%d %H:%M",
+}
+
+# Relleno horizontal por defecto de las celdas de ReportLab (6 + 6 puntos)
+CELL_PADDING = 12
+
+
+def _format_values(values: pd.Series, fmt: str) -> np.ndarray:
+    """Formatea valores sin nulos con un formato de `str.format` o `strftime`."""
+    if "{" not in fmt:
+        return pd.to_datetime(values).dt.strftime(fmt).to_numpy(dtype=object)
+    numbers = pd.to_numeric(values).to_numpy()
+    if fmt.startswith("$"):
+        # -$1,234.50 en lugar de $-1,234.50
+        text = np.array([fmt.format(v) for v in np.abs(numbers).tolist()], dtype=object)
+        return np.where(numbers < 0, "-" + text, text)
+    return np.array([fmt.format(v) for v in numbers.tolist()], dtype=object)
+
+
+def format_column(
+    column: pd.Series,
+    fmt: Optional[str] = None,
+    max_chars: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Convierte una columna completa a texto.
+
+    Cada valor distinto se formatea una sola vez y el resultado se
+    reparte con los códigos de `pd.factorize`. Los nulos quedan vacíos.
+
+    Args:
+        column: Valores de la columna.
+        fmt: Nombre de `CELL_FORMATS`, formato de `str.format` o de
+            `strftime`. None = `str()` de cada valor, como ReportGenerator.
+        max_chars: Si se indica, la celda queda en una sola línea: los
+            espacios y saltos de línea se unen y los textos más largos se
+            recortan con "…".
+
+    Returns:
+        Arreglo de `str` del mismo largo que `column`.
+    """
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Series(uniques)
+    if fmt is None:
+        text = uniques.astype(str).to_numpy(dtype=object)
+    else:
+        text = _format_values(uniques, CELL_FORMATS.get(fmt, fmt))
+
+    if max_chars is not None:
+        text = pd.Series(text, dtype=object).str.replace(r"\s+", " ", regex=True)
+        long = (text.str.len() > max_chars).to_numpy()
+        if long.any():
+            text = text.mask(long, text.str.slice(0, max_chars - 1) + "…")
+        text = text.to_numpy(dtype=object)
+
+    # El código -1 (nulo) toma la cadena vacía agregada al final
+    return np.append(text, "")[codes]
+
+
+def wrap_column(
+    text: np.ndarray,
+    width: float,
+    font_name: str,
+    font_size: float,
+    max_chars: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Parte en líneas los textos largos de una columna.
+
+    Como en ReportGenerator, solo los textos de más de `max_chars`
+    caracteres se ajustan al ancho de la columna; cada texto distinto se
+    parte una vez.
+
+    Returns:
+        El texto con saltos de línea y el número de líneas de cada celda.
+    """
+    lines = np.ones(len(text), dtype=np.int64)
+    long = np.flatnonzero(pd.Series(text, dtype=object).str.len().to_numpy() > max_chars)
+    if not len(long):
+        return text, lines
+
+    text = text.copy()
+    codes, uniques = pd.factorize(text[long])
+    split = [simpleSplit(value, font_name, font_size, max(width - CELL_PADDING, 1)) for value in uniques]
+    wrapped = np.array(["\n".join(parts) for parts in split], dtype=object)
+    counts = np.array([max(len(parts), 1) for parts in split])
+    text[long] = wrapped[codes]
+    lines[long] = counts[codes]
+    return text, lines
+
+
+def column_widths(
+    lengths: Sequence[int],
+    available_width: float,
+    min_width: float,
+) -> list[float]:
+    """Anchos de columna a partir del texto más largo de cada una, como ReportGenerator."""
+    widths = [max(length * POINTS_PER_CHAR, min_width) for length in lengths]
+    total = sum(widths)
+    if total > available_width:
+        widths = [max(w * available_width / total, min_width) for w in widths]
+    total = sum(widths)
+    if total < available_width:
+        extra = (available_width - total) / len(widths)
+        widths = [w + extra for w in widths]
+    return widths
+
+
+def _longest(name: str, text: np.ndarray) -> int:
+    """Caracteres del texto más largo de una columna, incluido el encabezado."""
+    if not len(text):
+        return len(name)
+    return max(len(name), int(pd.Series(text, dtype=object).str.len().max()))
+
+
+def sample_widths(
+    df: pd.DataFrame,
+    available_width: float,
+    min_width: float,
+    max_chars: int,
+    formats: Optional[dict[str, str]] = None,
+    sample_rows: int = WIDTH_SAMPLE_ROWS,
+) -> list[float]:
+    """
+    Anchos de columna como `ReportGenerator._calculate_column_widths`,
+    estimados con una muestra de filas en lugar de todo el DataFrame.
+    """
+    if len(df) > sample_rows:
+        # Primeras filas (las que se ven primero) y una muestra del resto
+        head = df.iloc[: sample_rows // 2]
+        rest = df.iloc[sample_rows // 2:].sample(sample_rows - len(head), random_state=0)
+        df = pd.concat([head, rest])
+
+    formats = formats or {}
+    lengths = [
+        _longest(str(name), format_column(df.iloc[:, i], formats.get(name), max_chars))
+        for i, name in enumerate(df.columns)
+    ]
+    return column_widths(lengths, available_width, min_width)
+
+
+@lru_cache(maxsize=64)
+def table_style(
+    primary_color: str,
+    title_font: str,
+    body_font: str,
+    font_size: int,
+    odd_start: bool = False,
+) -> TableStyle:
+    """
+    `TableStyle` de ReportGenerator, construido una vez por combinación.
+
+    Los comandos no dependen del número de filas ni de columnas, así que
+    todas las tablas con los mismos colores, fuentes y tamaño comparten
+    el mismo objeto.
+
+    Args:
+        odd_start: Invierte los colores alternos, para una tabla que
+            continúa otra con un número impar de filas.
+    """
+    backgrounds = [white, HexColor("#f5f5f5")]
+    if odd_start:
+        backgrounds.reverse()
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), HexColor(primary_color)),
+        ('TEXTCOLOR', (0, 0), (-1, 0), white),
+        ('FONTNAME', (0, 0), (-1, 0), title_font),
+        ('FONTSIZE', (0, 0), (-1, 0), font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('TOPPADDING', (0, 0), (-1, 0), 8),
+        ('FONTNAME', (0, 1), (-1, -1), body_font),
+        ('FONTSIZE', (0, 1), (-1, -1), font_size - 1),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 5),
+        ('TOPPADDING', (0, 1), (-1, -1), 5),
+        ('GRID', (0, 0), (-1, -1), 0.5, HexColor("#cccccc")),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), backgrounds),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ])
+
+
+@lru_cache(maxsize=64)
+def _row_metrics(style: TableStyle, n_cols: int) -> tuple[float, float, float]:
+    """Alto del encabezado, de una fila de una línea y de cada línea extra."""
+    row = ("X",) * n_cols
+    sample = Table([row, row, ("X\nX",) * n_cols], style=style)
+    sample.wrap(1e6, 1e6)
+    header_height, row_height, two_lines = sample._rowHeights
+    return header_height, row_height, two_lines - row_height
+
+
+def row_heights(style: TableStyle, n_cols: int, lines: np.ndarray) -> list[float]:
+    """Altos del encabezado y de cada fila, para pasarlos a `Table`."""
+    header, row, leading = _row_metrics(style, n_cols)
+    return [header, *(row + (lines - 1) * leading).tolist()]
+
+
+def build_table(
+    df: pd.DataFrame,
+    available_width: float,
+    style_for: Callable[[int], TableStyle],
+    min_width: float,
+    max_chars: int,
+    font_name: str,
+    formats: Optional[dict[str, str]] = None,
+    font_size_for: Optional[Callable[[list[float]], int]] = None,
+) -> Table:
+    """
+    `Table` de ReportLab con celdas de texto formateadas por columna.
+
+    Args:
+        df: Datos.
+        available_width: Ancho disponible en puntos.
+        style_for: Función `tamaño de fuente -> TableStyle`.
+        min_width: Ancho mínimo de columna.
+        max_chars: Los textos más largos se parten en líneas.
+        font_name: Fuente del cuerpo, para medir el texto.
+        formats: Formato por nombre de columna (ver `format_column`).
+        font_size_for: Función `anchos -> tamaño de fuente`. None = 10.
+
+    Returns:
+        La tabla, con el encabezado repetido en cada página y los altos
+        de fila ya calculados.
+    """
+    formats = formats or {}
+    header = [str(column) for column in df.columns]
+    columns = [format_column(df.iloc[:, i], formats.get(name)) for i, name in enumerate(df.columns)]
+
+    col_widths = column_widths(
+        [_longest(name, text) for name, text in zip(header, columns)], available_width, min_width
+    )
+    font_size = font_size_for(col_widths) if font_size_for is not None else 10
+    style = style_for(font_size)
+
+    lines = np.ones(len(df), dtype=np.int64)
+    for i, width in enumerate(col_widths):
+        columns[i], column_lines = wrap_column(columns[i], width, font_name, font_size - 1, max_chars)
+        np.maximum(lines, column_lines, out=lines)
+
+    return Table(
+        [header, *zip(*columns)],
+        colWidths=col_widths,
+        rowHeights=row_heights(style, len(header), lines),
+        repeatRows=1,
+        style=style,
+    )
+
+
+class StreamingTable(Flowable):
+    """
+    Tabla que se formatea página por página.
+
+    Todas las filas tienen una sola línea, así que la altura de la tabla
+    se conoce sin formatear nada: `wrap` la calcula, `split` construye la
+    `Table` con las filas que caben en el espacio disponible y retorna el
+    resto como otra `StreamingTable` sobre el mismo DataFrame (sin
+    copiarlo). Las filas se formatean en bloques de `FORMAT_BLOCK_ROWS`
+    que pasan de una página a la siguiente.
+
+    Example:
+        ```python
+        styles = (table_style(color, title_font, body_font, 10),
+                  table_style(color, title_font, body_font, 10, odd_start=True))
+        story.append(StreamingTable(df, col_widths, styles))  # Una página en memoria a la vez
+        ```
+    """
+
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        col_widths: Sequence[float],
+        styles: tuple[TableStyle, TableStyle],
+        max_chars: int = 50,
+        formats: Optional[dict[str, str]] = None,
+        start: int = 0,
+        _block: Optional[tuple[int, list[tuple[str, ...]]]] = None,
+    ) -> None:
+        """
+        Inicializa la tabla (no formatea ninguna fila).
+
+        Args:
+            df: Datos; se leen por rebanadas de `df.iloc`.
+            col_widths: Ancho de cada columna en puntos.
+            styles: Estilo para las páginas que empiezan en una fila par
+                y en una impar (ver `table_style(odd_start=...)`), para
+                que los colores alternos sigan sin cortes.
+            max_chars: Caracteres máximos por celda.
+            formats: Formato por nombre de columna (ver `format_column`).
+            start: Primera fila de `df` que falta dibujar.
+        """
+        super().__init__()
+        self.df = df
+        self.col_widths = list(col_widths)
+        self.styles = styles
+        self.max_chars = max_chars
+        self.formats = formats or {}
+        self.start = start
+        self._block = _block  # (primera fila, filas formateadas)
+        self._header = tuple(str(column) for column in df.columns)
+        self._header_height, self._row_height, _ = _row_metrics(styles[0], len(self._header))
+
+    @property
+    def remaining(self) -> int:
+        """Filas que faltan por dibujar."""
+        return len(self.df) - self.start
+
+    def wrap(self, availWidth: float, availHeight: float) -> tuple[float, float]:
+        self.width = sum(self.col_widths)
+        self.height = self._header_height + self._row_height * self.remaining
+        return self.width, self.height
+
+    def _rows(self, stop: int) -> list[tuple[str, ...]]:
+        """Filas `start:stop` formateadas, desde el bloque actual o uno nuevo."""
+        if self._block is not None:
+            first, rows = self._block
+            if first <= self.start and stop <= first + len(rows):
+                return rows[self.start - first:stop - first]
+        block = self.df.iloc[self.start:max(stop, self.start + FORMAT_BLOCK_ROWS)]
+        rows = list(zip(*(
+            format_column(block.iloc[:, i], self.formats.get(name), self.max_chars)
+            for i, name in enumerate(block.columns)
+        )))
+        self._block = (self.start, rows)
+        return rows[:stop - self.start]
+
+    def _table(self, stop: int) -> Table:
+        """`Table` de ReportLab con las filas `start:stop` y el encabezado."""
+        rows = self._rows(stop)
+        return Table(
+            [self._header, *rows],
+            colWidths=self.col_widths,
+            rowHeights=[self._header_height] + [self._row_height] * len(rows),
+            style=self.styles[self.start % 2],
+        )
+
+    def split(self, availWidth: float, availHeight: float) -> list[Flowable]:
+        fits = int((availHeight - self._header_height) // self._row_height)
+        if fits <= 0:
+            return []  # Sin espacio para el encabezado y una fila: siguiente página
+        if fits >= self.remaining:
+            return [self._table(len(self.df))]
+        stop = self.start + fits
+        return [
+            self._table(stop),
+            StreamingTable(self.df, self.col_widths, self.styles, self.max_chars, self.formats,
+                           start=stop, _block=self._block),
+        ]
+
+    def draw(self) -> None:
+        # Solo se llama cuando el resto completo cabe en la página
+        table = self._table(len(self.df))
+        table.wrapOn(self.canv, self.width, self.height)
+        table.drawOn(self.canv, 0, 0)
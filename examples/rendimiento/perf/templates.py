@@ -0,0 +1,395 @@
+"""
+Plantillas compiladas: estilos, fuentes e imágenes preparados una vez.
+
+Cada `ReportGenerator(ruta, plantilla)` vuelve a crear la hoja de
+estilos, vuelve a leer y registrar las fuentes TTF de la plantilla y,
+en cada página, vuelve a comprobar que el logo existe y a calcular su
+posición; la portada se abre dos veces por reporte.
+
+`compile_template()` hace todo eso una sola vez y retorna una
+`CompiledTemplate` inmutable que comparten todos los generadores, en
+cualquier hilo: 500 reportes con la misma plantilla pagan la
+preparación una vez. Logos y portada se reducen al tamaño en que se
+dibujan (`perf.images`).
+"""
+import logging
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Mapping, Optional, Union
+
+from PIL import Image as PILImage
+from reportlab.lib.colors import Color, HexColor
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+from qry_doc import DEFAULT_TEMPLATE, CoverBuilder, ReportTemplate, TemplateBuilder, ValidationError
+from qry_doc.asset_manager import AssetManager
+
+from perf.charts import resolve_dpi
+from perf.images import fit_size, resample_image
+from perf.pdf_merge import page_number_form
+
+if TYPE_CHECKING:
+    from qry_doc import ChartConfig
+
+logger = logging.getLogger(__name__)
+
+# Fuentes ya registradas en este proceso: (nombre, ruta) -> registrada
+_FONTS: dict[tuple[str, str], bool] = {}
+_FONTS_LOCK = threading.Lock()
+
+FOOTER_TEXT_COLOR = HexColor("#666666")
+FOOTER_LINE_COLOR = HexColor("#cccccc")
+
+
+def register_font(name: str, path: Path) -> bool:
+    """
+    Registra una fuente TTF/OTF una sola vez por proceso.
+
+    Args:
+        name: Nombre con el que ReportLab conoce la fuente.
+        path: Archivo de la fuente.
+
+    Returns:
+        True si la fuente está registrada; False si no se pudo cargar.
+    """
+    key = (name, str(path))
+    with _FONTS_LOCK:
+        if key not in _FONTS:
+            is_valid, error_msg = AssetManager.validate_font_path(path)
+            if not is_valid:
+                logger.warning(f"{error_msg}. Using default font.")
+                _FONTS[key] = False
+            else:
+                try:
+                    pdfmetrics.registerFont(TTFont(name, str(path)))
+                    logger.info(f"Registered custom font: {name}")
+                    _FONTS[key] = True
+                except Exception as e:
+                    logger.warning(f"Failed to register font {path}: {e}. Using default font.")
+                    _FONTS[key] = False
+        return _FONTS[key]
+
+
+def _fonts(template: ReportTemplate) -> tuple[str, str]:
+    """Igual que `ReportTemplate.register_custom_fonts`, registrando una vez."""
+    title_font, body_font = template.title_font, template.body_font
+    path = template.custom_title_font_path
+    if path is not None and register_font(f"CustomTitle-{path.stem}", path):
+        title_font = f"CustomTitle-{path.stem}"
+    path = template.custom_body_font_path
+    if path is not None and register_font(f"CustomBody-{path.stem}", path):
+        body_font = f"CustomBody-{path.stem}"
+    return title_font, body_font
+
+
+def paragraph_styles(template: ReportTemplate, title_font: str, body_font: str) -> dict[str, ParagraphStyle]:
+    """Mismos estilos que `ReportGenerator._create_styles`."""
+    base_styles = getSampleStyleSheet()
+    return {
+        'Title': ParagraphStyle(
+            'CustomTitle',
+            parent=base_styles['Title'],
+            fontName=title_font,
+            fontSize=24,
+            textColor=template.primary_color_obj,
+            spaceAfter=20,
+            alignment=TA_CENTER,
+        ),
+        'Heading': ParagraphStyle(
+            'CustomHeading',
+            parent=base_styles['Heading2'],
+            fontName=title_font,
+            fontSize=14,
+            textColor=template.primary_color_obj,
+            spaceBefore=15,
+            spaceAfter=10,
+        ),
+        'Body': ParagraphStyle(
+            'CustomBody',
+            parent=base_styles['Normal'],
+            fontName=body_font,
+            fontSize=10,
+            leading=14,
+            alignment=TA_JUSTIFY,
+            spaceAfter=10,
+        ),
+        'Normal': base_styles['Normal'],
+    }
+
+
+@dataclass(frozen=True)
+class PlacedImage:
+    """Imagen de la plantilla con su rectángulo en la página ya calculado."""
+    source: Path
+    path: Path  # Lo que se dibuja: la original o la reducida
+    x: float
+    y: float
+    width: float
+    height: float
+
+    def draw(self, canvas: Any) -> None:
+        canvas.drawImage(str(self.path), self.x, self.y, width=self.width, height=self.height,
+                         preserveAspectRatio=True, mask='auto')
+
+
+def _image_size(path: Path) -> tuple[int, int]:
+    """Tamaño en píxeles; solo lee el encabezado del archivo."""
+    with PILImage.open(path) as img:
+        return img.size
+
+
+def _place(
+    path: Path,
+    x: float,
+    y: float,
+    width: float,
+    height: float,
+    dpi: Optional[int],
+    directory: Optional[Path],
+) -> PlacedImage:
+    """Ubica una imagen en su caja y la reduce a su tamaño dibujado."""
+    drawn = path
+    if dpi is not None:
+        try:
+            drawn = resample_image(path, *fit_size(*_image_size(path), width, height), dpi, directory)
+        except Exception as e:
+            logger.warning(f"Could not resample {path}: {e}. Using original image.")
+    return PlacedImage(path, drawn, x, y, width, height)
+
+
+def _cover(template: ReportTemplate, dpi: Optional[int], directory: Optional[Path]) -> Optional[PlacedImage]:
+    """Portada escalada para cubrir la página, como `_draw_cover_on_canvas`."""
+    path = template.cover_image_path
+    if path is None:
+        return None
+    is_valid, _ = AssetManager.validate_image_path(path)
+    if not is_valid:
+        raise ValidationError(user_message=f"Cover image not found: {path}", internal_error=None)
+    try:
+        width, height = _image_size(path)
+    except Exception as e:
+        raise ValidationError(
+            user_message="Invalid cover image format. Supported: PNG, JPG, JPEG",
+            internal_error=e,
+        )
+    scale = max(template.page_width / width, template.page_height / height)
+    return _place(path, (template.page_width - width * scale) / 2, (template.page_height - height * scale) / 2,
+                  width * scale, height * scale, dpi, directory)
+
+
+def _logo(template: ReportTemplate, dpi: Optional[int], directory: Optional[Path]) -> Optional[PlacedImage]:
+    """Logo del encabezado, si existe (el original lo comprueba en cada página)."""
+    path = template.logo_path
+    if path is None or not path.exists():
+        return None
+    return _place(path, template.margin_left, template.page_height - template.margin_top - 40, 100, 40,
+                  dpi, directory)
+
+
+def _footer_logo(template: ReportTemplate, dpi: Optional[int], directory: Optional[Path]) -> Optional[PlacedImage]:
+    """Logo del pie de página, si está habilitado y existe."""
+    path = template.get_footer_logo_path()
+    if path is None:
+        return None
+    if not path.exists():
+        logger.warning(f"Footer logo not found: {path}. Skipping logo.")
+        return None
+    x, y = template._calculate_footer_logo_position()
+    return _place(path, x, y, template.footer_logo_width, template.footer_logo_height, dpi, directory)
+
+
+@dataclass(frozen=True)
+class CompiledTemplate:
+    """
+    Plantilla lista para generar muchos reportes.
+
+    Guarda una copia de la plantilla, las fuentes registradas, los estilos
+    de párrafo, el rectángulo de cada imagen y los colores del encabezado
+    y el pie. No cambia después de compilarse, así que se puede compartir
+    entre generadores e hilos; para otra plantilla, compile otra.
+
+    Example:
+        ```python
+        compiled = compile_template(TemplateBuilder().with_colors("#0066CC"))
+        for region, datos in df.groupby("region"):
+            PerfReportGenerator(f"{region}.pdf", compiled).build(region, resumen, dataframe=datos)
+        ```
+    """
+    template: ReportTemplate
+    title_font: str
+    body_font: str
+    styles: Mapping[str, ParagraphStyle]
+    primary_color: Color
+    charts: tuple["ChartConfig", ...] = ()
+    cover: Optional[PlacedImage] = None
+    logo: Optional[PlacedImage] = None
+    footer_logo: Optional[PlacedImage] = None
+    # Plantillas que redefinen draw_header/draw_footer o tienen callbacks
+    custom_header: bool = False
+    custom_footer: bool = False
+    # Resolución y caché de las imágenes reducidas (None = originales)
+    image_dpi: Optional[int] = None
+    image_dir: Optional[Path] = None
+
+    def __reduce__(self):
+        # Los estilos no se pueden serializar: otro proceso compila la plantilla de nuevo
+        return _recompile, (self.template, self.charts, self.image_dpi, self.image_dir)
+
+    def draw_header(self, canvas: Any, doc: Any) -> None:
+        """Igual que `ReportTemplate.draw_header`, con todo precalculado."""
+        template = self.template
+        if self.custom_header:
+            template.draw_header(canvas, doc)
+            return
+        canvas.saveState()
+        if self.logo is not None:
+            try:
+                self.logo.draw(canvas)
+            except Exception:
+                pass  # Igual que el original: sin logo si no se puede cargar
+        canvas.setStrokeColor(self.primary_color)
+        canvas.setLineWidth(1)
+        y_pos = template.page_height - template.margin_top - template.header_height
+        canvas.line(template.margin_left, y_pos, template.page_width - template.margin_right, y_pos)
+        canvas.restoreState()
+
+    def draw_footer(self, canvas: Any, doc: Any, page_number_forms: bool = False) -> None:
+        """
+        Igual que `ReportTemplate.draw_footer`, con todo precalculado.
+
+        Con `page_number_forms`, el número de página se dibuja como un
+        formulario `page_number_form(n)` que `merge_pdfs` puede reemplazar
+        al unir el PDF con otros.
+        """
+        template = self.template
+        if self.custom_footer:
+            template.draw_footer(canvas, doc)
+            return
+        canvas.saveState()
+        if page_number_forms:
+            name = page_number_form(doc.page)
+            canvas.beginForm(name)
+            self.draw_page_number(canvas, doc.page)
+            canvas.endForm()
+            canvas.doForm(name)
+        else:
+            self.draw_page_number(canvas, doc.page)
+        if self.footer_logo is not None:
+            try:
+                self.footer_logo.draw(canvas)
+            except Exception as e:
+                logger.warning(f"Failed to draw footer logo: {e}")
+        canvas.setStrokeColor(FOOTER_LINE_COLOR)
+        canvas.setLineWidth(0.5)
+        canvas.line(template.margin_left, template.margin_bottom,
+                    template.page_width - template.margin_right, template.margin_bottom)
+        canvas.restoreState()
+
+    def draw_page_number(self, canvas: Any, page: int) -> None:
+        """Dibuja el texto "Página N" del pie."""
+        template = self.template
+        canvas.setFont(template.body_font, 9)
+        canvas.setFillColor(FOOTER_TEXT_COLOR)
+        canvas.drawCentredString(template.page_width / 2, template.margin_bottom - 20, f"Página {page}")
+
+    def draw_cover(self, canvas: Any) -> None:
+        """Dibuja la portada a página completa, sin encabezado ni pie."""
+        if self.cover is None:
+            return
+        canvas.saveState()
+        try:
+            self.cover.draw(canvas)
+        except Exception as e:
+            raise ValidationError(
+                user_message="Invalid cover image format. Supported: PNG, JPG, JPEG",
+                internal_error=e,
+            )
+        finally:
+            canvas.restoreState()
+
+
+def _overrides(template: ReportTemplate, method: str) -> bool:
+    return getattr(type(template), method) is not getattr(ReportTemplate, method)
+
+
+def compile_template(
+    template: Union[ReportTemplate, TemplateBuilder, CompiledTemplate, None] = None,
+    cover: Optional[CoverBuilder] = None,
+    image_dpi: Union[str, int, None] = "print",
+    image_dir: Optional[Union[str, Path]] = None,
+) -> CompiledTemplate:
+    """
+    Prepara una plantilla para generar muchos reportes.
+
+    Args:
+        template: Plantilla, TemplateBuilder (se conservan sus gráficas)
+            o plantilla ya compilada. None = `DEFAULT_TEMPLATE`.
+        cover: Portada opcional; su imagen de fondo reemplaza la de la
+            plantilla, igual que en `generate_report_with_builder`.
+        image_dpi: Resolución impresa de logos y portada: perfil
+            ('draft', 'screen', 'print') o valor en DPI. None = se
+            insertan las imágenes originales.
+        image_dir: Caché en disco de las imágenes reducidas. None =
+            `DEFAULT_IMAGE_DIR`.
+
+    Returns:
+        CompiledTemplate inmutable.
+
+    Raises:
+        ValidationError: Si la configuración del TemplateBuilder o la
+            imagen de portada no son válidas.
+    """
+    cover_image = cover.build().background_image if cover is not None else None
+    if isinstance(template, CompiledTemplate):
+        if cover_image is None:
+            return template
+        # Solo cambia la portada: fuentes y estilos se reutilizan
+        with_cover = replace(template.template, cover_image_path=cover_image)
+        return replace(template, template=with_cover,
+                       cover=_cover(with_cover, template.image_dpi, template.image_dir))
+
+    charts: tuple = ()
+    if isinstance(template, TemplateBuilder):
+        charts = tuple(template.charts)
+        template = template.build()
+    elif template is None:
+        template = DEFAULT_TEMPLATE
+
+    # Copia propia: cambiar la plantilla original no altera la compilada
+    template = replace(template, sections=list(template.sections))
+    if cover_image is not None:
+        template = replace(template, cover_image_path=cover_image)
+
+    title_font, body_font = _fonts(template)
+    dpi = resolve_dpi(image_dpi) if image_dpi is not None else None
+    directory = Path(image_dir) if image_dir is not None else None
+    return CompiledTemplate(
+        template=template,
+        title_font=title_font,
+        body_font=body_font,
+        styles=MappingProxyType(paragraph_styles(template, title_font, body_font)),
+        charts=charts,
+        primary_color=template.primary_color_obj,
+        custom_header=template._header_callback is not None or _overrides(template, "draw_header"),
+        custom_footer=template._footer_callback is not None or _overrides(template, "draw_footer"),
+        cover=_cover(template, dpi, directory),
+        logo=_logo(template, dpi, directory),
+        footer_logo=_footer_logo(template, dpi, directory),
+        image_dpi=dpi,
+        image_dir=directory,
+    )
+
+
+def _recompile(
+    template: ReportTemplate,
+    charts: tuple,
+    image_dpi: Optional[int],
+    image_dir: Optional[Path],
+) -> CompiledTemplate:
+    """Compila en otro proceso una plantilla recibida con pickle."""
+    return replace(compile_template(template, image_dpi=image_dpi, image_dir=image_dir), charts=charts)
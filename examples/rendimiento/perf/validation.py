@@ -0,0 +1,273 @@
+"""
+Validación local de consultas con un índice de columnas y sinónimos.
+
+`QueryIndex` se construye una vez a partir del perfil de columnas y
+resuelve cada palabra de la pregunta contra nombres de columna, valores
+de categorías y un diccionario de sinónimos español/inglés, con búsqueda
+difusa para errores de escritura. Validar una pregunta no hace llamadas
+al LLM y toma microsegundos.
+
+Solo rechaza la pregunta por palabras que parecen referencias a los
+datos: nombres entre comillas y palabras parecidas a una columna o un
+valor (errores de escritura). El resto de las palabras desconocidas
+("dataset", "margen por sucursal") quedan como avisos: el LLM las
+interpreta.
+"""
+import re
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from typing import Optional
+
+from perf.profile import DataProfile, normalize_text
+
+
+# Grupos de términos equivalentes (español/inglés). Una palabra queda
+# resuelta si algún término de su grupo es una columna o un valor.
+SYNONYM_GROUPS: list[set[str]] = [
+    {"region", "regiones", "zona", "zonas", "zone", "zones", "area", "areas"},
+    {"cantidad", "cantidades", "quantity", "quantities", "unidades", "units", "qty", "volumen", "volume"},
+    {"precio", "precios", "price", "prices", "precio unitario", "unit price", "costo", "cost", "tarifa"},
+    {"ventas", "venta", "sales", "sale", "ingresos", "revenue", "facturacion", "importe", "monto",
+     "amount", "cantidad", "precio"},
+    {"vendedor", "vendedores", "seller", "sellers", "salesperson", "vendedora", "agente", "agent", "rep"},
+    {"producto", "productos", "product", "products", "articulo", "articulos", "item", "items"},
+    {"categoria", "categorias", "category", "categories", "linea", "segmento", "segment"},
+    # Los periodos se derivan de la fecha ("ventas por semestre")
+    {"fecha", "fechas", "date", "dates", "dia", "dias", "day", "days", "mes", "meses", "month",
+     "months", "ano", "anos", "year", "years", "trimestre", "trimestres", "quarter", "quarters",
+     "semana", "semanas", "week", "weeks", "semestre", "semestres", "semester", "semesters",
+     "bimestre", "bimestres", "cuatrimestre", "cuatrimestres", "quincena", "quincenas", "hora",
+     "horas", "hour", "hours", "minuto", "minutos", "minute", "minutes", "periodo", "periodos",
+     "period", "periods", "mensual", "monthly", "anual", "yearly", "diario", "daily", "semanal",
+     "weekly", "trimestral", "quarterly", "semestral"},
+    {"cliente", "clientes", "customer", "customers", "client", "clients"},
+    {"puerto", "puertos", "port", "ports"},
+    {"barco", "barcos", "ship", "ships", "buque", "buques", "vessel", "embarcacion"},
+    {"aerolinea", "aerolineas", "airline", "airlines", "carrier", "carriers"},
+    {"retraso", "retrasos", "delay", "delays", "demora"},
+]
+
+# Palabras de análisis que no hacen referencia a datos
+ANALYSIS_WORDS = {
+    "total", "totales", "suma", "sum", "promedio", "promedios", "average", "avg", "media", "mean",
+    "mediana", "median", "conteo", "count", "contar", "numero", "number", "cuantos", "cuantas",
+    "how", "many", "much", "maximo", "maxima", "max", "minimo", "minima", "min", "mayor", "mayores",
+    "menor", "menores", "top", "mejor", "mejores", "peor", "peores", "best", "worst", "highest",
+    "lowest", "most", "least", "mas", "menos", "distribucion", "distribution", "tendencia", "trend",
+    "porcentaje", "percentage", "percent", "ratio", "tasa", "rate", "grafica", "grafico", "chart",
+    "plot", "tabla", "table", "reporte", "report", "resumen", "summary", "analisis", "analysis",
+    "analiza", "analyze", "muestra", "mostrar", "show", "lista", "list", "dame", "give", "calcula",
+    "calculate", "compara", "compare", "comparar", "agrupa", "group", "grouped", "agrupado",
+    "ordena", "sort", "sorted", "filtra", "filter", "vendida", "vendidas", "vendido", "vendidos",
+    "sold", "cada", "each", "every", "todos", "todas", "all", "valores", "values", "datos", "data",
+    "distintos", "distinct", "unique", "unicos", "diferentes", "cual", "cuales", "which", "what",
+    "que", "quien", "quienes", "who", "donde", "where", "cuando", "when", "acumulado",
+    "crecimiento", "growth", "variacion", "change", "evolucion", "ranking", "primeros", "first",
+    "ultimos", "last", "nulos", "nulls", "null", "faltantes", "missing",
+    # Estructura de la tabla
+    "columna", "columnas", "column", "columns", "fila", "filas", "row", "rows", "campo", "campos",
+    "field", "fields", "tipo", "tipos", "type", "types", "registros", "records", "dataset",
+    "describe", "describir",
+}
+
+STOPWORDS = {
+    "el", "la", "los", "las", "un", "una", "unos", "unas", "de", "del", "al", "a", "en", "y", "o",
+    "por", "para", "con", "sin", "sobre", "entre", "es", "son", "hay", "se", "su", "sus", "lo",
+    "the", "an", "of", "in", "on", "for", "by", "per", "to", "and", "or", "with", "is", "are",
+    "there", "me", "mi", "my", "from", "at", "as", "this", "that", "these", "esta", "este", "estos",
+    "fue", "was", "were", "be", "it", "its", "tiene", "tienen", "has", "have", "do", "does", "did",
+    "favor", "ejemplo", "example",
+}
+
+# Palabras que piden una agrupación ("por región")
+GROUPING_WORDS = {"por", "by", "per", "cada", "each"}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Nombre entre comillas: 'Laptop Pro', "región", `region`
+_QUOTED_RE = re.compile(r"(?<!\w)[\"'`“‘]([^\"'`”’\n]+)[\"'`”’](?!\w)")
+
+
+@dataclass
+class QueryValidation:
+    """Resultado de validar una pregunta."""
+    query: str
+    resolved: dict[str, str] = field(default_factory=dict)
+    missing: list[str] = field(default_factory=list)
+    suggestions: dict[str, str] = field(default_factory=dict)
+    # Palabras desconocidas que no parecen referencias: no invalidan la pregunta
+    warnings: list[str] = field(default_factory=list)
+    error: Optional[str] = None
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.missing and self.error is None
+
+    def as_tuple(self) -> tuple[bool, Optional[str]]:
+        """Formato de `AIBuilder.validate_query`: (es_válido, error)."""
+        if self.error is not None:
+            return (False, self.error)
+        if self.missing:
+            hints = [
+                f"{t} (¿{self.suggestions[t]}?)" if t in self.suggestions else t
+                for t in self.missing
+            ]
+            return (False, f"Referencias no encontradas en los datos: {', '.join(hints)}")
+        return (True, None)
+
+
+class QueryIndex:
+    """
+    Índice precalculado de columnas, valores y sinónimos.
+
+    Example:
+        ```python
+        index = QueryIndex.from_profile(qry.profile)
+        result = index.validate("Total de ventas por región")
+        result.is_valid   # True
+        result = index.validate("Margen por sucursal")
+        result.is_valid   # True
+        result.warnings   # ['margen', 'sucursal']
+        result = index.validate('Ventas por "sucursal"')
+        result.missing    # ['sucursal']
+        ```
+    """
+
+    # Similitud mínima para aceptar una coincidencia difusa
+    FUZZY_CUTOFF = 0.8
+    # Valores distintos máximos por columna indexados como referencias
+    MAX_INDEXED_VALUES = 500
+
+    def __init__(self, synonym_groups: Optional[list[set[str]]] = None) -> None:
+        # término normalizado -> referencia legible ("columna region", "valor Norte de region")
+        self._terms: dict[str, str] = {}
+        self._by_length: dict[int, list[str]] = {}
+        self._phrases: list[str] = []
+        self._synonyms: dict[str, set[str]] = {}
+        self._cache: dict[str, tuple[Optional[str], Optional[str]]] = {}
+        self._numeric = False
+        self._categorical = False
+        for group in synonym_groups if synonym_groups is not None else SYNONYM_GROUPS:
+            normalized = {normalize_text(term) for term in group}
+            for term in normalized:
+                self._synonyms.setdefault(term, set()).update(normalized)
+
+    @classmethod
+    def from_profile(cls, profile: DataProfile, **kwargs) -> "QueryIndex":
+        """Construye el índice a partir de un perfil de columnas."""
+        index = cls(**kwargs)
+        for column in profile.columns.values():
+            index._numeric |= column.kind == "numeric"
+            index._categorical |= column.kind != "numeric"
+            index._add(column.name, f"columna {column.name}")
+            if column.kind == "categorical" and column.distinct <= cls.MAX_INDEXED_VALUES:
+                for value in column.value_counts:
+                    index._add(str(value), f"valor '{value}' de {column.name}")
+
+        # Los sinónimos de términos indexados también quedan indexados
+        for term, reference in list(index._terms.items()):
+            for synonym in index._synonyms.get(term, ()):
+                index._terms.setdefault(synonym, reference)
+
+        for term in index._terms:
+            index._by_length.setdefault(len(term), []).append(term)
+        # Frases más largas primero para que "precio unitario" gane a "precio"
+        index._phrases = sorted((t for t in index._terms if " " in t), key=len, reverse=True)
+        return index
+
+    def _add(self, text: str, reference: str) -> None:
+        normalized = normalize_text(text).strip()
+        if not normalized:
+            return
+        self._terms.setdefault(normalized, reference)
+        # Cada palabra de un nombre compuesto también es una referencia
+        for token in _TOKEN_RE.findall(normalized):
+            if token not in STOPWORDS and len(token) > 2:
+                self._terms.setdefault(token, reference)
+
+    def resolve(self, token: str) -> tuple[Optional[str], Optional[str]]:
+        """
+        Resuelve una palabra contra el índice.
+
+        Returns:
+            Tupla (referencia, sugerencia). La referencia es None si no
+            hubo coincidencia exacta ni difusa; la sugerencia es el término
+            más parecido por debajo del umbral, si existe.
+        """
+        if token in self._terms:
+            return (self._terms[token], None)
+        if token in self._cache:
+            return self._cache[token]
+
+        best_term, best_score = None, 0.0
+        for length in range(len(token) - 2, len(token) + 3):
+            for term in self._by_length.get(length, ()):
+                matcher = SequenceMatcher(None, token, term)
+                if matcher.real_quick_ratio() <= best_score or matcher.quick_ratio() <= best_score:
+                    continue
+                score = matcher.ratio()
+                if score > best_score:
+                    best_term, best_score = term, score
+
+        if best_term is not None and best_score >= self.FUZZY_CUTOFF:
+            result = (self._terms[best_term], None)
+        else:
+            result = (None, best_term if best_score >= 0.75 else None)
+        self._cache[token] = result
+        return result
+
+    def validate(self, query: str) -> QueryValidation:
+        """
+        Valida una pregunta sin llamar al LLM.
+
+        Las palabras desconocidas van a `missing` (y la pregunta no es
+        válida) si están entre comillas o se parecen a un término del
+        índice; las demás, a `warnings`.
+        """
+        result = QueryValidation(query=query)
+        text = normalize_text(query)
+
+        # Un nombre entre comillas tiene que ser una columna o un valor
+        for quoted in _QUOTED_RE.findall(query):
+            name = normalize_text(quoted).strip()
+            if not name:
+                continue
+            reference, suggestion = self.resolve(name)
+            if reference is not None:
+                result.resolved[name] = reference
+            elif name not in result.missing:
+                self._add_missing(result, name, suggestion)
+            text = text.replace(name, " ")
+
+        # Nombres compuestos ("precio unitario") antes que palabras sueltas
+        for phrase in self._phrases:
+            if phrase in text:
+                result.resolved[phrase] = self._terms[phrase]
+                text = text.replace(phrase, " ")
+
+        for token in _TOKEN_RE.findall(text):
+            if token in STOPWORDS or token in ANALYSIS_WORDS or token.isdigit() or len(token) <= 2:
+                continue
+            reference, suggestion = self.resolve(token)
+            if reference is not None:
+                result.resolved[token] = reference
+            elif token in result.missing or token in result.warnings:
+                continue
+            elif suggestion is not None:
+                self._add_missing(result, token, suggestion)
+            else:
+                result.warnings.append(token)
+
+        if re.search(r"\b(total|suma|sum|promedio|average|mean|media)\b", text) and not self._numeric:
+            result.error = "Se pidió una agregación pero no hay columnas numéricas"
+        elif not GROUPING_WORDS.isdisjoint(_TOKEN_RE.findall(text)) and not self._categorical:
+            result.error = "Se pidió agrupar pero no hay columnas categóricas"
+        return result
+
+    @staticmethod
+    def _add_missing(result: QueryValidation, term: str, suggestion: Optional[str]) -> None:
+        result.missing.append(term)
+        if suggestion is not None:
+            result.suggestions[term] = suggestion
+
+    def __len__(self) -> int:
+        return len(self._terms)